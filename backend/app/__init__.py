@@ -36,7 +36,19 @@ def create_app(config_name='development'):
     migrate.init_app(app, db)
     jwt.init_app(app)
     mail.init_app(app)
-    socketio.init_app(app)
+
+    # Relay emits through a message queue when running several workers
+    from app.utils.backplane import socketio_options
+    socketio.init_app(app, **socketio_options(app.config))
+    from app.utils.emitter import emitter
+    emitter.init_app(app)
+    from app.utils.presence import presence
+    presence.init_app(app)
+    from app.utils.graph import adjacency, degrees
+    adjacency.init_app(app)
+    degrees.init_app(app)
+    from app.utils.trending import tracker
+    tracker.init_app(app)
 
     # Import socket events to ensure they are registered
     from app import socket_events
@@ -103,7 +115,7 @@ def create_app(config_name='development'):
 
     # Register blueprints (per-module strategy)
     from app.routes import auth, users, jobs, blogs, companies, interviews, notifications, admin
-    from app.routes import messages, roadmaps
+    from app.routes import messages, roadmaps, sync, feed, trending
 
     app.register_blueprint(auth.bp)
     app.register_blueprint(users.bp)
@@ -115,10 +127,17 @@ def create_app(config_name='development'):
     app.register_blueprint(messages.bp)
     app.register_blueprint(admin.bp)
     app.register_blueprint(roadmaps.bp)
+    app.register_blueprint(sync.bp)
+    app.register_blueprint(feed.bp)
+    app.register_blueprint(trending.bp)
 
     # Create database tables
     with app.app_context():
         db.create_all()
+        from app.utils.search import ensure_search_index
+        ensure_search_index(app.config['MESSAGE_SEARCH_CONFIG'])
+
+    # Periodic background jobs run in their own process: `flask run-scheduler`
 
     # Health check route
     @app.route('/api/health')
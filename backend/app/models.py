@@ -9,7 +9,9 @@ from werkzeug.security import generate_password_hash, check_password_hash
 # Association tables for many-to-many relationships
 post_likes = db.Table('post_likes',
     db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
-    db.Column('post_id', db.Integer, db.ForeignKey('blog_posts.id'), primary_key=True)
+    db.Column('post_id', db.Integer, db.ForeignKey('blog_posts.id'), primary_key=True),
+    db.Column('created_at', db.DateTime, default=datetime.utcnow),
+    db.Index('ix_post_likes_post_id', 'post_id')
 )
 
 user_connections = db.Table('user_connections',
@@ -21,9 +23,21 @@ user_connections = db.Table('user_connections',
     db.Column('reviewed_at', db.DateTime, nullable=True)
 )
 
+# Symmetric mirror of user_connections: one row per direction, so "my
+# connections" is a single index range scan on (user_id, status)
+connection_edges = db.Table('connection_edges',
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
+    db.Column('other_user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
+    db.Column('status', db.String(20), nullable=False),  # pending, accepted, rejected
+    db.Column('is_requester', db.Boolean, nullable=False, default=False),  # user_id sent the request
+    db.Column('created_at', db.DateTime, default=datetime.utcnow),
+    db.Index('ix_connection_edges_user_status', 'user_id', 'status', 'other_user_id')
+)
+
 company_followers = db.Table('company_followers',
     db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
-    db.Column('company_id', db.Integer, db.ForeignKey('companies.id'), primary_key=True)
+    db.Column('company_id', db.Integer, db.ForeignKey('companies.id'), primary_key=True),
+    db.Index('ix_company_followers_company_id', 'company_id')
 )
 
 
@@ -47,6 +61,8 @@ class User(db.Model):
     linkedin = db.Column(db.String(500))
     github = db.Column(db.String(500))
     dark_mode = db.Column(db.Boolean, default=False)
+    notification_digest = db.Column(db.Boolean, default=False)  # Opted in to periodic email digests
+    last_digest_at = db.Column(db.DateTime, nullable=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -84,11 +100,22 @@ class User(db.Model):
             'linkedin': self.linkedin,
             'github': self.github,
             'darkMode': self.dark_mode,
+            'notificationDigest': self.notification_digest,
             'companyId': self.company_id,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
         }
         return data
 
+    def to_brief_dict(self):
+        """Just enough to render an avatar and a name"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'image': self.image,
+            'headline': self.headline,
+            'userRole': self.user_role,
+        }
+
 
 class PasswordResetToken(db.Model):
     """Password reset token model"""
@@ -269,7 +296,15 @@ class Notification(db.Model):
     link = db.Column(db.String(500))  # Link to navigate when clicked
     is_read = db.Column(db.Boolean, default=False)
     data = db.Column(db.JSON)  # Additional data (job_id, company_id, etc.)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    group_key = db.Column(db.String(100))  # Events with the same (user, type, group_key) are coalesced
+    count = db.Column(db.Integer, default=1)  # Number of events merged into this row
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Time of the latest merged event
+
+    __table_args__ = (
+        db.Index('ix_notifications_coalesce', 'user_id', 'type', 'group_key', 'is_read'),
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at'),
+        db.Index('ix_notifications_created', 'created_at'),
+    )
 
     # Relationships
     user = db.relationship('User', backref=db.backref('notifications', lazy='dynamic'))
@@ -284,10 +319,120 @@ class Notification(db.Model):
             'link': self.link,
             'isRead': self.is_read,
             'data': self.data,
+            'count': self.count or 1,
             'createdAt': self.created_at.isoformat() + 'Z' if self.created_at else None,
         }
 
 
+class NotificationArchive(db.Model):
+    """Read notifications moved out of the hot table by the retention job"""
+    __tablename__ = 'notifications_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    type = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    link = db.Column(db.String(500))
+    data = db.Column(db.JSON)
+    group_key = db.Column(db.String(100))
+    count = db.Column(db.Integer, default=1)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ConnectionSuggestion(db.Model):
+    """Precomputed "people you may know" rows, rebuilt by the suggestions job"""
+    __tablename__ = 'connection_suggestions'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    suggested_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+    mutual_count = db.Column(db.Integer, default=0)
+    shared_companies = db.Column(db.Integer, default=0)
+    shared_schools = db.Column(db.Integer, default=0)
+    shared_skills = db.Column(db.Integer, default=0)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_connection_suggestions_user_score', 'user_id', 'score'),
+    )
+
+    def reasons(self):
+        return {
+            'mutualConnections': self.mutual_count,
+            'sharedCompanies': self.shared_companies,
+            'sharedSchools': self.shared_schools,
+            'sharedSkills': self.shared_skills,
+        }
+
+
+class UserNetworkStats(db.Model):
+    """Per-user output of the offline network analytics job"""
+    __tablename__ = 'user_network_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    degree = db.Column(db.Integer, default=0)
+    influence = db.Column(db.Float, default=0.0, index=True)  # PageRank, sums to 1 over all users
+    component_id = db.Column(db.Integer)
+    component_size = db.Column(db.Integer, default=1)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'userId': self.user_id,
+            'degree': self.degree,
+            'influence': self.influence,
+            'componentId': self.component_id,
+            'componentSize': self.component_size,
+        }
+
+
+class NetworkSnapshot(db.Model):
+    """Network-wide summary written by each analytics run"""
+    __tablename__ = 'network_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    users = db.Column(db.Integer, default=0)
+    connections = db.Column(db.Integer, default=0)
+    components = db.Column(db.Integer, default=0)
+    largest_component = db.Column(db.Integer, default=0)
+    isolated_users = db.Column(db.Integer, default=0)
+    degree_histogram = db.Column(db.JSON)  # [{'degree': d, 'users': n}]
+    component_sizes = db.Column(db.JSON)  # [{'size': s, 'components': n}]
+    company_clusters = db.Column(db.JSON)  # per-company members / internal connections / density
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'users': self.users,
+            'connections': self.connections,
+            'components': self.components,
+            'largestComponent': self.largest_component,
+            'isolatedUsers': self.isolated_users,
+            'degreeHistogram': self.degree_histogram or [],
+            'componentSizes': self.component_sizes or [],
+            'companyClusters': self.company_clusters or [],
+            'computedAt': self.computed_at.isoformat() if self.computed_at else None,
+        }
+
+
+class UserCounter(db.Model):
+    """Denormalized per-user unread counters, kept in step with writes"""
+    __tablename__ = 'user_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    unread_notifications = db.Column(db.Integer, default=0, nullable=False)
+    unread_messages = db.Column(db.Integer, default=0, nullable=False)
+
+    def to_dict(self):
+        return {
+            'unreadNotifications': self.unread_notifications,
+            'unreadMessages': self.unread_messages,
+        }
+
+
 class BlogPost(db.Model):
     """Blog post model"""
     __tablename__ = 'blog_posts'
@@ -299,6 +444,8 @@ class BlogPost(db.Model):
     url = db.Column(db.String(500))
     photo = db.Column(db.String(500))
     original_post_id = db.Column(db.Integer, db.ForeignKey('blog_posts.id'), nullable=True)
+    # Exponentially decayed engagement points, maintained by app.utils.engagement
+    engagement_score = db.Column(db.Float, default=0.0, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -307,7 +454,25 @@ class BlogPost(db.Model):
     likes = db.relationship('User', secondary=post_likes, backref='liked_posts')
     reposts = db.relationship('BlogPost', backref=db.backref('original_post', remote_side=[id]), lazy='dynamic')
 
-    def to_dict(self):
+    __table_args__ = (
+        db.Index('ix_blog_posts_author_id', 'author_id', 'id'),
+        db.Index('ix_blog_posts_engagement_score', 'engagement_score', 'id'),
+    )
+
+    def to_dict(self, viewer_id=None, like_state=None):
+        """
+        `like_state` is {post_id: (likes count, liked by viewer)} for a batch of
+        posts (see app.utils.posts.serialize_posts); missing posts are counted here.
+        """
+        if like_state and self.id in like_state:
+            likes_count, is_liked = like_state[self.id]
+        else:
+            likes_count = db.session.query(db.func.count()).select_from(post_likes).filter(
+                post_likes.c.post_id == self.id
+            ).scalar()
+            is_liked = viewer_id is not None and db.session.query(post_likes.c.post_id).filter(
+                post_likes.c.post_id == self.id, post_likes.c.user_id == viewer_id
+            ).first() is not None
         return {
             'id': self.id,
             'author': self.author.to_dict() if self.author else None,
@@ -315,17 +480,75 @@ class BlogPost(db.Model):
             'location': self.location,
             'url': self.url,
             'photo': self.photo,
-            'likes': [user.id for user in self.likes],
-            'likesCount': len(self.likes),
+            'likesCount': likes_count,
+            'isLiked': is_liked,
             'commentsCount': self.comments.count(),
-            'comments': [comment.to_dict() for comment in self.comments.order_by(Comment.created_at.asc())],
             'repostsCount': self.reposts.count(),
-            'originalPost': self.original_post.to_dict() if self.original_post else None,
+            'engagementScore': round(self.engagement_score or 0.0, 3),
+            'originalPost': self.original_post.to_dict(viewer_id, like_state) if self.original_post else None,
             'timestamp': self.created_at.isoformat() + 'Z' if self.created_at else None,
             'createdAt': self.created_at.isoformat() + 'Z' if self.created_at else None,
         }
 
 
+class JobRun(db.Model):
+    """Last run of a periodic job, so several workers never apply it twice"""
+    __tablename__ = 'job_runs'
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_run_at = db.Column(db.DateTime, nullable=False)
+
+
+class TimelineEntry(db.Model):
+    """Home timeline row written at post time for each recipient (fan-out on write)"""
+    __tablename__ = 'timeline_entries'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)  # Reader
+    post_id = db.Column(db.Integer, db.ForeignKey('blog_posts.id'), primary_key=True)
+    author_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class FeedCelebrity(db.Model):
+    """Author above FEED_FANOUT_LIMIT whose posts are merged into feeds on read"""
+    __tablename__ = 'feed_celebrities'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    since = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class PostTag(db.Model):
+    """Hashtag or @mention extracted from a post"""
+    __tablename__ = 'post_tags'
+
+    post_id = db.Column(db.Integer, db.ForeignKey('blog_posts.id'), primary_key=True)
+    kind = db.Column(db.String(20), primary_key=True)  # hashtag, mention
+    tag = db.Column(db.String(100), primary_key=True)  # Lowercased, without '#' / '@'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        db.Index('ix_post_tags_kind_tag', 'kind', 'tag', 'post_id'),
+    )
+
+
+class TrendingSnapshot(db.Model):
+    """Top topics of the sliding window, written periodically"""
+    __tablename__ = 'trending_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    window_minutes = db.Column(db.Integer, nullable=False)
+    topics = db.Column(db.JSON)  # [{'kind': 'hashtag', 'tag': 'python', 'count': n}]
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'windowMinutes': self.window_minutes,
+            'topics': self.topics or [],
+            'computedAt': self.computed_at.isoformat() + 'Z' if self.computed_at else None,
+        }
+
+
 class Comment(db.Model):
     """Comment model for blog posts"""
     __tablename__ = 'comments'
@@ -337,6 +560,10 @@ class Comment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_comments_post_id', 'post_id', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -508,12 +735,20 @@ class Conversation(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # "<min user id>:<max user id>" for 1:1 chats, NULL for group chats
+    direct_key = db.Column(db.String(50), unique=True, nullable=True)
 
     # Relationships
     participants = db.relationship('User', secondary='conversation_participants', backref='conversations')
     messages = db.relationship('Message', backref='conversation', lazy='dynamic', cascade='all, delete-orphan')
 
+    @staticmethod
+    def make_direct_key(user_id, other_user_id):
+        """Canonical key of the 1:1 conversation between two users"""
+        low, high = sorted((int(user_id), int(other_user_id)))
+        return f"{low}:{high}"
+
     def to_dict(self, current_user_id):
         other_participant = None
         for p in self.participants:
@@ -523,11 +758,14 @@ class Conversation(db.Model):
 
         last_message = self.messages.order_by(Message.created_at.desc()).first()
 
+        read_cursors = ConversationParticipant.query.filter_by(conversation_id=self.id).all()
+
         return {
             'id': self.id,
             'participants': [p.to_dict() for p in self.participants],
             'otherParticipant': other_participant.to_dict() if other_participant else None,
             'lastMessage': last_message.to_dict() if last_message else None,
+            'readCursors': {str(cp.user_id): cp.last_read_message_id for cp in read_cursors},
             'updatedAt': self.updated_at.isoformat() + 'Z' if self.updated_at else None,
         }
 
@@ -538,6 +776,8 @@ class ConversationParticipant(db.Model):
 
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
     conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), primary_key=True)
+    unread_count = db.Column(db.Integer, default=0, nullable=False)
+    last_read_message_id = db.Column(db.Integer, nullable=True)  # Read cursor; messages up to this id are read
 
 
 class Message(db.Model):
@@ -554,16 +794,59 @@ class Message(db.Model):
     # Relationships
     sender = db.relationship('User', backref='sent_messages')
 
-    def to_dict(self):
-        return {
+    __table_args__ = (
+        db.Index('ix_messages_conversation_id', 'conversation_id', 'id'),
+    )
+
+    def to_dict(self, include_sender=True):
+        data = {
             'id': self.id,
             'conversationId': self.conversation_id,
             'senderId': self.sender_id,
             'content': self.content,
             'isRead': self.is_read,
-            'sender': self.sender.to_dict() if self.sender else None,
             'timestamp': self.created_at.isoformat() + 'Z' if self.created_at else None,
         }
+        if include_sender:
+            data['sender'] = self.sender.to_dict() if self.sender else None
+        return data
+
+
+class MessageArchive(db.Model):
+    """Old messages moved out of the hot table by the archiver; same shape as Message"""
+    __tablename__ = 'messages_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    conversation_id = db.Column(db.Integer, nullable=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    is_read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    sender = db.relationship('User')
+
+    __table_args__ = (
+        db.Index('ix_messages_archive_conversation_id', 'conversation_id', 'id'),
+    )
+
+    to_dict = Message.to_dict
+
+
+class ChangeLog(db.Model):
+    """Append-only per-user change feed served by /api/sync"""
+    __tablename__ = 'change_log'
+
+    id = db.Column(db.Integer, primary_key=True)  # Monotonic sync token
+    user_id = db.Column(db.Integer, nullable=False)  # User whose view of the entity changed
+    entity_type = db.Column(db.String(30), nullable=False)  # notification, message, conversation, connection
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False, default='upsert')  # upsert, delete
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_change_log_user_id', 'user_id', 'id'),
+    )
 
 
 class RoadmapTemplate(db.Model):
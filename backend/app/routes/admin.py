@@ -4,7 +4,8 @@ Admin Routes
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import User, Job, Interview, BlogPost, Company, Application
+from app.models import User, Job, Interview, BlogPost, Company, Application, NetworkSnapshot, UserNetworkStats
+from app.utils.posts import purge_post, serialize_posts
 from functools import wraps
 from datetime import datetime, timedelta
 
@@ -219,7 +220,7 @@ def get_all_blogs():
     
     return jsonify({
         'success': True,
-        'blogs': [post.to_dict() for post in pagination.items],
+        'blogs': serialize_posts(pagination.items),
         'total': pagination.total,
         'pages': pagination.pages,
         'currentPage': page
@@ -254,9 +255,44 @@ def delete_interview(interview_id):
 def delete_blog(post_id):
     """Delete a blog post"""
     post = BlogPost.query.get_or_404(post_id)
-    db.session.delete(post)
+    purge_post(post)
     db.session.commit()
     return jsonify({
         'success': True,
         'message': 'Blog post deleted successfully'
     })
+
+@bp.route('/socket-stats', methods=['GET'])
+@admin_required
+def get_socket_stats():
+    """Background emit queue depth and backpressure counters"""
+    from app.utils.emitter import emitter
+    return jsonify({
+        'success': True,
+        'emitQueue': emitter.stats()
+    })
+
+@bp.route('/network-stats', methods=['GET'])
+@admin_required
+def get_network_stats():
+    """Latest offline network analytics snapshot and the most influential users"""
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    snapshot = NetworkSnapshot.query.order_by(NetworkSnapshot.computed_at.desc()).first()
+    if not snapshot:
+        return jsonify({
+            'success': True,
+            'snapshot': None,
+            'topInfluencers': []
+        })
+    
+    top = db.session.query(UserNetworkStats, User).join(
+        User, User.id == UserNetworkStats.user_id
+    ).order_by(UserNetworkStats.influence.desc()).limit(limit).all()
+    
+    return jsonify({
+        'success': True,
+        'snapshot': snapshot.to_dict(),
+        'topInfluencers': [
+            {**stats.to_dict(), 'user': user.to_brief_dict()} for stats, user in top
+        ]
+    })
@@ -172,6 +172,8 @@ def update_profile():
         user.cover_image = data['coverImage']
     if 'darkMode' in data:
         user.dark_mode = data['darkMode']
+    if 'notificationDigest' in data:
+        user.notification_digest = bool(data['notificationDigest'])
     
     try:
         db.session.commit()
@@ -4,7 +4,11 @@ Blog Routes
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import BlogPost, Comment, User
+from app.models import BlogPost, Comment, User, post_likes
+from app.utils import engagement, timeline, trending
+from app.utils.posts import current_viewer_id, purge_post, serialize_posts
+from app.utils.dialect import toggle_row
+from app.utils.sampling import sample_ids
 
 bp = Blueprint('blogs', __name__, url_prefix='/api/posts')
 
@@ -21,7 +25,7 @@ def get_posts():
     
     return jsonify({
         'success': True,
-        'posts': [post.to_dict() for post in posts.items],
+        'posts': serialize_posts(posts.items, current_viewer_id()),
         'total': posts.total,
         'pages': posts.pages,
         'currentPage': page
@@ -31,14 +35,15 @@ def get_posts():
 @bp.route('/random', methods=['GET'])
 def get_random_posts():
     """Get random posts"""
-    limit = request.args.get('limit', 10, type=int)
+    limit = min(request.args.get('limit', 10, type=int), 50)
     
-    # Use SQL random function
-    posts = BlogPost.query.order_by(db.func.random()).limit(limit).all()
+    # Random id probes over the primary key instead of sorting the table
+    post_ids = sample_ids(BlogPost.id, limit)
+    posts = {post.id: post for post in BlogPost.query.filter(BlogPost.id.in_(post_ids))} if post_ids else {}
     
     return jsonify({
         'success': True,
-        'posts': [post.to_dict() for post in posts]
+        'posts': serialize_posts([posts[pid] for pid in post_ids if pid in posts], current_viewer_id())
     })
 
 
@@ -55,7 +60,7 @@ def get_post(post_id):
     
     return jsonify({
         'success': True,
-        'post': post.to_dict()
+        'post': post.to_dict(current_viewer_id())
     })
 
 
@@ -77,16 +82,21 @@ def create_post():
         content=data.get('content'),
         location=data.get('location'),
         url=data.get('url'),
-        photo=data.get('photo')
+        photo=data.get('photo'),
+        engagement_score=engagement.POINTS['post']
     )
     
     try:
         db.session.add(post)
+        db.session.flush()
+        timeline.fan_out(post)
+        tags = trending.index_post(post)
         db.session.commit()
+        trending.tracker.record(tags, post.created_at)
         return jsonify({
             'success': True,
             'message': 'Post created successfully',
-            'post': post.to_dict()
+            'post': post.to_dict(user_id)
         }), 201
     except Exception as e:
         db.session.rollback()
@@ -125,11 +135,13 @@ def update_post(post_id):
         post.photo = data['photo']
     
     try:
+        tags = trending.index_post(post)
         db.session.commit()
+        trending.tracker.record(tags, post.created_at)
         return jsonify({
             'success': True,
             'message': 'Post updated successfully',
-            'post': post.to_dict()
+            'post': post.to_dict(user_id)
         })
     except Exception as e:
         db.session.rollback()
@@ -160,7 +172,7 @@ def delete_post(post_id):
         }), 403
     
     try:
-        db.session.delete(post)
+        purge_post(post)
         db.session.commit()
         return jsonify({
             'success': True,
@@ -177,32 +189,32 @@ def delete_post(post_id):
 @bp.route('/<int:post_id>/like', methods=['POST'])
 @jwt_required()
 def toggle_like(post_id):
-    """Toggle like on a post"""
+    """Toggle like on a post; returns the new state and count, not the likers"""
     user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    post = BlogPost.query.get(post_id)
     
-    if not post:
+    if not db.session.query(BlogPost.id).filter(BlogPost.id == post_id).first():
         return jsonify({
             'success': False,
             'message': 'Post not found'
         }), 404
     
     try:
-        if user in post.likes:
-            post.likes.remove(user)
-            liked = False
-        else:
-            post.likes.append(user)
-            liked = True
-        
+        # An unlike takes off what is left of the like's points after decay since it was made
+        liked_at = db.session.query(post_likes.c.created_at).filter(
+            post_likes.c.user_id == user_id, post_likes.c.post_id == post_id
+        ).scalar()
+        liked, changed = toggle_row(post_likes, user_id=user_id, post_id=post_id)
+        if changed:
+            engagement.bump(post_id, 'like', 1 if liked else -1, at=liked_at)
+        likes_count = db.session.query(db.func.count()).select_from(post_likes).filter(
+            post_likes.c.post_id == post_id
+        ).scalar()
         db.session.commit()
         
         return jsonify({
             'success': True,
             'liked': liked,
-            'likes': [u.id for u in post.likes],
-            'likesCount': len(post.likes)
+            'likesCount': likes_count
         })
     except Exception as e:
         db.session.rollback()
@@ -214,25 +226,53 @@ def toggle_like(post_id):
 
 @bp.route('/<int:post_id>/comments', methods=['GET'])
 def get_comments(post_id):
-    """Get comments for a post"""
-    post = BlogPost.query.get(post_id)
-    
-    if not post:
+    """
+    Get a page of comments for a post, oldest first.
+    ?cursor=<last comment id>&limit=20
+    """
+    if not db.session.query(BlogPost.id).filter(BlogPost.id == post_id).first():
         return jsonify({
             'success': False,
             'message': 'Post not found'
         }), 404
     
-    comments = Comment.query.filter_by(post_id=post_id).order_by(
-        Comment.created_at.asc()
-    ).all()
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    cursor = request.args.get('cursor', type=int)
+    
+    query = Comment.query.options(db.selectinload(Comment.author)).filter(Comment.post_id == post_id)
+    if cursor:
+        query = query.filter(Comment.id > cursor)
+    comments = query.order_by(Comment.id.asc()).limit(limit + 1).all()
+    has_more = len(comments) > limit
+    comments = comments[:limit]
+    
+    return jsonify({
+        'success': True,
+        'comments': [comment.to_dict() for comment in comments],
+        'commentsCount': _comments_count(post_id),
+        'nextCursor': str(comments[-1].id) if has_more else None
+    })
+
+
+@bp.route('/<int:post_id>/comments/count', methods=['GET'])
+def get_comments_count(post_id):
+    """Get the number of comments on a post"""
+    if not db.session.query(BlogPost.id).filter(BlogPost.id == post_id).first():
+        return jsonify({
+            'success': False,
+            'message': 'Post not found'
+        }), 404
     
     return jsonify({
         'success': True,
-        'comments': [comment.to_dict() for comment in comments]
+        'commentsCount': _comments_count(post_id)
     })
 
 
+def _comments_count(post_id):
+    return db.session.query(db.func.count(Comment.id)).filter(Comment.post_id == post_id).scalar()
+
+
 @bp.route('/<int:post_id>/comments', methods=['POST'])
 @jwt_required()
 def add_comment(post_id):
@@ -262,6 +302,7 @@ def add_comment(post_id):
     
     try:
         db.session.add(comment)
+        engagement.bump(post_id, 'comment')
         db.session.commit()
         return jsonify({
             'success': True,
@@ -335,6 +376,7 @@ def delete_comment(post_id, comment_id):
     
     try:
         db.session.delete(comment)
+        engagement.bump(post_id, 'comment', -1, at=comment.created_at)
         db.session.commit()
         return jsonify({
             'success': True,
@@ -366,16 +408,22 @@ def repost(post_id):
     repost = BlogPost(
         author_id=user_id,
         content=data.get('content', ''),
-        original_post_id=post_id
+        original_post_id=post_id,
+        engagement_score=engagement.POINTS['post']
     )
     
     try:
         db.session.add(repost)
+        db.session.flush()
+        engagement.bump(post_id, 'repost')
+        timeline.fan_out(repost)
+        tags = trending.index_post(repost)
         db.session.commit()
+        trending.tracker.record(tags, repost.created_at)
         return jsonify({
             'success': True,
             'message': 'Post reposted successfully',
-            'post': repost.to_dict()
+            'post': repost.to_dict(user_id)
         }), 201
     except Exception as e:
         db.session.rollback()
@@ -405,7 +453,7 @@ def get_user_posts(user_id):
     
     return jsonify({
         'success': True,
-        'posts': [post.to_dict() for post in posts.items],
+        'posts': serialize_posts(posts.items, current_viewer_id()),
         'total': posts.total,
         'pages': posts.pages,
         'currentPage': page
@@ -5,7 +5,8 @@ from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from app import db
-from app.models import Company, User, Job, CompanyJoinRequest
+from app.models import Company, User, Job, CompanyJoinRequest, company_followers
+from app.utils.dialect import toggle_row
 
 bp = Blueprint('companies', __name__, url_prefix='/api/companies')
 
@@ -203,29 +204,24 @@ def update_company(company_id):
 def toggle_follow(company_id):
     """Toggle follow on a company"""
     user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    company = Company.query.get(company_id)
     
-    if not company:
+    if not db.session.query(Company.id).filter(Company.id == company_id).first():
         return jsonify({
             'success': False,
             'message': 'Company not found'
         }), 404
     
     try:
-        if user in company.followers:
-            company.followers.remove(user)
-            following = False
-        else:
-            company.followers.append(user)
-            following = True
-        
+        following, _ = toggle_row(company_followers, user_id=user_id, company_id=company_id)
+        followers_count = db.session.query(db.func.count()).select_from(company_followers).filter(
+            company_followers.c.company_id == company_id
+        ).scalar()
         db.session.commit()
         
         return jsonify({
             'success': True,
             'following': following,
-            'followersCount': len(company.followers)
+            'followersCount': followers_count
         })
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,61 @@
+"""
+Feed Routes
+"""
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import or_, and_
+from app.models import BlogPost
+from app.utils import timeline
+from app.utils.posts import serialize_posts
+
+bp = Blueprint('feed', __name__, url_prefix='/api/feed')
+
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+def get_feed():
+    """
+    Home timeline: posts by the user and their connections, newest first.
+    ?cursor=<last post id>&limit=20
+    ?mode=top ranks all posts by decayed engagement instead (cursor: <score>_<id>)
+    """
+    user_id = int(get_jwt_identity())
+    limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+    
+    if request.args.get('mode') == 'top':
+        return _top_feed(user_id, request.args.get('cursor'), limit)
+    
+    cursor = request.args.get('cursor', type=int)
+    post_ids, has_more = timeline.read_timeline(user_id, before_id=cursor, limit=limit)
+    posts = {post.id: post for post in BlogPost.query.filter(BlogPost.id.in_(post_ids))} if post_ids else {}
+    
+    return jsonify({
+        'success': True,
+        'posts': serialize_posts([posts[pid] for pid in post_ids if pid in posts], user_id),
+        'nextCursor': str(post_ids[-1]) if has_more else None
+    })
+
+
+def _top_feed(user_id, cursor, limit):
+    """Posts by engagement score, read off the (engagement_score, id) index"""
+    query = BlogPost.query
+    if cursor:
+        try:
+            score, post_id = cursor.rsplit('_', 1)
+            score, post_id = float(score), int(post_id)
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+        query = query.filter(or_(
+            BlogPost.engagement_score < score,
+            and_(BlogPost.engagement_score == score, BlogPost.id < post_id)
+        ))
+    
+    posts = query.order_by(BlogPost.engagement_score.desc(), BlogPost.id.desc()).limit(limit + 1).all()
+    has_more = len(posts) > limit
+    posts = posts[:limit]
+    
+    return jsonify({
+        'success': True,
+        'posts': serialize_posts(posts, user_id),
+        'nextCursor': f'{posts[-1].engagement_score!r}_{posts[-1].id}' if has_more else None
+    })
@@ -1,34 +1,139 @@
 """
 Message routes for handling conversations and messages
 """
-from flask import jsonify, request
+from datetime import datetime
+from flask import jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from flask import Blueprint
-from app.models import Conversation, Message, User, user_connections
+from app.models import Conversation, ConversationParticipant, Message, User, user_connections
 from sqlalchemy import or_, and_
-from app import socketio
+from sqlalchemy.exc import IntegrityError
+from app.utils.emitter import emitter
+from app.utils import archive, counters, graph, search, timeline
+from app.utils.sync import record_change, record_changes
 
 bp = Blueprint('messages', __name__, url_prefix='/api')
 
+MAX_STATUS_LOOKUP = 500
+
+def _encode_cursor(updated_at, conversation_id):
+    return f"{updated_at.isoformat()}_{conversation_id}"
+
+
+def _decode_cursor(cursor):
+    try:
+        updated_at, conversation_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(updated_at), int(conversation_id)
+    except (ValueError, AttributeError):
+        return None
+
+
+def serialize_conversations(rows, user_id):
+    """
+    Serialize a page of conversations in two batched queries.
+    rows: (conversation_id, updated_at, unread_count) tuples, already ordered.
+    """
+    conversation_ids = [row[0] for row in rows]
+    if not conversation_ids:
+        return []
+
+    # All participants of the page at once
+    participants = {}
+    read_cursors = {}
+    for conversation_id, last_read_message_id, user in db.session.query(
+        ConversationParticipant.conversation_id, ConversationParticipant.last_read_message_id, User
+    ).join(
+        User, User.id == ConversationParticipant.user_id
+    ).filter(
+        ConversationParticipant.conversation_id.in_(conversation_ids)
+    ).order_by(ConversationParticipant.conversation_id, User.id):
+        participants.setdefault(conversation_id, []).append(user)
+        read_cursors.setdefault(conversation_id, {})[str(user.id)] = last_read_message_id
+
+    # Latest message per conversation with ROW_NUMBER() OVER (PARTITION BY ...)
+    ranked = db.session.query(
+        Message.id.label('id'),
+        db.func.row_number().over(
+            partition_by=Message.conversation_id,
+            order_by=Message.id.desc()
+        ).label('rn')
+    ).filter(Message.conversation_id.in_(conversation_ids)).subquery()
+
+    last_messages = {
+        message.conversation_id: message
+        for message in Message.query.join(ranked, ranked.c.id == Message.id).filter(ranked.c.rn == 1)
+    }
+
+    result = []
+    for conversation_id, updated_at, unread_count in rows:
+        members = participants.get(conversation_id, [])
+        # Senders are participants already in the identity map, so no lazy load is emitted
+        last_message = last_messages.get(conversation_id)
+        other = next((p for p in members if p.id != user_id), None)
+        cursors = read_cursors.get(conversation_id, {})
+        result.append({
+            'id': conversation_id,
+            'participants': [p.to_dict() for p in members],
+            'otherParticipant': other.to_dict() if other else None,
+            'lastMessage': _with_read_state([last_message.to_dict()], cursors, user_id)[0] if last_message else None,
+            'readCursors': cursors,
+            'unreadCount': unread_count or 0,
+            'updatedAt': updated_at.isoformat() + 'Z' if updated_at else None,
+        })
+    return result
+
+
 @bp.route('/conversations', methods=['GET'])
 @jwt_required()
 def get_conversations():
-    """Get all conversations for current user"""
+    """Get the current user's conversations, newest first, with cursor pagination"""
     user_id = int(get_jwt_identity())
+    limit = max(1, min(request.args.get('limit', 50, type=int), 100))
+    cursor = request.args.get('cursor')
     
-    # Get all conversations where user is a participant
-    conversations = Conversation.query.join(
-        Conversation.participants
+    query = db.session.query(
+        Conversation.id, Conversation.updated_at, ConversationParticipant.unread_count
+    ).join(
+        ConversationParticipant, ConversationParticipant.conversation_id == Conversation.id
     ).filter(
-        User.id == user_id
-    ).order_by(
-        Conversation.updated_at.desc()
-    ).all()
+        ConversationParticipant.user_id == user_id
+    )
+    
+    if cursor:
+        decoded = _decode_cursor(cursor)
+        if not decoded:
+            return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+        cursor_updated_at, cursor_id = decoded
+        query = query.filter(or_(
+            Conversation.updated_at < cursor_updated_at,
+            and_(Conversation.updated_at == cursor_updated_at, Conversation.id < cursor_id)
+        ))
+    
+    rows = query.order_by(
+        Conversation.updated_at.desc(), Conversation.id.desc()
+    ).limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(rows[-1][1], rows[-1][0]) if has_more and rows[-1][1] else None
     
     return jsonify({
         'success': True,
-        'conversations': [conv.to_dict(user_id) for conv in conversations]
+        'conversations': serialize_conversations(rows, user_id),
+        'nextCursor': next_cursor,
+        'unreadMessages': counters.get_counters(user_id).unread_messages
+    })
+
+@bp.route('/conversations/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_messages_count():
+    """Get the total count of unread messages"""
+    user_id = int(get_jwt_identity())
+    
+    return jsonify({
+        'success': True,
+        'count': counters.get_counters(user_id).unread_messages
     })
 
 @bp.route('/conversations', methods=['POST'])
@@ -42,51 +147,47 @@ def create_conversation():
     if not data or 'participantIds' not in data or not isinstance(data['participantIds'], list):
         return jsonify({'success': False, 'message': 'Invalid participant IDs'}), 400
     
-    participant_ids = [int(pid) for pid in data['participantIds'] if int(pid) != user_id]
+    participant_ids = list(dict.fromkeys(int(pid) for pid in data['participantIds'] if int(pid) != user_id))
     
-    # For 1:1 chats, check if conversation already exists
+    if not participant_ids:
+        return jsonify({'success': False, 'message': 'Invalid participant IDs'}), 400
+    
+    # 1:1 chats are identified by their canonical pair key
+    direct_key = None
     if len(participant_ids) == 1:
-        other_user_id = participant_ids[0]
-        
-        # Find conversation where both users are participants and total participants is 2
-        # We use a subquery approach for better compatibility
-        
-        # Find conversations shared by both users
-        shared_convs = db.session.query(Conversation.id)\
-            .join(Conversation.participants)\
-            .filter(User.id.in_([user_id, other_user_id]))\
-            .group_by(Conversation.id)\
-            .having(db.func.count(User.id) == 2)\
-            .all()
-            
-        # Filter for conversations with EXACTLY 2 participants (to avoid group chats with these 2)
-        target_conv_id = None
-        for conv_id_tuple in shared_convs:
-            conv_id = conv_id_tuple[0]
-            
-            # Re-fetching to be safe and simple
-            conv = Conversation.query.get(conv_id)
-            if conv.participants and len(conv.participants) == 2:
-                target_conv_id = conv_id
-                break
-        
-        if target_conv_id:
-            existing = Conversation.query.get(target_conv_id)
+        direct_key = Conversation.make_direct_key(user_id, participant_ids[0])
+        existing = Conversation.query.filter_by(direct_key=direct_key).first()
+        if existing:
             return jsonify({
                 'success': True,
                 'conversation': existing.to_dict(user_id),
                 'isNew': False
             })
     
-    # Create new conversation
-    conversation = Conversation()
-    
-    # Add participants
     participants = User.query.filter(User.id.in_(participant_ids + [user_id])).all()
+    if len(participants) != len(participant_ids) + 1:
+        return jsonify({'success': False, 'message': 'User not found'}), 404
+    
+    # Create new conversation
+    conversation = Conversation(direct_key=direct_key)
     conversation.participants = participants
     
     db.session.add(conversation)
-    db.session.commit()
+    try:
+        db.session.flush()
+        record_change([p.id for p in participants], 'conversation', conversation.id)
+        db.session.commit()
+    except IntegrityError:
+        # Another request created the same 1:1 chat concurrently
+        db.session.rollback()
+        existing = Conversation.query.filter_by(direct_key=direct_key).first() if direct_key else None
+        if not existing:
+            raise
+        return jsonify({
+            'success': True,
+            'conversation': existing.to_dict(user_id),
+            'isNew': False
+        })
     
     return jsonify({
         'success': True,
@@ -94,6 +195,82 @@ def create_conversation():
         'isNew': True
     })
 
+def _with_read_state(items, read_cursors, user_id):
+    """
+    Derive isRead from the participants' read cursors.
+    My own messages are read once every other participant's cursor passed them.
+    """
+    my_cursor = read_cursors.get(str(user_id)) or 0
+    others = [cursor or 0 for uid, cursor in read_cursors.items() if uid != str(user_id)]
+    others_cursor = min(others) if others else 0
+    for item in items:
+        cursor = others_cursor if item['senderId'] == user_id else my_cursor
+        item['isRead'] = item['id'] <= cursor
+    return items
+
+
+def serialize_messages(messages, user_id, include_sender=True):
+    """Message dicts with isRead derived from their conversations' read cursors"""
+    read_cursors = {}
+    conversation_ids = {m.conversation_id for m in messages}
+    if conversation_ids:
+        for conversation_id, uid, cursor in db.session.query(
+            ConversationParticipant.conversation_id, ConversationParticipant.user_id,
+            ConversationParticipant.last_read_message_id
+        ).filter(ConversationParticipant.conversation_id.in_(conversation_ids)):
+            read_cursors.setdefault(conversation_id, {})[str(uid)] = cursor
+    return [
+        _with_read_state([m.to_dict(include_sender=include_sender)], read_cursors.get(m.conversation_id, {}), user_id)[0]
+        for m in messages
+    ]
+
+
+@bp.route('/conversations/<int:conversation_id>/read', methods=['POST'])
+@jwt_required()
+def mark_conversation_read(conversation_id):
+    """Advance the current user's read cursor in a conversation"""
+    user_id = int(get_jwt_identity())
+    data = request.get_json(silent=True) or {}
+    message_id = data.get('messageId') if isinstance(data, dict) else None
+    if message_id is not None and (not isinstance(message_id, int) or isinstance(message_id, bool)):
+        return jsonify({'success': False, 'message': 'messageId must be a message id'}), 400
+    
+    is_participant = ConversationParticipant.query.filter_by(
+        conversation_id=conversation_id, user_id=user_id
+    ).first() is not None
+    if not is_participant:
+        return jsonify({'success': False, 'message': 'Not authorized'}), 403
+    
+    # Default to the latest message of the conversation
+    if message_id is None:
+        message_id = db.session.query(db.func.max(Message.id)).filter(
+            Message.conversation_id == conversation_id
+        ).scalar()
+    elif not Message.query.filter_by(id=message_id, conversation_id=conversation_id).first():
+        return jsonify({'success': False, 'message': 'Message not found'}), 404
+    
+    advanced = bool(message_id) and counters.mark_conversation_read(user_id, conversation_id, message_id)
+    if advanced:
+        participant_ids = [
+            uid for (uid,) in db.session.query(ConversationParticipant.user_id)
+            .filter(ConversationParticipant.conversation_id == conversation_id)
+        ]
+        record_change(participant_ids, 'conversation', conversation_id)
+        db.session.commit()
+        emitter.emit('read_receipt', {
+            'conversationId': conversation_id,
+            'userId': user_id,
+            'lastReadMessageId': message_id
+        }, room=f"conversation_{conversation_id}")
+    
+    return jsonify({
+        'success': True,
+        'lastReadMessageId': message_id,
+        'advanced': advanced,
+        'unreadMessages': counters.get_counters(user_id).unread_messages
+    })
+
+
 @bp.route('/conversations/<int:conversation_id>', methods=['GET'])
 @jwt_required()
 def get_conversation(conversation_id):
@@ -106,34 +283,113 @@ def get_conversation(conversation_id):
     if user_id not in [p.id for p in conversation.participants]:
         return jsonify({'success': False, 'message': 'Not authorized'}), 403
     
-    # Mark messages as read
-    conversation.messages.filter(
-        Message.sender_id != user_id,
-        Message.is_read == False
-    ).update({'is_read': True}, synchronize_session=False)
-    
-    db.session.commit()
+    # Reading history is a pure read; clients advance their read cursor
+    # explicitly with POST /conversations/<id>/read
     
-    # Get messages with pagination
-    page = request.args.get('page', 1, type=int)
+    # Get messages with pagination; old pages come from the archive
+    page = max(request.args.get('page', 1, type=int), 1)
     per_page = min(request.args.get('per_page', 20, type=int), 50)
     
-    messages = conversation.messages.order_by(
-        Message.created_at.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
+    messages, total = archive.messages_page(conversation_id, page, per_page)
+    
+    conversation_data = conversation.to_dict(user_id)
     
     return jsonify({
         'success': True,
-        'conversation': conversation.to_dict(user_id),
+        'conversation': conversation_data,
         'messages': {
-            'items': [msg.to_dict() for msg in messages.items],
-            'page': messages.page,
-            'per_page': messages.per_page,
-            'total': messages.total,
-            'pages': messages.pages
+            'items': _with_read_state(
+                [msg.to_dict() for msg in messages], conversation_data['readCursors'], user_id
+            ),
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': -(-total // per_page)
         }
     })
 
+@bp.route('/conversations/<int:conversation_id>/messages', methods=['GET'])
+@jwt_required()
+def get_messages(conversation_id):
+    """
+    Page through a conversation's history by message id.
+    ?before_id=X returns the `limit` messages older than X (default: the latest),
+    ?after_id=Y the ones newer than Y. Messages come oldest-first and carry only
+    senderId; the senders are sideloaded once in `users`.
+    """
+    user_id = int(get_jwt_identity())
+    limit = min(request.args.get('limit', 30, type=int), 100)
+    before_id = request.args.get('before_id', type=int)
+    after_id = request.args.get('after_id', type=int)
+    
+    read_cursors = {
+        str(uid): cursor for uid, cursor in db.session.query(
+            ConversationParticipant.user_id, ConversationParticipant.last_read_message_id
+        ).filter(ConversationParticipant.conversation_id == conversation_id)
+    }
+    if str(user_id) not in read_cursors:
+        return jsonify({'success': False, 'message': 'Not authorized'}), 403
+    
+    # Pages continue into the archive once the hot table is exhausted
+    if after_id is not None:
+        messages, has_more = archive.messages_after(conversation_id, after_id, limit)
+    else:
+        messages, has_more = archive.messages_before(conversation_id, before_id, limit)
+        messages = list(reversed(messages))
+    
+    sender_ids = {m.sender_id for m in messages}
+    users = {
+        str(u.id): u.to_brief_dict()
+        for u in User.query.filter(User.id.in_(sender_ids))
+    } if sender_ids else {}
+    
+    return jsonify({
+        'success': True,
+        'messages': _with_read_state(
+            [m.to_dict(include_sender=False) for m in messages], read_cursors, user_id
+        ),
+        'users': users,
+        'readCursors': read_cursors,
+        'hasMore': has_more
+    })
+
+@bp.route('/messages/search', methods=['GET'])
+@jwt_required()
+def search_messages():
+    """
+    Full-text search over the caller's conversations, newest first.
+    ?q=<text>&cursor=<last message id>&conversationId=<optional>&limit=20
+    """
+    user_id = int(get_jwt_identity())
+    q = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 20, type=int), 50)
+    cursor = request.args.get('cursor', type=int)
+    conversation_id = request.args.get('conversationId', type=int)
+    
+    if len(q) < 2:
+        return jsonify({'success': False, 'message': 'Search query must be at least 2 characters'}), 400
+    
+    messages, snippets, has_more = search.search_messages(
+        user_id, q, before_id=cursor, limit=limit, conversation_id=conversation_id,
+        config=current_app.config['MESSAGE_SEARCH_CONFIG']
+    )
+    
+    sender_ids = {m.sender_id for m in messages}
+    users = {
+        str(u.id): u.to_brief_dict()
+        for u in User.query.filter(User.id.in_(sender_ids))
+    } if sender_ids else {}
+    
+    return jsonify({
+        'success': True,
+        'results': [
+            {**item, 'snippet': snippets[item['id']]}
+            for item in serialize_messages(messages, user_id, include_sender=False)
+        ],
+        'users': users,
+        'nextCursor': str(messages[-1].id) if has_more else None
+    })
+
 @bp.route('/conversations/<int:conversation_id>/messages', methods=['POST'])
 @jwt_required()
 def send_message(conversation_id):
@@ -158,22 +414,36 @@ def send_message(conversation_id):
     )
     
     # Update conversation's updated_at
-    conversation.updated_at = db.func.now()
+    conversation.updated_at = datetime.utcnow()
     
     db.session.add(message)
+    db.session.flush()
+    counters.record_new_message(conversation_id, user_id, message.id)
+    participant_ids = [p.id for p in conversation.participants]
+    record_change(participant_ids, 'message', message.id)
+    record_change(participant_ids, 'conversation', conversation_id)
     db.session.commit()
     
-    # Emit WebSocket event for real-time updates
-    socketio.emit('new_message', {
+    # Serialize once for both the broadcast and the response
+    payload = serialize_messages([message], user_id)[0]
+    emitter.emit('new_message', {
         'conversationId': conversation_id,
-        'message': message.to_dict()
+        'message': payload
     }, room=f"conversation_{conversation_id}")
     
     return jsonify({
         'success': True,
-        'message': message.to_dict()
+        'message': payload
     })
 
+def _record_connection_change(user_id, other_user_id, op='upsert'):
+    """Log a connection change for both sides; the entity is the other user"""
+    record_changes([
+        (user_id, 'connection', other_user_id, op),
+        (other_user_id, 'connection', user_id, op),
+    ])
+
+
 @bp.route('/connections', methods=['GET'])
 @jwt_required()
 def get_connections():
@@ -181,20 +451,8 @@ def get_connections():
     user_id = int(get_jwt_identity())
     
     # Get users who have an accepted connection with current user
-    connections = db.session.query(User).join(
-        user_connections,
-        and_(
-            or_(
-                user_connections.c.user_id == User.id,
-                user_connections.c.connected_user_id == User.id
-            ),
-            or_(
-                user_connections.c.user_id == user_id,
-                user_connections.c.connected_user_id == user_id
-            ),
-            user_connections.c.status == 'accepted'
-        )
-    ).filter(User.id != user_id).all()
+    connection_ids = graph.connection_ids(user_id)
+    connections = User.query.filter(User.id.in_(connection_ids)).all() if connection_ids else []
     
     return jsonify({
         'success': True,
@@ -222,6 +480,62 @@ def get_connection_requests():
         'requests': [user.to_dict() for user in requests]
     })
 
+def _lookup_user_ids(data):
+    """
+    The ids of a {'userIds': [1, 2, 3]} lookup body, or None when the body is
+    not shaped like that (a string is not a list of ids)
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('userIds', []), list):
+        return None
+    user_ids = data.get('userIds', [])
+    if not all(isinstance(uid, int) and not isinstance(uid, bool) for uid in user_ids):
+        return None
+    return set(user_ids)
+
+@bp.route('/connections/status', methods=['POST'])
+@jwt_required()
+def get_connection_statuses():
+    """
+    Connection status with many users at once.
+    Expects: {'userIds': [1, 2, 3]} (at most MAX_STATUS_LOOKUP ids)
+    """
+    user_id = int(get_jwt_identity())
+    user_ids = _lookup_user_ids(request.get_json(silent=True) or {})
+    if user_ids is None:
+        return jsonify({'success': False, 'message': 'userIds must be a list of user ids'}), 400
+    if len(user_ids) > MAX_STATUS_LOOKUP:
+        return jsonify({'success': False, 'message': f'At most {MAX_STATUS_LOOKUP} userIds per request'}), 400
+    
+    edges = graph.get_edges(user_id, user_ids - {user_id})
+    statuses = {}
+    for uid in user_ids:
+        status, is_requester = edges.get(uid, ('none', False))
+        statuses[str(uid)] = {'status': 'self' if uid == user_id else status, 'isRequester': is_requester}
+    
+    return jsonify({
+        'success': True,
+        'statuses': statuses
+    })
+
+@bp.route('/connections/degrees', methods=['POST'])
+@jwt_required()
+def get_connection_degrees():
+    """
+    Network distance to many users at once: 1, 2, 3 or null (further/none).
+    Expects: {'userIds': [1, 2, 3]} (at most MAX_STATUS_LOOKUP ids)
+    """
+    user_id = int(get_jwt_identity())
+    user_ids = _lookup_user_ids(request.get_json(silent=True) or {})
+    if user_ids is None:
+        return jsonify({'success': False, 'message': 'userIds must be a list of user ids'}), 400
+    if len(user_ids) > MAX_STATUS_LOOKUP:
+        return jsonify({'success': False, 'message': f'At most {MAX_STATUS_LOOKUP} userIds per request'}), 400
+    
+    return jsonify({
+        'success': True,
+        'degrees': {str(uid): degree for uid, degree in graph.degrees.degrees(user_id, user_ids).items()}
+    })
+
 @bp.route('/connections/<int:user_id>', methods=['POST'])
 @jwt_required()
 def send_connection_request(user_id):
@@ -235,18 +549,7 @@ def send_connection_request(user_id):
     user = User.query.get_or_404(user_id)
     
     # Check if connection already exists or is pending
-    existing = db.session.query(user_connections).filter(
-        or_(
-            and_(
-                user_connections.c.user_id == current_user_id,
-                user_connections.c.connected_user_id == user_id
-            ),
-            and_(
-                user_connections.c.user_id == user_id,
-                user_connections.c.connected_user_id == current_user_id
-            )
-        )
-    ).first()
+    existing = graph.get_edge(current_user_id, user_id)
     
     if existing:
         if existing.status == 'pending':
@@ -260,6 +563,8 @@ def send_connection_request(user_id):
         status='pending'
     )
     db.session.execute(stmt)
+    graph.mirror_connection(current_user_id, user_id, 'pending')
+    _record_connection_change(current_user_id, user_id)
     
     # TODO: Create notification for the recipient
     
@@ -281,6 +586,7 @@ def respond_to_connection_request(user_id):
         return jsonify({'success': False, 'message': 'Invalid action'}), 400
     
     # Find the connection request
+    status = 'accepted' if data['action'] == 'accept' else 'rejected'
     stmt = user_connections.update().where(
         and_(
             user_connections.c.user_id == user_id,
@@ -288,7 +594,7 @@ def respond_to_connection_request(user_id):
             user_connections.c.status == 'pending'
         )
     ).values(
-        status='accepted' if data['action'] == 'accept' else 'rejected',
+        status=status,
         reviewed_by=current_user_id,
         reviewed_at=db.func.now()
     )
@@ -298,7 +604,12 @@ def respond_to_connection_request(user_id):
     if result.rowcount == 0:
         return jsonify({'success': False, 'message': 'No pending request found'}), 404
     
+    graph.mirror_connection(user_id, current_user_id, status)
+    if status == 'accepted':
+        timeline.connect(current_user_id, user_id)
+    _record_connection_change(current_user_id, user_id)
     db.session.commit()
+    graph.invalidate(current_user_id, user_id)
     
     # TODO: Create notification for the requester
     
@@ -332,7 +643,11 @@ def remove_connection(user_id):
     if result.rowcount == 0:
         return jsonify({'success': False, 'message': 'No connection found'}), 404
     
+    graph.remove_edges(current_user_id, user_id)
+    timeline.disconnect(current_user_id, user_id)
+    _record_connection_change(current_user_id, user_id, op='delete')
     db.session.commit()
+    graph.invalidate(current_user_id, user_id)
     
     return jsonify({
         'success': True,
@@ -1,10 +1,17 @@
 """
 Notifications Routes
 """
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from app import db
-from app.models import Notification, User
+from app.models import Notification, User, company_followers
+from app.socket_events import user_room
+from app.utils import counters
+from app.utils.emitter import emitter
+from app.utils.sync import record_change, record_changes
 
 bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
 
@@ -26,13 +33,10 @@ def get_notifications():
     
     notifications = query.order_by(Notification.created_at.desc()).limit(limit).all()
     
-    # Get unread count
-    unread_count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
-    
     return jsonify({
         'success': True,
         'notifications': [n.to_dict() for n in notifications],
-        'unreadCount': unread_count
+        'unreadCount': counters.get_counters(user_id).unread_notifications
     })
 
 
@@ -42,11 +46,12 @@ def get_unread_count():
     """Get the count of unread notifications"""
     user_id = int(get_jwt_identity())
     
-    count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
+    user_counters = counters.get_counters(user_id)
     
     return jsonify({
         'success': True,
-        'count': count
+        'count': user_counters.unread_notifications,
+        'unreadMessages': user_counters.unread_messages
     })
 
 
@@ -70,10 +75,16 @@ def mark_as_read(notification_id):
             'message': 'You do not have permission to update this notification'
         }), 403
     
-    notification.is_read = True
-    
     try:
+        # Conditional update so two concurrent clicks only decrement once
+        updated = Notification.query.filter_by(id=notification_id, is_read=False).update(
+            {'is_read': True}, synchronize_session=False
+        )
+        counters.adjust('unread_notifications', {user_id: -updated})
+        if updated:
+            record_change([user_id], 'notification', notification_id)
         db.session.commit()
+        db.session.refresh(notification)
         return jsonify({
             'success': True,
             'notification': notification.to_dict()
@@ -93,7 +104,14 @@ def mark_all_as_read():
     user_id = int(get_jwt_identity())
     
     try:
-        Notification.query.filter_by(user_id=user_id, is_read=False).update({'is_read': True})
+        unread_ids = [
+            nid for (nid,) in db.session.query(Notification.id).filter_by(user_id=user_id, is_read=False)
+        ]
+        updated = Notification.query.filter(Notification.id.in_(unread_ids)).update(
+            {'is_read': True}, synchronize_session=False
+        ) if unread_ids else 0
+        counters.adjust('unread_notifications', {user_id: -updated})
+        record_changes([(user_id, 'notification', nid, 'upsert') for nid in unread_ids])
         db.session.commit()
         
         return jsonify({
@@ -129,6 +147,9 @@ def delete_notification(notification_id):
         }), 403
     
     try:
+        if not notification.is_read:
+            counters.adjust('unread_notifications', {user_id: -1})
+        record_change([user_id], 'notification', notification_id, op='delete')
         db.session.delete(notification)
         db.session.commit()
         return jsonify({
@@ -143,36 +164,125 @@ def delete_notification(notification_id):
         }), 500
 
 
-def create_notification(user_id: int, notification_type: str, title: str, message: str, link: str = None, data: dict = None):
+def create_notification(user_id: int, notification_type: str, title: str, message: str, link: str = None, data: dict = None, group_key: str = None):
     """Helper function to create a notification"""
-    notification = Notification(
-        user_id=user_id,
-        type=notification_type,
-        title=title,
-        message=message,
-        link=link,
-        data=data
-    )
-    db.session.add(notification)
-    return notification
+    return create_notifications([user_id], notification_type, title, message, link, data, group_key)[0]
+
+
+def create_notifications(user_ids, notification_type: str, title: str, message: str, link: str = None, data: dict = None, group_key: str = None):
+    """
+    Create the same notification for several users.
+    With a group_key, an unread notification of the same type and group created
+    inside NOTIFICATION_COALESCE_WINDOW is updated in place (count + 1, latest
+    content) instead of inserting a new row.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    now = datetime.utcnow()
+
+    coalescible = {}
+    if group_key and user_ids:
+        window_start = now - current_app.config['NOTIFICATION_COALESCE_WINDOW']
+        candidates = Notification.query.filter(
+            Notification.user_id.in_(user_ids),
+            Notification.type == notification_type,
+            Notification.group_key == group_key,
+            Notification.is_read == False,
+            Notification.created_at >= window_start
+        ).order_by(Notification.created_at.asc()).all()
+        # Latest row per user wins
+        coalescible = {n.user_id: n for n in candidates}
+
+    pending = db.session.info.setdefault('pending_notifications', [])
+    notifications = []
+    for user_id in user_ids:
+        notification = coalescible.get(user_id)
+        is_new = notification is None
+        if is_new:
+            notification = Notification(
+                user_id=user_id,
+                type=notification_type,
+                group_key=group_key,
+                count=1
+            )
+            db.session.add(notification)
+        else:
+            notification.count = (notification.count or 1) + 1
+
+        notification.title = title
+        notification.message = message
+        notification.link = link
+        notification.data = data
+        notification.created_at = now
+
+        pending.append((notification, is_new))
+        notifications.append(notification)
+
+    return notifications
+
+
+@event.listens_for(Session, 'before_commit')
+def _serialize_pending_notifications(session):
+    """Bump unread counters, log sync changes and build push payloads while the session can still run SQL"""
+    pending = session.info.pop('pending_notifications', None)
+    if not pending:
+        return
+
+    session.flush()
+
+    # Coalesced rows were already unread, so only new rows move the badge
+    deltas = {}
+    for n, is_new in pending:
+        if is_new:
+            deltas[n.user_id] = deltas.get(n.user_id, 0) + 1
+    counters.adjust('unread_notifications', deltas)
+    unread_counts = counters.get_unread_notifications({n.user_id for n, _ in pending})
+    record_changes([(n.user_id, 'notification', n.id, 'upsert') for n, _ in pending])
+
+    session.info['notification_pushes'] = {
+        'notifications': [(n.user_id, n.to_dict()) for n, _ in pending],
+        'unread_counts': unread_counts,
+    }
+
+
+@event.listens_for(Session, 'after_commit')
+def _push_committed_notifications(session):
+    """Deliver committed notifications to each recipient's socket room"""
+    pushes = session.info.pop('notification_pushes', None)
+    if not pushes:
+        return
+
+    for user_id, payload in pushes['notifications']:
+        emitter.emit('notification', payload, room=user_room(user_id))
+    for user_id, count in pushes['unread_counts'].items():
+        emitter.emit('unread_count', {'count': count}, room=user_room(user_id))
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_notifications(session, previous_transaction):
+    session.info.pop('pending_notifications', None)
+    session.info.pop('notification_pushes', None)
 
 
 def notify_company_followers_new_job(company, job):
     """Notify all followers of a company about a new job posting"""
-    for follower in company.followers:
-        create_notification(
-            user_id=follower.id,
-            notification_type='new_job',
-            title=f'New job at {company.name}',
-            message=f'{company.name} posted a new position: {job.title}',
-            link=f'/jobs/{job.id}',
-            data={
-                'companyId': company.id,
-                'companyName': company.name,
-                'jobId': job.id,
-                'jobTitle': job.title
-            }
-        )
+    follower_ids = [
+        uid for (uid,) in db.session.query(company_followers.c.user_id)
+        .filter(company_followers.c.company_id == company.id)
+    ]
+    create_notifications(
+        follower_ids,
+        notification_type='new_job',
+        title=f'New job at {company.name}',
+        message=f'{company.name} posted a new position: {job.title}',
+        link=f'/jobs/{job.id}',
+        data={
+            'companyId': company.id,
+            'companyName': company.name,
+            'jobId': job.id,
+            'jobTitle': job.title
+        },
+        group_key=f'company_{company.id}'
+    )
 
 
 def notify_application_status_change(application, old_status, new_status):
@@ -202,5 +312,6 @@ def notify_application_status_change(application, old_status, new_status):
             'companyName': company.name if company else None,
             'oldStatus': old_status,
             'newStatus': new_status
-        }
+        },
+        group_key=f'application_{application.id}'
     )
@@ -0,0 +1,62 @@
+"""
+Sync Routes
+"""
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models import ChangeLog
+from app.utils import sync
+
+bp = Blueprint('sync', __name__, url_prefix='/api/sync')
+
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+def get_changes():
+    """
+    Return what changed for the current user since a sync token.
+    Without `since` (or with an expired token) the client must reload its
+    full state; the response then only carries a fresh token.
+    """
+    user_id = int(get_jwt_identity())
+    since = request.args.get('since', type=int)
+    limit = max(1, min(request.args.get('limit', 500, type=int), 1000))
+
+    if since is None or sync.is_expired(since):
+        return jsonify({
+            'success': True,
+            'reset': True,
+            'token': str(sync.latest_token(user_id)),
+            'hasMore': False,
+            'changes': {f'{t}s': [] for t in sync.ENTITY_TYPES},
+            'deleted': {f'{t}s': [] for t in sync.ENTITY_TYPES},
+            'users': {}
+        })
+
+    changes = ChangeLog.query.filter(
+        ChangeLog.user_id == user_id,
+        ChangeLog.id > since
+    ).order_by(ChangeLog.id.asc()).limit(limit + 1).all()
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    # Only move the token past changes old enough that no transaction holding a
+    # lower id can still be in flight; newer ones are simply sent again next time
+    settled_before = datetime.utcnow() - timedelta(seconds=current_app.config['SYNC_SETTLE_SECONDS'])
+    token = since
+    for change in changes:
+        if change.created_at > settled_before:
+            break
+        token = change.id
+    # A full page that ends in unsettled changes still reports hasMore with the
+    # settled token: the client re-reads those rows (at most SYNC_SETTLE_SECONDS
+    # later they settle) rather than skipping lower ids still in flight
+
+    return jsonify({
+        'success': True,
+        'reset': False,
+        'token': str(token),
+        'hasMore': has_more,
+        **sync.build_changes(user_id, changes)
+    })
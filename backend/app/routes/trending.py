@@ -0,0 +1,74 @@
+"""
+Trending Routes
+"""
+from flask import Blueprint, request, jsonify
+from app import db
+from app.models import BlogPost, PostTag, TrendingSnapshot
+from app.utils.posts import current_viewer_id, serialize_posts
+from app.utils.trending import KINDS, tracker
+
+bp = Blueprint('trending', __name__, url_prefix='/api/trending')
+
+
+@bp.route('', methods=['GET'])
+def get_trending():
+    """
+    Top hashtags and mentions of the last TRENDING_WINDOW_MINUTES, served from memory.
+    ?kind=hashtag|mention&limit=10
+    """
+    kind = request.args.get('kind')
+    if kind and kind not in KINDS:
+        return jsonify({
+            'success': False,
+            'message': 'Invalid kind'
+        }), 400
+    limit = min(request.args.get('limit', 10, type=int), tracker.top_k)
+
+    return jsonify({
+        'success': True,
+        'topics': tracker.top(kind=kind, limit=limit),
+        'windowMinutes': tracker.window_minutes
+    })
+
+
+@bp.route('/history', methods=['GET'])
+def get_trending_history():
+    """Recent trending snapshots, newest first. ?limit=12"""
+    limit = min(request.args.get('limit', 12, type=int), 100)
+    snapshots = TrendingSnapshot.query.order_by(TrendingSnapshot.computed_at.desc()).limit(limit).all()
+
+    return jsonify({
+        'success': True,
+        'snapshots': [snapshot.to_dict() for snapshot in snapshots]
+    })
+
+
+@bp.route('/tags/<tag>', methods=['GET'])
+def get_tagged_posts(tag):
+    """
+    Posts with a hashtag (or mention), newest first.
+    ?kind=hashtag|mention&cursor=<last post id>&limit=20
+    """
+    kind = request.args.get('kind', 'hashtag')
+    if kind not in KINDS:
+        return jsonify({
+            'success': False,
+            'message': 'Invalid kind'
+        }), 400
+    limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+    cursor = request.args.get('cursor', type=int)
+
+    query = db.session.query(PostTag.post_id).filter(PostTag.kind == kind, PostTag.tag == tag.lstrip('#@').lower())
+    if cursor:
+        query = query.filter(PostTag.post_id < cursor)
+    post_ids = [post_id for (post_id,) in query.order_by(PostTag.post_id.desc()).limit(limit + 1)]
+    has_more = len(post_ids) > limit
+    post_ids = post_ids[:limit]
+
+    posts = {post.id: post for post in BlogPost.query.filter(BlogPost.id.in_(post_ids))} if post_ids else {}
+
+    return jsonify({
+        'success': True,
+        'posts': serialize_posts([posts[post_id] for post_id in post_ids if post_id in posts], current_viewer_id()),
+        'nextCursor': str(post_ids[-1]) if has_more else None
+    })
@@ -5,6 +5,7 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import User, Education, Experience, Skill, Project
+from app.utils import graph
 import google.generativeai as genai
 import os
 import json
@@ -39,20 +40,8 @@ def get_my_profile():
             'message': 'User not found'
         }), 404
     
-    # Get connection count
-    from app.models import user_connections
-    from sqlalchemy import or_
-    
-    connections_count = db.session.query(user_connections).filter(
-        or_(
-            user_connections.c.user_id == user_id,
-            user_connections.c.connected_user_id == user_id
-        ),
-        user_connections.c.status == 'accepted'
-    ).count()
-    
     user_data = user.to_dict()
-    user_data['connectionsCount'] = connections_count
+    user_data['connectionsCount'] = graph.connections_count(user_id)
 
     return jsonify({
         'success': True,
@@ -87,6 +76,24 @@ def get_users():
     })
 
 
+@bp.route('/presence', methods=['GET'])
+@jwt_required()
+def get_presence():
+    """Batch presence lookup: /api/users/presence?ids=1,2,3"""
+    from app.utils.presence import presence
+
+    try:
+        ids = [int(i) for i in request.args.get('ids', '').split(',') if i.strip()]
+    except ValueError:
+        return jsonify({'success': False, 'message': 'ids must be a comma-separated list of user ids'}), 400
+    if len(ids) > 200:
+        return jsonify({'success': False, 'message': 'At most 200 ids per request'}), 400
+    
+    return jsonify({
+        'success': True,
+        'presence': {str(uid): state for uid, state in presence.lookup(ids).items()}
+    })
+
 @bp.route('/<int:user_id>', methods=['GET'])
 @jwt_required()
 def get_user(user_id):
@@ -101,43 +108,13 @@ def get_user(user_id):
         }), 404
     
     # Check connection status
-    from app.models import user_connections
-    from sqlalchemy import and_, or_
-    
-    connection = db.session.query(user_connections).filter(
-        or_(
-            and_(
-                user_connections.c.user_id == current_user_id,
-                user_connections.c.connected_user_id == user_id
-            ),
-            and_(
-                user_connections.c.user_id == user_id,
-                user_connections.c.connected_user_id == current_user_id
-            )
-        )
-    ).first()
-    
-    status = 'none'
-    is_requester = False
+    edge = graph.get_edge(current_user_id, user_id)
     
-    if connection:
-        status = connection.status
-        if connection.user_id == current_user_id:
-            is_requester = True
-            
-    # Get connection count
-    connections_count = db.session.query(user_connections).filter(
-        or_(
-            user_connections.c.user_id == user_id,
-            user_connections.c.connected_user_id == user_id
-        ),
-        user_connections.c.status == 'accepted'
-    ).count()
-            
     response_data = user.to_dict()
-    response_data['connectionStatus'] = status
-    response_data['isRequester'] = is_requester
-    response_data['connectionsCount'] = connections_count
+    response_data['connectionStatus'] = edge.status if edge else 'none'
+    response_data['isRequester'] = bool(edge and edge.is_requester)
+    response_data['connectionsCount'] = graph.connections_count(user_id)
+    response_data['connectionDegree'] = graph.degrees.degrees(current_user_id, [user_id])[user_id]
     
     return jsonify({
         'success': True,
@@ -592,19 +569,30 @@ def delete_project(project_id):
 @bp.route('/suggestions', methods=['GET'])
 @jwt_required()
 def get_suggested_connections():
-    """Get suggested connections for current user"""
-    user_id = int(get_jwt_identity())
-    limit = request.args.get('limit', 5, type=int)
+    """Get suggested connections for current user (precomputed by the suggestions job)"""
+    from app.utils.suggestions import get_suggestions
     
-    # Get users that are not the current user
-    users = User.query.filter(
-        User.id != user_id,
-        User.status == 'active'
-    ).limit(limit).all()
+    user_id = int(get_jwt_identity())
+    limit = min(request.args.get('limit', 5, type=int), 50)
+    
+    suggestions = []
+    for suggestion, user in get_suggestions(user_id, limit):
+        data = user.to_dict()
+        data.update(suggestion.reasons())
+        suggestions.append(data)
+    
+    # New users have no second-degree connections yet
+    if not suggestions:
+        users = User.query.filter(
+            User.id != user_id,
+            User.status == 'active',
+            User.id.notin_(graph.connection_ids(user_id))
+        ).order_by(User.created_at.desc()).limit(limit).all()
+        suggestions = [user.to_dict() for user in users]
     
     return jsonify({
         'success': True,
-        'suggestions': [user.to_dict() for user in users]
+        'suggestions': suggestions
     })
 
 def clean_json(text):
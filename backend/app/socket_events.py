@@ -1,14 +1,44 @@
-from flask_socketio import emit, join_room, leave_room
+from flask_socketio import emit, join_room, leave_room, rooms
 from flask_jwt_extended import decode_token
-from flask import request
+from flask import request, session
 from app import socketio
+from app.utils.presence import presence, presence_room
+
+MAX_WATCHED_USERS = 200
+
+
+def user_room(user_id):
+    """Name of the private room every socket of a user joins on connect"""
+    return f"user_{user_id}"
+
 
 @socketio.on('connect')
-def handle_connect():
-    print(f'[Socket] Client connected: {request.sid}')
+def handle_connect(auth=None):
+    """
+    Authenticate the socket with the same JWT used for the REST API.
+    Expects auth: {'token': '<access token>'}
+    """
+    token = (auth or {}).get('token')
+    if not token:
+        print(f'[Socket] Rejected client without token: {request.sid}')
+        return False
+
+    try:
+        user_id = int(decode_token(token)['sub'])
+    except Exception as e:
+        print(f'[Socket] Rejected client {request.sid}: {e}')
+        return False
+
+    session['user_id'] = user_id
+    join_room(user_room(user_id))
+    presence.connect(user_id, request.sid)
+    print(f'[Socket] Client connected: {request.sid} (user {user_id})')
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    user_id = session.get('user_id')
+    if user_id:
+        presence.disconnect(user_id, request.sid)
     print(f'[Socket] Client disconnected: {request.sid}')
 
 @socketio.on('join')
@@ -17,8 +47,18 @@ def on_join(data):
     User joins a conversation room.
     Expects data: {'conversationId': 123}
     """
+    from app.models import ConversationParticipant
+
     conversation_id = data.get('conversationId')
-    if conversation_id:
+    user_id = session.get('user_id')
+    if conversation_id and user_id:
+        is_participant = ConversationParticipant.query.filter_by(
+            conversation_id=conversation_id, user_id=user_id
+        ).first() is not None
+        if not is_participant:
+            print(f'[Socket] User {user_id} denied room: conversation_{conversation_id}')
+            return
+
         room = f"conversation_{conversation_id}"
         join_room(room)
         print(f'[Socket] Client {request.sid} joined room: {room}')
@@ -34,3 +74,69 @@ def on_leave(data):
         room = f"conversation_{conversation_id}"
         leave_room(room)
         print(f'[Socket] Client {request.sid} left room: {room}')
+
+@socketio.on('typing')
+def on_typing(data):
+    """
+    Typing indicator for a joined conversation; kept in memory only.
+    Expects data: {'conversationId': 123, 'isTyping': true}
+    """
+    user_id = session.get('user_id')
+    conversation_id = (data or {}).get('conversationId')
+    # Joining the room already checked membership, so no query per keystroke
+    if not user_id or f"conversation_{conversation_id}" not in rooms():
+        return
+    presence.touch(user_id)
+    presence.set_typing(conversation_id, user_id, bool(data.get('isTyping', True)))
+
+def _user_ids(data):
+    """
+    Valid ids from a client's {'userIds': [...]}; anything that is not an integer
+    id is ignored. Stops after MAX_WATCHED_USERS + 1 ids, enough to tell that a
+    watch call is over the limit.
+    """
+    raw = (data or {}).get('userIds') if isinstance(data, dict) else None
+    if not isinstance(raw, list):
+        return []
+    user_ids = {}
+    for uid in raw:
+        if isinstance(uid, bool):
+            continue
+        if isinstance(uid, str) and uid.strip().isdigit():
+            uid = int(uid)
+        if isinstance(uid, int) and uid > 0:
+            user_ids[uid] = None
+        if len(user_ids) > MAX_WATCHED_USERS:
+            break
+    return list(user_ids)
+
+@socketio.on('watch_presence')
+def on_watch_presence(data):
+    """
+    Subscribe to presence changes of some users and get their current state.
+    Expects data: {'userIds': [1, 2, 3]}; a socket watches at most
+    MAX_WATCHED_USERS users in total, calls that would go over are rejected.
+    """
+    user_ids = _user_ids(data)
+    watched = {room for room in rooms() if room.startswith(presence_room(''))}
+    added = {presence_room(uid) for uid in user_ids} - watched
+    if len(watched) + len(added) > MAX_WATCHED_USERS:
+        emit('presence_error', {
+            'message': f'At most {MAX_WATCHED_USERS} watched users per connection',
+            'watching': len(watched)
+        })
+        return
+    for uid in user_ids:
+        join_room(presence_room(uid))
+    emit('presence_state', {
+        str(uid): state for uid, state in presence.lookup(user_ids).items()
+    })
+
+@socketio.on('unwatch_presence')
+def on_unwatch_presence(data):
+    """
+    Stop receiving presence changes of some users.
+    Expects data: {'userIds': [1, 2, 3]}
+    """
+    for uid in _user_ids(data):
+        leave_room(presence_room(uid))
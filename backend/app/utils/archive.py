@@ -0,0 +1,129 @@
+"""
+Message Archive
+
+Messages older than MESSAGE_ARCHIVE_DAYS are moved from `messages` into
+`messages_archive` in bounded batches (one commit per batch), keeping the hot
+table small. The newest message of every conversation always stays hot so
+conversation previews and read cursors keep working.
+
+History readers go through the helpers below, which page through the hot
+table first and continue into the archive when a user scrolls that far.
+Archived messages are not covered by the full-text search index.
+
+Run it with `flask archive-messages`, from cron, or from `flask run-scheduler`
+by setting MESSAGE_ARCHIVE_INTERVAL_HOURS.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy.orm import aliased
+from app import db, socketio
+from app.models import Message, MessageArchive
+
+COLUMNS = ['id', 'conversation_id', 'sender_id', 'content', 'is_read', 'created_at']
+
+
+def archive_messages(days=180, batch_size=1000, max_batches=None):
+    """Move messages older than `days` into messages_archive; returns rows moved"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    newer = aliased(Message)
+    moved = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        ids = [
+            mid for (mid,) in db.session.query(Message.id).filter(
+                Message.created_at < cutoff,
+                # Never archive the latest message of a conversation
+                db.session.query(newer.id).filter(
+                    newer.conversation_id == Message.conversation_id,
+                    newer.id > Message.id
+                ).exists()
+            ).order_by(Message.id).limit(batch_size)
+        ]
+        if not ids:
+            break
+
+        db.session.execute(MessageArchive.__table__.insert().from_select(
+            COLUMNS, db.select(*[getattr(Message, c) for c in COLUMNS]).where(Message.id.in_(ids))
+        ))
+        Message.query.filter(Message.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+        moved += len(ids)
+        batches += 1
+    return moved
+
+
+def messages_before(conversation_id, before_id=None, limit=30):
+    """
+    Up to `limit` messages older than before_id (default: the latest), newest
+    first, continuing into the archive. Returns (messages, has_more).
+    """
+    query = Message.query.filter(Message.conversation_id == conversation_id)
+    if before_id is not None:
+        query = query.filter(Message.id < before_id)
+    messages = query.order_by(Message.id.desc()).limit(limit + 1).all()
+
+    if len(messages) <= limit:
+        boundary = messages[-1].id if messages else before_id
+        archived = MessageArchive.query.filter(MessageArchive.conversation_id == conversation_id)
+        if boundary is not None:
+            archived = archived.filter(MessageArchive.id < boundary)
+        messages += archived.order_by(MessageArchive.id.desc()).limit(limit + 1 - len(messages)).all()
+
+    return messages[:limit], len(messages) > limit
+
+
+def messages_after(conversation_id, after_id, limit=30):
+    """Up to `limit` messages newer than after_id, oldest first. Returns (messages, has_more)."""
+    messages = MessageArchive.query.filter(
+        MessageArchive.conversation_id == conversation_id,
+        MessageArchive.id > after_id
+    ).order_by(MessageArchive.id.asc()).limit(limit + 1).all()
+
+    if len(messages) <= limit:
+        messages += Message.query.filter(
+            Message.conversation_id == conversation_id,
+            Message.id > after_id
+        ).order_by(Message.id.asc()).limit(limit + 1 - len(messages)).all()
+
+    return messages[:limit], len(messages) > limit
+
+
+def messages_page(conversation_id, page=1, per_page=20):
+    """Offset page over hot + archived messages, newest first. Returns (messages, total)."""
+    hot_total = Message.query.filter(Message.conversation_id == conversation_id).count()
+    archived_total = MessageArchive.query.filter(MessageArchive.conversation_id == conversation_id).count()
+    offset = (page - 1) * per_page
+
+    messages = []
+    if offset < hot_total:
+        messages = Message.query.filter(
+            Message.conversation_id == conversation_id
+        ).order_by(Message.id.desc()).offset(offset).limit(per_page).all()
+    if len(messages) < per_page and archived_total:
+        messages += MessageArchive.query.filter(
+            MessageArchive.conversation_id == conversation_id
+        ).order_by(MessageArchive.id.desc()).offset(max(offset - hot_total, 0)).limit(per_page - len(messages)).all()
+
+    return messages, hot_total + archived_total
+
+
+def start_archive_scheduler(app):
+    """Archive old messages every MESSAGE_ARCHIVE_INTERVAL_HOURS in a background task"""
+    interval_hours = app.config.get('MESSAGE_ARCHIVE_INTERVAL_HOURS', 0)
+    days = app.config.get('MESSAGE_ARCHIVE_DAYS', 0)
+    if not interval_hours or not days:
+        return None
+
+    def run():
+        while True:
+            socketio.sleep(interval_hours * 3600)
+            with app.app_context():
+                try:
+                    moved = archive_messages(days=days)
+                    print(f"[Archive] Messages archived: {moved}")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[Archive] Failed to archive messages: {e}")
+
+    return socketio.start_background_task(run)
@@ -0,0 +1,86 @@
+"""
+Socket.IO Backplane
+
+With several gunicorn/eventlet workers (or several nodes) a client is only
+connected to one process, so an emit to `conversation_<id>` or `user_<id>`
+has to be relayed to every other process. SOCKETIO_MESSAGE_QUEUE selects the
+pub/sub backend used for that relay:
+
+    redis://host:6379/0     Redis (or any Redis-protocol server)
+    amqp://user:pw@host//   RabbitMQ and the other Kombu transports
+    kafka://host:9092       Kafka
+    memory://               In-process bus shared by every server created in
+                            the same Python process (tests and benchmarks)
+
+Leave it unset to run a single worker without a backplane.
+"""
+import pickle
+import queue
+import threading
+
+import socketio as python_socketio
+
+
+class InProcessManager(python_socketio.PubSubManager):
+    """
+    Pub/sub client manager backed by in-memory queues.
+
+    Every manager subscribed to the same channel in this process receives
+    every published message, exactly like separate workers sharing a Redis
+    channel. Messages are pickled on the way through so no state is shared
+    between "workers" by accident.
+    """
+    name = 'memory'
+
+    _lock = threading.Lock()
+    _subscribers = {}
+
+    def __init__(self, url='memory://', channel='flask-socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._queue = queue.Queue()
+        if not write_only:
+            with self._lock:
+                self._subscribers.setdefault(channel, []).append(self._queue)
+
+    def _publish(self, data):
+        payload = pickle.dumps(data)
+        with self._lock:
+            subscribers = list(self._subscribers.get(self.channel, []))
+        for subscriber in subscribers:
+            subscriber.put(payload)
+
+    def _listen(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            yield message
+
+    def close(self):
+        """Unsubscribe and stop the listener (used when tearing down tests)"""
+        with self._lock:
+            subscribers = self._subscribers.get(self.channel, [])
+            if self._queue in subscribers:
+                subscribers.remove(self._queue)
+        self._queue.put(None)
+
+    @classmethod
+    def reset(cls, channel=None):
+        """Drop every subscriber of a channel (or of all channels)"""
+        with cls._lock:
+            channels = [channel] if channel else list(cls._subscribers)
+            for name in channels:
+                for subscriber in cls._subscribers.pop(name, []):
+                    subscriber.put(None)
+
+
+def socketio_options(config):
+    """Keyword arguments for SocketIO.init_app derived from the app config"""
+    url = config.get('SOCKETIO_MESSAGE_QUEUE')
+    channel = config.get('SOCKETIO_CHANNEL', 'flask-socketio')
+    if not url:
+        # The socketio singleton keeps options across init_app calls; drop a queue set up by an earlier app
+        return {'client_manager': None}
+    if url.startswith('memory://'):
+        return {'client_manager': InProcessManager(url, channel=channel)}
+    return {'message_queue': url, 'channel': channel}
@@ -0,0 +1,193 @@
+"""
+Per-user unread counters
+
+Badges read a single `user_counters` row instead of running COUNT(*) over
+notifications and messages. Every write path that changes what is unread
+adjusts the counters inside its own transaction, so they commit (or roll
+back) together with the rows they describe.
+"""
+from sqlalchemy import case
+from app import db
+from app.models import UserCounter, Notification, Message, ConversationParticipant
+from app.utils.dialect import upsert
+
+FIELDS = ('unread_notifications', 'unread_messages')
+
+
+def _initial_values(user_ids):
+    """Count unread rows the slow way; only used to backfill counters"""
+    notifications = dict(
+        db.session.query(Notification.user_id, db.func.count(Notification.id))
+        .filter(Notification.user_id.in_(user_ids), Notification.is_read == False)
+        .group_by(Notification.user_id)
+        .all()
+    )
+    messages = dict(
+        db.session.query(ConversationParticipant.user_id, db.func.sum(ConversationParticipant.unread_count))
+        .filter(ConversationParticipant.user_id.in_(user_ids))
+        .group_by(ConversationParticipant.user_id)
+        .all()
+    )
+    return [
+        {
+            'user_id': uid,
+            'unread_notifications': notifications.get(uid, 0),
+            'unread_messages': messages.get(uid) or 0,
+        }
+        for uid in user_ids
+    ]
+
+
+def ensure_counters(user_ids):
+    """
+    Create missing counters rows at zero.
+    Rows are never seeded from COUNT(*) here: that would race with the writes
+    of the current transaction. Run `flask rebuild-counters` once to backfill
+    users that existed before the counters table.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    rows = [{'user_id': uid, 'unread_notifications': 0, 'unread_messages': 0} for uid in user_ids]
+    stmt = upsert(UserCounter.__table__).values(rows)
+    db.session.execute(stmt.on_conflict_do_nothing(index_elements=['user_id']))
+
+
+def adjust(field, deltas):
+    """
+    Atomically add deltas to a counter.
+    deltas: {user_id: delta}; the counter never drops below zero.
+    """
+    if field not in FIELDS:
+        raise ValueError(f'Unknown counter: {field}')
+
+    deltas = {uid: d for uid, d in deltas.items() if d}
+    if not deltas:
+        return
+
+    ensure_counters(deltas.keys())
+
+    column = getattr(UserCounter, field)
+    # Group users by delta so a fan-out of +1 to N users is a single UPDATE
+    by_delta = {}
+    for uid, delta in deltas.items():
+        by_delta.setdefault(delta, []).append(uid)
+
+    for delta, uids in by_delta.items():
+        db.session.query(UserCounter).filter(UserCounter.user_id.in_(uids)).update(
+            {column: case((column + delta < 0, 0), else_=column + delta)},
+            synchronize_session=False
+        )
+
+
+def get_counters(user_id):
+    """Return the counters row for a user (an unsaved zero row if there is none yet)"""
+    counters = db.session.get(UserCounter, user_id)
+    if counters is None:
+        counters = UserCounter(user_id=user_id, unread_notifications=0, unread_messages=0)
+    return counters
+
+
+def get_unread_notifications(user_ids):
+    """Batch lookup: {user_id: unread notification count}"""
+    found = dict(
+        db.session.query(UserCounter.user_id, UserCounter.unread_notifications)
+        .filter(UserCounter.user_id.in_(user_ids))
+        .all()
+    )
+    return {uid: found.get(uid, 0) for uid in user_ids}
+
+
+def mark_conversation_read(user_id, conversation_id, message_id):
+    """
+    Advance a participant's read cursor to message_id and recompute their
+    unread count for the conversation. The cursor only ever moves forward;
+    returns False when it was already at or past message_id.
+    """
+    advanced = ConversationParticipant.query.filter(
+        ConversationParticipant.user_id == user_id,
+        ConversationParticipant.conversation_id == conversation_id,
+        db.or_(
+            ConversationParticipant.last_read_message_id.is_(None),
+            ConversationParticipant.last_read_message_id < message_id
+        )
+    ).update({'last_read_message_id': message_id}, synchronize_session=False)
+    if not advanced:
+        return False
+
+    participant = ConversationParticipant.query.filter_by(
+        user_id=user_id, conversation_id=conversation_id
+    ).with_for_update().populate_existing().first()
+    remaining = db.session.query(db.func.count(Message.id)).filter(
+        Message.conversation_id == conversation_id,
+        Message.sender_id != user_id,
+        Message.id > message_id
+    ).scalar() if participant.unread_count else 0
+
+    delta = remaining - participant.unread_count
+    if delta:
+        participant.unread_count = remaining
+        adjust('unread_messages', {user_id: delta})
+    return True
+
+
+def record_new_message(conversation_id, sender_id, message_id):
+    """
+    Bump the unread counts of every other participant of a conversation.
+    Sending a message implies the sender has read everything before it.
+    """
+    mark_conversation_read(sender_id, conversation_id, message_id)
+
+    recipient_ids = [
+        uid for (uid,) in db.session.query(ConversationParticipant.user_id).filter(
+            ConversationParticipant.conversation_id == conversation_id,
+            ConversationParticipant.user_id != sender_id
+        )
+    ]
+    if not recipient_ids:
+        return []
+
+    ConversationParticipant.query.filter(
+        ConversationParticipant.conversation_id == conversation_id,
+        ConversationParticipant.user_id.in_(recipient_ids)
+    ).update(
+        {ConversationParticipant.unread_count: ConversationParticipant.unread_count + 1},
+        synchronize_session=False
+    )
+    adjust('unread_messages', {uid: 1 for uid in recipient_ids})
+    return recipient_ids
+
+
+def rebuild_counters():
+    """Recompute every counters row from scratch (backfill / repair)"""
+    from app.models import User
+
+    # Participants from before read cursors existed start at their last message flagged is_read
+    legacy_cursor = db.session.query(db.func.max(Message.id)).filter(
+        Message.conversation_id == ConversationParticipant.conversation_id,
+        Message.sender_id != ConversationParticipant.user_id,
+        Message.is_read == True
+    ).scalar_subquery()
+    ConversationParticipant.query.filter(
+        ConversationParticipant.last_read_message_id.is_(None)
+    ).update(
+        {ConversationParticipant.last_read_message_id: legacy_cursor},
+        synchronize_session=False
+    )
+
+    unread_in_conversation = db.session.query(db.func.count(Message.id)).filter(
+        Message.conversation_id == ConversationParticipant.conversation_id,
+        Message.sender_id != ConversationParticipant.user_id,
+        Message.id > db.func.coalesce(ConversationParticipant.last_read_message_id, 0)
+    ).scalar_subquery()
+    ConversationParticipant.query.update(
+        {ConversationParticipant.unread_count: unread_in_conversation},
+        synchronize_session=False
+    )
+
+    user_ids = [uid for (uid,) in db.session.query(User.id)]
+    db.session.query(UserCounter).delete(synchronize_session=False)
+    if user_ids:
+        db.session.execute(UserCounter.__table__.insert(), _initial_values(user_ids))
+    return len(user_ids)
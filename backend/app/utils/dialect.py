@@ -0,0 +1,34 @@
+"""
+Database dialect helpers
+"""
+from app import db
+
+
+def dialect_name():
+    """Name of the dialect behind the current session ('sqlite', 'postgresql', ...)"""
+    return db.session.get_bind().dialect.name
+
+
+def upsert(table):
+    """INSERT construct supporting on_conflict_do_nothing / on_conflict_do_update"""
+    if dialect_name() == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def toggle_row(table, **key):
+    """
+    Delete the association row identified by `key`, or insert it if there was
+    none, without loading the collection. Returns (present, changed): whether
+    the row exists afterwards and whether this call changed anything (a
+    concurrent toggle may have inserted it first).
+    """
+    deleted = db.session.execute(
+        table.delete().where(*[table.c[name] == value for name, value in key.items()])
+    ).rowcount
+    if deleted:
+        return False, True
+    inserted = db.session.execute(upsert(table).values(**key).on_conflict_do_nothing()).rowcount
+    return True, bool(inserted)
@@ -0,0 +1,86 @@
+"""
+Notification Digest
+
+Periodic email summary of unread notifications for users who opted in with
+`notificationDigest`. Meant to be run from cron / a scheduler:
+
+    flask send-digest --hours 24
+"""
+from datetime import datetime, timedelta
+from html import escape
+from flask import current_app
+from flask_mail import Message
+from app import db, mail
+from app.models import Notification, User
+
+MAX_ITEMS_PER_DIGEST = 20
+
+
+def _render_digest(user, notifications, frontend_url):
+    items = ''.join(
+        f'''
+        <li style="margin-bottom: 12px;">
+            <a href="{escape(frontend_url + (n.link or '/'))}" style="color: #4F46E5; text-decoration: none;">
+                <strong>{escape(n.title or '')}</strong>
+            </a>
+            {f'<span style="color: #999;">(+{n.count - 1} more)</span>' if (n.count or 1) > 1 else ''}
+            <br><span style="color: #666;">{escape(n.message or '')}</span>
+        </li>'''
+        for n in notifications[:MAX_ITEMS_PER_DIGEST]
+    )
+    remaining = len(notifications) - MAX_ITEMS_PER_DIGEST
+    more = f'<p style="color: #666;">And {remaining} more on HustConnect.</p>' if remaining > 0 else ''
+
+    return f'''
+    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+        <h2 style="color: #333;">Your HustConnect digest</h2>
+        <p>Hi {escape(user.name or '')}, here is what you missed:</p>
+        <ul style="padding-left: 20px;">{items}</ul>
+        {more}
+        <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
+        <p style="color: #999; font-size: 12px;">
+            © HustConnect - Professional Networking Platform
+        </p>
+    </div>
+    '''
+
+
+def send_notification_digests(hours=24):
+    """
+    Email every opted-in user the unread notifications received since their
+    last digest (or the last `hours` hours). Returns the number of digests sent.
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(hours=hours)
+    frontend_url = current_app.config.get('FRONTEND_URL', 'http://localhost:5173')
+
+    # One query for every digest recipient instead of one per user
+    rows = db.session.query(User, Notification).join(
+        Notification, Notification.user_id == User.id
+    ).filter(
+        User.notification_digest == True,
+        User.status == 'active',
+        Notification.is_read == False,
+        Notification.created_at > db.func.coalesce(User.last_digest_at, cutoff)
+    ).order_by(User.id, Notification.created_at.desc()).all()
+
+    by_user = {}
+    for user, notification in rows:
+        by_user.setdefault(user, []).append(notification)
+
+    sent = 0
+    for user, notifications in by_user.items():
+        try:
+            msg = Message(
+                subject=f"You have {len(notifications)} new notification{'s' if len(notifications) != 1 else ''} on HustConnect",
+                recipients=[user.email],
+                html=_render_digest(user, notifications, frontend_url)
+            )
+            mail.send(msg)
+            user.last_digest_at = now
+            sent += 1
+        except Exception as e:
+            print(f"[ERROR] Failed to send digest to {user.email}: {e}")
+
+    db.session.commit()
+    return sent
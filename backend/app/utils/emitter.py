@@ -0,0 +1,105 @@
+"""
+Socket Emit Queue
+
+Route handlers hand their Socket.IO emits to `emitter` instead of calling
+`socketio.emit` inline, so an HTTP response never waits on room fan-out or
+on the message-queue backplane. A single background task (a green thread
+under eventlet, a thread otherwise) drains the queue in batches.
+
+The queue is bounded by SOCKET_EMIT_QUEUE_SIZE. When it is full the emit is
+done inline by the caller: the request slows down instead of events being
+dropped, and the `overflowed` counter shows it. Set the size to 0 to always
+emit inline (tests, scripts).
+"""
+import threading
+import time
+
+from app import socketio
+
+
+class EmitQueue:
+    """Bounded background dispatcher for socketio.emit"""
+
+    def __init__(self, maxsize=10000, batch_size=100):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self._queue = None
+        self._queue_empty = None
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'emitted': 0,
+            'overflowed': 0,
+            'failed': 0,
+            'batches': 0,
+            'maxDepth': 0,
+            'maxLagMs': 0.0,
+        }
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('SOCKET_EMIT_QUEUE_SIZE', self.maxsize)
+        self.batch_size = app.config.get('SOCKET_EMIT_BATCH_SIZE', self.batch_size)
+
+    def emit(self, event, data, room=None):
+        """Queue an emit; falls back to emitting inline when the queue is full"""
+        if not self.maxsize:
+            socketio.emit(event, data, room=room)
+            return
+
+        self._ensure_worker()
+        depth = self._queue.qsize()
+        if depth >= self.maxsize:
+            self._stats['overflowed'] += 1
+            self._send(event, data, room)
+            return
+
+        self._queue.put((event, data, room, time.monotonic()))
+        self._stats['enqueued'] += 1
+        self._stats['maxDepth'] = max(self._stats['maxDepth'], depth + 1)
+
+    def stats(self):
+        """Counters plus the current queue depth"""
+        return {
+            **self._stats,
+            'depth': self._queue.qsize() if self._queue is not None else 0,
+            'capacity': self.maxsize,
+        }
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                # Queue and task must match the server's async mode (eventlet/threading)
+                self._queue = socketio.server.eio.create_queue()
+                self._queue_empty = socketio.server.eio.get_queue_empty_exception()
+                self._worker = socketio.start_background_task(self._run)
+
+    def _send(self, event, data, room):
+        try:
+            socketio.emit(event, data, room=room)
+            self._stats['emitted'] += 1
+        except Exception as e:
+            self._stats['failed'] += 1
+            print(f"[Socket] Emit of '{event}' failed: {e}")
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except self._queue_empty:
+                    break
+
+            now = time.monotonic()
+            self._stats['batches'] += 1
+            self._stats['maxLagMs'] = max(self._stats['maxLagMs'], (now - batch[0][3]) * 1000)
+            for event, data, room, _ in batch:
+                self._send(event, data, room)
+            # Let request handlers run between batches under eventlet
+            socketio.sleep(0)
+
+
+emitter = EmitQueue()
@@ -0,0 +1,147 @@
+"""
+Engagement Scores
+
+`BlogPost.engagement_score` is the sum of a post's engagement points, each
+decaying exponentially with half-life FEED_SCORE_HALF_LIFE_HOURS:
+
+- write paths add (or remove) points with one atomic UPDATE per event;
+- a periodic sweep multiplies every non-zero score by the decay accumulated
+  since the previous sweep and zeroes scores that became negligible.
+
+The Top feed then reads posts straight off the (engagement_score, id) index.
+The sweep records its time in `job_runs` with a compare-and-set, so running
+it from several workers (or cron) never decays twice.
+"""
+from datetime import datetime
+from sqlalchemy import case
+from flask import current_app
+from app import db, socketio
+from app.models import BlogPost, Comment, JobRun, post_likes
+
+POINTS = {'post': 1.0, 'like': 1.0, 'comment': 2.0, 'repost': 3.0}
+MIN_SCORE = 0.01
+JOB_NAME = 'engagement_decay'
+SWEEP_BATCH = 5000
+
+
+def bump(post_id, event, sign=1, at=None):
+    """
+    Add (sign=1) or remove (sign=-1) the points of an engagement event. When
+    removing, pass the time `at` of the original event so only the part of its
+    points that has not decayed yet is taken off.
+    """
+    delta = POINTS[event] * sign
+    if sign < 0 and at is not None:
+        delta *= _remaining_share(at)
+    column = BlogPost.engagement_score
+    db.session.query(BlogPost).filter(BlogPost.id == post_id).update(
+        {column: case((column + delta < 0, 0.0), else_=column + delta)},
+        synchronize_session=False
+    )
+
+
+def _factor(hours):
+    half_life = current_app.config['FEED_SCORE_HALF_LIFE_HOURS']
+    return 0.5 ** (hours / half_life)
+
+
+def _remaining_share(at):
+    """Share of an event's points still in the score: scores decay at each sweep"""
+    last_sweep = db.session.query(JobRun.last_run_at).filter(JobRun.name == JOB_NAME).scalar()
+    if last_sweep is None or at >= last_sweep:
+        return 1.0
+    return _factor((last_sweep - at).total_seconds() / 3600)
+
+
+def decay_scores(now=None):
+    """Apply the decay accumulated since the last sweep; returns the factor applied"""
+    now = now or datetime.utcnow()
+    state = db.session.get(JobRun, JOB_NAME)
+    if state is None:
+        db.session.add(JobRun(name=JOB_NAME, last_run_at=now))
+        db.session.commit()
+        return 1.0
+
+    previous = state.last_run_at
+    # Claim the interval; a concurrent sweep that got there first wins
+    claimed = db.session.query(JobRun).filter(
+        JobRun.name == JOB_NAME, JobRun.last_run_at == previous
+    ).update({JobRun.last_run_at: now}, synchronize_session=False)
+    db.session.commit()
+    if not claimed or now <= previous:
+        return 1.0
+
+    factor = _factor((now - previous).total_seconds() / 3600)
+    column = BlogPost.engagement_score
+    last_id = 0
+    while True:
+        ids = [pid for (pid,) in db.session.query(BlogPost.id).filter(
+            BlogPost.id > last_id, column > 0
+        ).order_by(BlogPost.id).limit(SWEEP_BATCH)]
+        if not ids:
+            break
+        db.session.query(BlogPost).filter(BlogPost.id.in_(ids)).update(
+            {column: case((column * factor < MIN_SCORE, 0.0), else_=column * factor)},
+            synchronize_session=False
+        )
+        db.session.commit()
+        last_id = ids[-1]
+    return factor
+
+
+def rebuild_scores(now=None):
+    """
+    Recompute every score from likes, comments and reposts, each decayed from
+    its own time (likes without a timestamp from the post's creation time).
+    """
+    now = now or datetime.utcnow()
+    age_factor = lambda created_at: _factor(max((now - created_at).total_seconds(), 0) / 3600) if created_at else 0.0
+
+    scores = {}
+    for post_id, created_at in db.session.query(BlogPost.id, BlogPost.created_at):
+        scores[post_id] = POINTS['post'] * age_factor(created_at)
+    for post_id, liked_at, created_at in db.session.query(
+        post_likes.c.post_id, post_likes.c.created_at, BlogPost.created_at
+    ).join(BlogPost, BlogPost.id == post_likes.c.post_id):
+        scores[post_id] += POINTS['like'] * age_factor(liked_at or created_at)
+    for post_id, created_at in db.session.query(Comment.post_id, Comment.created_at):
+        if post_id in scores:
+            scores[post_id] += POINTS['comment'] * age_factor(created_at)
+    for post_id, created_at in db.session.query(BlogPost.original_post_id, BlogPost.created_at).filter(
+        BlogPost.original_post_id.isnot(None)
+    ):
+        if post_id in scores:
+            scores[post_id] += POINTS['repost'] * age_factor(created_at)
+
+    rows = [{'post_id': pid, 'score': score if score >= MIN_SCORE else 0.0} for pid, score in scores.items()]
+    table = BlogPost.__table__
+    stmt = table.update().where(table.c.id == db.bindparam('post_id')).values(engagement_score=db.bindparam('score'))
+    for start in range(0, len(rows), SWEEP_BATCH):
+        db.session.execute(stmt, rows[start:start + SWEEP_BATCH])
+
+    state = db.session.get(JobRun, JOB_NAME)
+    if state is None:
+        db.session.add(JobRun(name=JOB_NAME, last_run_at=now))
+    else:
+        state.last_run_at = now
+    db.session.commit()
+    return len(rows)
+
+
+def start_decay_scheduler(app):
+    """Run the decay sweep every FEED_DECAY_INTERVAL_MINUTES in a background task"""
+    interval_minutes = app.config.get('FEED_DECAY_INTERVAL_MINUTES', 0)
+    if not interval_minutes:
+        return None
+
+    def run():
+        while True:
+            socketio.sleep(interval_minutes * 60)
+            with app.app_context():
+                try:
+                    decay_scores()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[Engagement] Decay sweep failed: {e}")
+
+    return socketio.start_background_task(run)
@@ -0,0 +1,254 @@
+"""
+Connection Graph
+
+`user_connections` stores one row per request (requester -> recipient), which
+forces OR queries over both columns. Every write to it is mirrored into
+`connection_edges` as two directed rows, so reads are plain lookups on
+(user_id, status).
+
+Accepted neighbours are additionally cached in memory per worker, together
+with each viewer's second-degree frontier for network-distance badges. Writers
+call `invalidate` for both ends after committing; other workers pick the
+change up when their entries expire after CONNECTION_CACHE_TTL_SECONDS.
+"""
+import threading
+import time
+from collections import OrderedDict
+from app import db
+from app.models import connection_edges, user_connections
+from app.utils.dialect import upsert
+
+
+# ---------------------------------------------------------------------------
+# Edges
+# ---------------------------------------------------------------------------
+
+def mirror_connection(requester_id, recipient_id, status):
+    """Write both directed edges of a connection row"""
+    stmt = upsert(connection_edges)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'other_user_id'],
+        set_={'status': stmt.excluded.status, 'is_requester': stmt.excluded.is_requester}
+    )
+    db.session.execute(stmt, [
+        {'user_id': requester_id, 'other_user_id': recipient_id, 'status': status, 'is_requester': True},
+        {'user_id': recipient_id, 'other_user_id': requester_id, 'status': status, 'is_requester': False},
+    ])
+
+
+def remove_edges(user_id, other_user_id):
+    db.session.execute(connection_edges.delete().where(db.or_(
+        db.and_(connection_edges.c.user_id == user_id, connection_edges.c.other_user_id == other_user_id),
+        db.and_(connection_edges.c.user_id == other_user_id, connection_edges.c.other_user_id == user_id)
+    )))
+
+
+def get_edge(user_id, other_user_id):
+    """The edge as seen from user_id (status, is_requester), or None"""
+    return db.session.query(
+        connection_edges.c.status, connection_edges.c.is_requester
+    ).filter(
+        connection_edges.c.user_id == user_id,
+        connection_edges.c.other_user_id == other_user_id
+    ).first()
+
+
+def get_edges(user_id, other_user_ids):
+    """{other_user_id: (status, is_requester)} for the given users, one IN-list query"""
+    if not other_user_ids:
+        return {}
+    return {
+        other_id: (status, is_requester)
+        for other_id, status, is_requester in db.session.query(
+            connection_edges.c.other_user_id, connection_edges.c.status, connection_edges.c.is_requester
+        ).filter(
+            connection_edges.c.user_id == user_id,
+            connection_edges.c.other_user_id.in_(other_user_ids)
+        )
+    }
+
+
+def rebuild_edges():
+    """Recreate connection_edges from user_connections; returns edges written"""
+    db.session.execute(connection_edges.delete())
+    rows = db.session.query(
+        user_connections.c.user_id, user_connections.c.connected_user_id,
+        user_connections.c.status, user_connections.c.created_at
+    ).all()
+    edges = []
+    for requester_id, recipient_id, status, created_at in rows:
+        status = status or 'pending'
+        edges.append({'user_id': requester_id, 'other_user_id': recipient_id,
+                      'status': status, 'is_requester': True, 'created_at': created_at})
+        edges.append({'user_id': recipient_id, 'other_user_id': requester_id,
+                      'status': status, 'is_requester': False, 'created_at': created_at})
+    if edges:
+        db.session.execute(connection_edges.insert(), edges)
+    db.session.commit()
+    adjacency.clear()
+    degrees.clear()
+    return len(edges)
+
+
+# ---------------------------------------------------------------------------
+# Adjacency cache
+# ---------------------------------------------------------------------------
+
+class AdjacencyCache:
+    """Bounded LRU of user_id -> frozenset of accepted connection ids"""
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('CONNECTION_CACHE_SIZE', self.max_entries)
+        self.ttl = app.config.get('CONNECTION_CACHE_TTL_SECONDS', self.ttl)
+
+    def get(self, user_id):
+        return self.get_many([user_id])[user_id]
+
+    def get_many(self, user_ids):
+        """{user_id: neighbours}; cache misses are loaded with one IN-list query"""
+        now = time.monotonic()
+        result, missing = {}, []
+        with self._lock:
+            for user_id in set(user_ids):
+                entry = self._entries.get(user_id)
+                if entry and entry[1] > now:
+                    self._entries.move_to_end(user_id)
+                    result[user_id] = entry[0]
+                else:
+                    missing.append(user_id)
+        if not missing:
+            return result
+
+        loaded = {user_id: set() for user_id in missing}
+        for user_id, other_id in db.session.query(
+            connection_edges.c.user_id, connection_edges.c.other_user_id
+        ).filter(
+            connection_edges.c.user_id.in_(missing),
+            connection_edges.c.status == 'accepted'
+        ):
+            loaded[user_id].add(other_id)
+
+        for user_id, neighbours in loaded.items():
+            result[user_id] = frozenset(neighbours)
+        if self.max_entries:
+            with self._lock:
+                for user_id in missing:
+                    self._entries[user_id] = (result[user_id], now + self.ttl)
+                    self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DegreeService:
+    """
+    Network distance (1st/2nd/3rd degree) from a viewer to other users.
+
+    Bidirectional BFS bounded at depth 3: the viewer side is expanded two
+    hops (cached per viewer as its frontier), each target side one hop, and a
+    target is 3rd degree when the two frontiers meet. A batch of targets costs
+    at most two adjacency queries regardless of its size.
+    """
+
+    def __init__(self, adjacency, max_entries=2000, ttl=300):
+        self.adjacency = adjacency
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._frontiers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('DEGREE_CACHE_SIZE', self.max_entries)
+        self.ttl = app.config.get('CONNECTION_CACHE_TTL_SECONDS', self.ttl)
+
+    def frontier(self, user_id):
+        """(first-degree ids, second-degree ids) of a user"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._frontiers.get(user_id)
+            if entry and entry[1] > now:
+                self._frontiers.move_to_end(user_id)
+                return entry[0]
+
+        first = self.adjacency.get(user_id)
+        second = set()
+        for neighbours in self.adjacency.get_many(first).values():
+            second.update(neighbours)
+        second = frozenset(second - first - {user_id})
+
+        if self.max_entries:
+            with self._lock:
+                self._frontiers[user_id] = ((first, second), now + self.ttl)
+                self._frontiers.move_to_end(user_id)
+                while len(self._frontiers) > self.max_entries:
+                    self._frontiers.popitem(last=False)
+        return first, second
+
+    def degrees(self, user_id, target_ids):
+        """{target_id: 1, 2, 3 or None (further away / not connected)}"""
+        first, second = self.frontier(user_id)
+        result = {}
+        unresolved = []
+        for target_id in set(target_ids):
+            if target_id == user_id:
+                result[target_id] = 0
+            elif target_id in first:
+                result[target_id] = 1
+            elif target_id in second:
+                result[target_id] = 2
+            else:
+                unresolved.append(target_id)
+
+        # Third degree: one hop from the target reaches the viewer's second ring
+        if unresolved and second:
+            for target_id, neighbours in self.adjacency.get_many(unresolved).items():
+                result[target_id] = 3 if not neighbours.isdisjoint(second) else None
+        for target_id in unresolved:
+            result.setdefault(target_id, None)
+        return result
+
+    def invalidate(self, *user_ids):
+        """Drop frontiers that may contain an edge touching any of user_ids"""
+        changed = set(user_ids)
+        with self._lock:
+            for viewer, ((first, _), _) in list(self._frontiers.items()):
+                if viewer in changed or not changed.isdisjoint(first):
+                    del self._frontiers[viewer]
+
+    def clear(self):
+        with self._lock:
+            self._frontiers.clear()
+
+
+adjacency = AdjacencyCache()
+degrees = DegreeService(adjacency)
+
+
+def connection_ids(user_id):
+    """Ids of the user's accepted connections"""
+    return adjacency.get(user_id)
+
+
+def connections_count(user_id):
+    return len(adjacency.get(user_id))
+
+
+def invalidate(*user_ids):
+    """Forget cached graph state around users whose connections changed"""
+    adjacency.invalidate(*user_ids)
+    degrees.invalidate(*user_ids)
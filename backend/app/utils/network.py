@@ -0,0 +1,172 @@
+"""
+Network Analytics
+
+Offline job over the accepted-connection graph. Edges are streamed out of
+`user_connections` in chunks into NumPy arrays and packed into a symmetric
+CSR adjacency (indptr/indices), on which the job computes:
+
+- the degree of every user and the degree distribution;
+- PageRank influence scores (power iteration, damping 0.85);
+- connected components and their size distribution;
+- per-company clusters: members, internal connections and density.
+
+Per-user results go to `user_network_stats`, the network-wide summary to a
+new `network_snapshots` row. Run it with `flask network-stats` or let the
+graph job scheduler run it; never from a request.
+"""
+from datetime import datetime
+from app import db
+from app.models import User, UserNetworkStats, NetworkSnapshot, user_connections
+
+CHUNK_SIZE = 50000
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-8
+TOP_COMPANIES = 20
+
+
+def _stream_edges(np):
+    """(sources, targets) arrays of accepted connections, read in chunks"""
+    sources, targets = [], []
+    result = db.session.execute(
+        db.select(user_connections.c.user_id, user_connections.c.connected_user_id)
+        .where(user_connections.c.status == 'accepted')
+        .execution_options(yield_per=CHUNK_SIZE)
+    )
+    for chunk in result.partitions(CHUNK_SIZE):
+        pairs = np.asarray(chunk, dtype=np.int64).reshape(-1, 2)
+        sources.append(pairs[:, 0])
+        targets.append(pairs[:, 1])
+    if not sources:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+def build_csr(user_ids, sources, targets, np):
+    """Symmetric CSR adjacency over positions in the sorted user_ids array"""
+    n = len(user_ids)
+    src = np.searchsorted(user_ids, sources)
+    dst = np.searchsorted(user_ids, targets)
+    # Drop edges to users that are not in the node set (deleted accounts)
+    valid = (src < n) & (dst < n)
+    valid[valid] &= (user_ids[src[valid]] == sources[valid]) & (user_ids[dst[valid]] == targets[valid])
+    src, dst = src[valid], dst[valid]
+
+    rows = np.concatenate([src, dst])
+    cols = np.concatenate([dst, src])
+    # Deduplicate (a pair may exist in both directions in user_connections)
+    keys = np.unique(rows * n + cols)
+    rows, cols = keys // n, keys % n
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols.astype(np.int64)
+
+
+def pagerank(indptr, indices, np, damping=DAMPING):
+    n = len(indptr) - 1
+    if n == 0:
+        return np.empty(0)
+    degree = np.diff(indptr).astype(np.float64)
+    sources = np.repeat(np.arange(n), np.diff(indptr))
+    rank = np.full(n, 1.0 / n)
+    dangling = degree == 0
+
+    for _ in range(MAX_ITERATIONS):
+        share = np.divide(rank, degree, out=np.zeros(n), where=~dangling)
+        incoming = np.bincount(indices, weights=share[sources], minlength=n)
+        updated = (1 - damping) / n + damping * (incoming + rank[dangling].sum() / n)
+        converged = np.abs(updated - rank).sum() < TOLERANCE
+        rank = updated
+        if converged:
+            break
+    return rank
+
+
+def connected_components(indptr, indices, np):
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components as components
+
+    n = len(indptr) - 1
+    graph = csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(n, n))
+    return components(graph, directed=False)
+
+
+def _histogram(values, key, count_key, np):
+    found, counts = np.unique(values, return_counts=True)
+    return [{key: int(v), count_key: int(c)} for v, c in zip(found, counts)]
+
+
+def _company_clusters(user_ids, indptr, indices, np):
+    members = {}
+    for user_id, company_id in db.session.query(User.id, User.company_id).filter(
+        User.company_id.isnot(None), User.status == 'active'
+    ):
+        members.setdefault(company_id, []).append(user_id)
+
+    company_of = np.full(len(user_ids), -1, dtype=np.int64)
+    for company_id, ids in members.items():
+        company_of[np.searchsorted(user_ids, ids)] = company_id
+
+    sources = np.repeat(np.arange(len(user_ids)), np.diff(indptr))
+    same = (company_of[sources] == company_of[indices]) & (company_of[sources] >= 0)
+    internal = dict(zip(*np.unique(company_of[sources[same]], return_counts=True)))
+
+    clusters = []
+    for company_id, ids in members.items():
+        size = len(ids)
+        edges = int(internal.get(company_id, 0)) // 2
+        possible = size * (size - 1) // 2
+        clusters.append({
+            'companyId': int(company_id),
+            'members': size,
+            'internalConnections': edges,
+            'density': round(edges / possible, 4) if possible else 0.0,
+        })
+    clusters.sort(key=lambda c: (-c['members'], -c['internalConnections']))
+    return clusters[:TOP_COMPANIES]
+
+
+def compute_network_stats():
+    """Run the analytics over the whole graph; returns the new NetworkSnapshot"""
+    import numpy as np
+
+    user_ids = np.asarray(
+        [uid for (uid,) in db.session.query(User.id).filter(User.status == 'active').order_by(User.id)],
+        dtype=np.int64
+    )
+    sources, targets = _stream_edges(np)
+    indptr, indices = build_csr(user_ids, sources, targets, np)
+
+    degree = np.diff(indptr)
+    rank = pagerank(indptr, indices, np)
+    component_count, labels = connected_components(indptr, indices, np) if len(user_ids) else (0, np.empty(0, dtype=np.int64))
+    sizes = np.bincount(labels) if len(labels) else np.empty(0, dtype=np.int64)
+
+    now = datetime.utcnow()
+    db.session.query(UserNetworkStats).delete(synchronize_session=False)
+    rows = [{
+        'user_id': int(user_ids[i]),
+        'degree': int(degree[i]),
+        'influence': float(rank[i]),
+        'component_id': int(labels[i]),
+        'component_size': int(sizes[labels[i]]),
+        'computed_at': now,
+    } for i in range(len(user_ids))]
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(UserNetworkStats.__table__.insert(), rows[start:start + CHUNK_SIZE])
+
+    snapshot = NetworkSnapshot(
+        users=len(user_ids),
+        connections=len(indices) // 2,
+        components=int(component_count),
+        largest_component=int(sizes.max()) if len(sizes) else 0,
+        isolated_users=int((degree == 0).sum()),
+        degree_histogram=_histogram(degree, 'degree', 'users', np),
+        component_sizes=_histogram(sizes, 'size', 'components', np),
+        company_clusters=_company_clusters(user_ids, indptr, indices, np),
+        computed_at=now
+    )
+    db.session.add(snapshot)
+    db.session.commit()
+    return snapshot
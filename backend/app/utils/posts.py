@@ -0,0 +1,49 @@
+"""
+Post helpers shared by the blog and admin routes
+"""
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from app import db
+from app.models import post_likes
+from app.utils import engagement, timeline, trending
+
+
+def current_viewer_id():
+    """The signed-in user's id on routes that also serve anonymous readers"""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return None
+    return int(identity) if identity else None
+
+
+def like_state(post_ids, viewer_id=None):
+    """{post_id: (likes count, liked by viewer)} from one grouped count and one lookup"""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return {}
+    counts = dict(db.session.query(post_likes.c.post_id, db.func.count()).filter(
+        post_likes.c.post_id.in_(post_ids)
+    ).group_by(post_likes.c.post_id))
+    liked = {
+        post_id for (post_id,) in db.session.query(post_likes.c.post_id).filter(
+            post_likes.c.post_id.in_(post_ids), post_likes.c.user_id == viewer_id
+        )
+    } if viewer_id is not None else set()
+    return {post_id: (counts.get(post_id, 0), post_id in liked) for post_id in post_ids}
+
+
+def serialize_posts(posts, viewer_id=None):
+    """Post dicts with like counts and the viewer's likes loaded for the whole page"""
+    post_ids = {post.id for post in posts} | {post.original_post_id for post in posts if post.original_post_id}
+    state = like_state(post_ids, viewer_id)
+    return [post.to_dict(viewer_id, state) for post in posts]
+
+
+def purge_post(post):
+    """Delete a post together with the rows derived from it; call before committing"""
+    timeline.remove_post(post.id)
+    trending.remove_post(post.id)
+    if post.original_post_id:
+        engagement.bump(post.original_post_id, 'repost', -1, at=post.created_at)
+    db.session.delete(post)
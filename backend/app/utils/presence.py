@@ -0,0 +1,296 @@
+"""
+Presence and Typing
+
+Online/last-seen state and typing indicators live in memory only; a socket
+heartbeat or a keystroke never touches the database.
+
+Every worker tracks the sockets connected to it. With several workers, each
+one announces its online users on a small pub/sub bus (PRESENCE_BUS_URL) and
+refreshes them every PRESENCE_TTL_SECONDS / 3; entries from a worker that
+stops refreshing expire after PRESENCE_TTL_SECONDS.
+
+    redis://host:6379/0     Redis pub/sub
+    memory://               In-process bus shared by every tracker in the same
+                            Python process (tests and benchmarks)
+
+Changes are not broadcast immediately: users are marked dirty and flushed
+every PRESENCE_BROADCAST_SECONDS, and only when their visible state actually
+changed, so a page reload (disconnect + reconnect) produces no event at all.
+Each worker announces the changes of its own sockets. When a worker dies and
+its users expire, only one live worker (picked per user by rendezvous hashing
+over the workers heard on the bus) announces them offline.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from app import socketio
+from app.utils.emitter import emitter
+
+
+def presence_room(user_id):
+    """Room of the sockets watching a user's presence"""
+    return f"presence_{user_id}"
+
+
+class InProcessBus:
+    """Pub/sub stand-in delivering to every subscriber in this process"""
+    _lock = threading.Lock()
+    _subscribers = {}
+
+    def __init__(self, url='memory://', channel='presence'):
+        self.channel = channel
+
+    def publish(self, data):
+        payload = json.dumps(data)
+        with self._lock:
+            callbacks = list(self._subscribers.get(self.channel, []))
+        for callback in callbacks:
+            callback(json.loads(payload))
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.setdefault(self.channel, []).append(callback)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._subscribers.clear()
+
+
+class RedisBus:
+    """Presence bus over Redis pub/sub"""
+
+    def __init__(self, url, channel='presence'):
+        import redis
+
+        self.channel = channel
+        self.redis = redis.Redis.from_url(url)
+
+    def publish(self, data):
+        self.redis.publish(self.channel, json.dumps(data))
+
+    def subscribe(self, callback):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+
+        def listen():
+            for message in pubsub.listen():
+                callback(json.loads(message['data']))
+
+        socketio.start_background_task(listen)
+
+
+def create_bus(url, channel):
+    if not url:
+        return None
+    if url.startswith('memory://'):
+        return InProcessBus(url, channel=channel)
+    if url.startswith('redis://') or url.startswith('rediss://'):
+        return RedisBus(url, channel=channel)
+    raise ValueError(f'Unsupported PRESENCE_BUS_URL: {url}')
+
+
+class PresenceTracker:
+    """Per-worker presence and typing state"""
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.ttl = 60
+        self.typing_ttl = 6
+        self.broadcast_interval = 2
+        self.bus = None
+        self._lock = threading.Lock()
+        self._sockets = {}      # user_id -> {sid} on this worker
+        self._remote = {}       # user_id -> {worker_id: expires_at}
+        self._workers = {}      # worker_id -> expires_at, for every other live worker
+        self._last_seen = {}    # user_id -> datetime
+        self._typing = {}       # (conversation_id, user_id) -> expires_at
+        self._dirty = set()
+        self._broadcast = {}    # user_id -> last online state sent
+        self._task = None
+        self._last_heartbeat = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('PRESENCE_TTL_SECONDS', self.ttl)
+        self.typing_ttl = app.config.get('TYPING_TTL_SECONDS', self.typing_ttl)
+        self.broadcast_interval = app.config.get('PRESENCE_BROADCAST_SECONDS', self.broadcast_interval)
+        self.bus = create_bus(app.config.get('PRESENCE_BUS_URL'), app.config.get('PRESENCE_BUS_CHANNEL', 'presence'))
+        if self.bus:
+            self.bus.subscribe(self._on_bus_message)
+
+    # -- sockets ------------------------------------------------------------
+
+    def connect(self, user_id, sid):
+        self._ensure_started()
+        with self._lock:
+            sids = self._sockets.setdefault(user_id, set())
+            first = not sids
+            sids.add(sid)
+            if first:
+                self._dirty.add(user_id)
+        if first and self.bus:
+            self.bus.publish({'worker': self.worker_id, 'online': [user_id]})
+
+    def disconnect(self, user_id, sid):
+        now = datetime.utcnow()
+        with self._lock:
+            sids = self._sockets.get(user_id, set())
+            sids.discard(sid)
+            last = not sids
+            if last:
+                self._sockets.pop(user_id, None)
+                self._last_seen[user_id] = now
+                self._dirty.add(user_id)
+            stale_typing = [key for key in self._typing if key[1] == user_id] if last else []
+            for key in stale_typing:
+                del self._typing[key]
+        for conversation_id, _ in stale_typing:
+            self._emit_typing(conversation_id, user_id, False)
+        if last and self.bus:
+            self.bus.publish({'worker': self.worker_id, 'offline': [user_id], 'lastSeen': now.isoformat()})
+
+    def touch(self, user_id):
+        """Record activity from a connected user without any broadcast"""
+        with self._lock:
+            if user_id in self._sockets:
+                self._last_seen[user_id] = datetime.utcnow()
+
+    # -- lookups ------------------------------------------------------------
+
+    def _is_online(self, user_id, now):
+        if self._sockets.get(user_id):
+            return True
+        return any(expires > now for expires in self._remote.get(user_id, {}).values())
+
+    def lookup(self, user_ids):
+        """{user_id: {'online': bool, 'lastSeen': iso or None}}"""
+        now = time.monotonic()
+        with self._lock:
+            result = {}
+            for user_id in user_ids:
+                last_seen = self._last_seen.get(user_id)
+                result[user_id] = {
+                    'online': self._is_online(user_id, now),
+                    'lastSeen': last_seen.isoformat() if last_seen else None
+                }
+            return result
+
+    # -- typing -------------------------------------------------------------
+
+    def set_typing(self, conversation_id, user_id, is_typing):
+        """Update typing state; returns True when it changed and was broadcast"""
+        self._ensure_started()
+        key = (conversation_id, user_id)
+        with self._lock:
+            was_typing = key in self._typing
+            if is_typing:
+                self._typing[key] = time.monotonic() + self.typing_ttl
+            else:
+                self._typing.pop(key, None)
+        if was_typing == bool(is_typing):
+            return False
+        self._emit_typing(conversation_id, user_id, bool(is_typing))
+        return True
+
+    def _emit_typing(self, conversation_id, user_id, is_typing):
+        emitter.emit('typing', {
+            'conversationId': conversation_id,
+            'userId': user_id,
+            'isTyping': is_typing
+        }, room=f"conversation_{conversation_id}")
+
+    # -- cross-worker bus ---------------------------------------------------
+
+    def _on_bus_message(self, data):
+        worker = data.get('worker')
+        if worker == self.worker_id:
+            return
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._workers[worker] = expires
+            for user_id in data.get('online', []):
+                self._remote.setdefault(user_id, {})[worker] = expires
+            for user_id in data.get('offline', []):
+                self._remote.get(user_id, {}).pop(worker, None)
+                if data.get('lastSeen'):
+                    self._last_seen[user_id] = datetime.fromisoformat(data['lastSeen'])
+
+    def _owns(self, user_id, now):
+        """Whether this worker announces the expiry of another worker's user"""
+        live = [worker for worker, expires in self._workers.items() if expires > now] + [self.worker_id]
+        return max(live, key=lambda worker: hashlib.blake2b(f'{user_id}:{worker}'.encode()).digest()) == self.worker_id
+
+    # -- background loop ----------------------------------------------------
+
+    def _ensure_started(self):
+        if self._task is None:
+            with self._lock:
+                if self._task is None:
+                    self._task = socketio.start_background_task(self._run)
+
+    def _run(self):
+        while True:
+            socketio.sleep(self.broadcast_interval)
+            try:
+                self.tick()
+            except Exception as e:
+                print(f'[Presence] Tick failed: {e}')
+
+    def tick(self):
+        """Heartbeat, expire stale entries and flush debounced broadcasts"""
+        now = time.monotonic()
+        with self._lock:
+            expired_typing = [key for key, expires in self._typing.items() if expires <= now]
+            for key in expired_typing:
+                del self._typing[key]
+
+            expired = set()
+            for user_id, workers in list(self._remote.items()):
+                for worker, expires in list(workers.items()):
+                    if expires <= now:
+                        del workers[worker]
+                        expired.add(user_id)
+                if not workers:
+                    del self._remote[user_id]
+            for worker, expires in list(self._workers.items()):
+                if expires <= now:
+                    del self._workers[worker]
+
+            dirty, self._dirty = self._dirty, set()
+            changes = []
+            for user_id in dirty | expired:
+                online = self._is_online(user_id, now)
+                if self._broadcast.get(user_id) == online:
+                    continue
+                if user_id not in dirty and not self._owns(user_id, now):
+                    continue
+                if online:
+                    self._broadcast[user_id] = True
+                else:
+                    self._broadcast.pop(user_id, None)
+                last_seen = self._last_seen.get(user_id)
+                changes.append((user_id, online, last_seen.isoformat() if last_seen else None))
+
+            heartbeat = None
+            if self.bus and now - self._last_heartbeat >= self.ttl / 3:
+                self._last_heartbeat = now
+                # Sent even when empty: it also tells the others this worker is alive
+                heartbeat = list(self._sockets)
+
+        for conversation_id, user_id in expired_typing:
+            self._emit_typing(conversation_id, user_id, False)
+        for user_id, online, last_seen in changes:
+            emitter.emit('presence', {
+                'userId': user_id,
+                'online': online,
+                'lastSeen': last_seen
+            }, room=presence_room(user_id))
+        if heartbeat is not None:
+            self.bus.publish({'worker': self.worker_id, 'online': heartbeat})
+
+
+presence = PresenceTracker()
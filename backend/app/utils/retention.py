@@ -0,0 +1,244 @@
+"""
+Notification Retention
+
+Keeps the hot `notifications` table small:
+
+- read notifications older than NOTIFICATION_RETENTION_DAYS are deleted (or
+  moved to `notifications_archive`) in bounded batches, one commit per batch,
+  so the job never holds long locks;
+- on PostgreSQL the table can be converted once to monthly range partitions
+  on `created_at` (`flask partition-notifications`). Expired months that hold
+  no unread rows are then dropped as whole partitions instead of row by row.
+
+Every purged notification gets a delete in `change_log`, in the same
+transaction, so /api/sync clients drop it too.
+
+Run it with `flask purge-notifications`, from cron, or from `flask run-scheduler`
+by setting NOTIFICATION_RETENTION_INTERVAL_HOURS.
+"""
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app import db, socketio
+from app.models import ChangeLog, Notification, NotificationArchive
+from app.utils.dialect import dialect_name
+from app.utils.sync import record_changes
+
+ARCHIVE_COLUMNS = ['id', 'user_id', 'type', 'title', 'message', 'link', 'data', 'group_key', 'count', 'created_at']
+PARTITION_NAME = re.compile(r'^notifications_y(\d{4})m(\d{2})$')
+
+
+def _month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value):
+    return (value.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _partition_name(month):
+    return f'notifications_y{month.year:04d}m{month.month:02d}'
+
+
+def _archive(where):
+    """Copy rows matching `where` into notifications_archive"""
+    columns = [getattr(Notification, c) for c in ARCHIVE_COLUMNS]
+    db.session.execute(
+        NotificationArchive.__table__.insert().from_select(
+            ARCHIVE_COLUMNS, db.select(*columns).where(where)
+        )
+    )
+
+
+# ---------------------------------------------------------------------------
+# PostgreSQL partitioning
+# ---------------------------------------------------------------------------
+
+def is_partitioned():
+    """True when notifications is a PostgreSQL partitioned table"""
+    if dialect_name() != 'postgresql':
+        return False
+    relkind = db.session.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = 'notifications' AND relkind IN ('r', 'p')")
+    ).scalar()
+    return relkind == 'p'
+
+
+def _create_partition(month):
+    db.session.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {_partition_name(month)} PARTITION OF notifications "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+    ))
+
+
+def ensure_partitions(months_ahead=3):
+    """Create the monthly partitions for the current month and the next few"""
+    if not is_partitioned():
+        return 0
+    month = _month_start(datetime.utcnow())
+    for _ in range(months_ahead + 1):
+        _create_partition(month)
+        month = _next_month(month)
+    db.session.commit()
+    return months_ahead + 1
+
+
+def partition_notifications(months_ahead=3):
+    """
+    One-off conversion of notifications into a table range-partitioned by
+    month on created_at. Runs in a single transaction; schedule it in a
+    maintenance window on large tables.
+    """
+    if dialect_name() != 'postgresql':
+        raise RuntimeError('Partitioning is only supported on PostgreSQL')
+    if is_partitioned():
+        return False
+
+    oldest = db.session.query(db.func.min(Notification.created_at)).scalar() or datetime.utcnow()
+
+    statements = [
+        "CREATE TABLE notifications_partitioned (LIKE notifications INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)",
+        # The partition key must be part of the primary key
+        "ALTER TABLE notifications_partitioned ADD PRIMARY KEY (id, created_at)",
+        "CREATE TABLE notifications_default PARTITION OF notifications_partitioned DEFAULT",
+    ]
+    for sql in statements:
+        db.session.execute(text(sql))
+
+    month = _month_start(oldest)
+    last = _month_start(datetime.utcnow())
+    for _ in range(months_ahead):
+        last = _next_month(last)
+    while month <= last:
+        db.session.execute(text(
+            f"CREATE TABLE {_partition_name(month)} PARTITION OF notifications_partitioned "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+        ))
+        month = _next_month(month)
+
+    statements = [
+        "INSERT INTO notifications_partitioned SELECT * FROM notifications",
+        "ALTER SEQUENCE notifications_id_seq OWNED BY NONE",
+        "DROP TABLE notifications",
+        "ALTER TABLE notifications_partitioned RENAME TO notifications",
+        "ALTER SEQUENCE notifications_id_seq OWNED BY notifications.id",
+        "ALTER TABLE notifications ADD FOREIGN KEY (user_id) REFERENCES users (id)",
+    ]
+    for sql in statements:
+        db.session.execute(text(sql))
+
+    connection = db.session.connection()
+    for index in Notification.__table__.indexes:
+        index.create(connection)
+
+    db.session.commit()
+    return True
+
+
+def _expired_partitions(cutoff):
+    """Monthly partitions whose whole range is older than cutoff"""
+    names = db.session.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = 'notifications'"
+    )).scalars().all()
+
+    expired = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        month = datetime(int(match.group(1)), int(match.group(2)), 1)
+        if _next_month(month) <= cutoff:
+            expired.append((month, name))
+    return sorted(expired)
+
+
+def drop_expired_partitions(cutoff, archive=False):
+    """Drop expired partitions that no longer hold unread notifications"""
+    dropped = 0
+    for month, name in _expired_partitions(cutoff):
+        has_unread = db.session.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE is_read IS NOT TRUE)")
+        ).scalar()
+        if has_unread:
+            continue
+
+        if archive:
+            _archive(db.and_(
+                Notification.created_at >= month,
+                Notification.created_at < _next_month(month)
+            ))
+        partition = db.table(name, db.column('id'), db.column('user_id'))
+        db.session.execute(ChangeLog.__table__.insert().from_select(
+            ['user_id', 'entity_type', 'entity_id', 'op', 'created_at'],
+            db.select(
+                partition.c.user_id, db.literal('notification'), partition.c.id,
+                db.literal('delete'), db.literal(datetime.utcnow(), db.DateTime)
+            )
+        ))
+        db.session.execute(text(f"DROP TABLE {name}"))
+        db.session.commit()
+        dropped += 1
+    return dropped
+
+
+# ---------------------------------------------------------------------------
+# Retention
+# ---------------------------------------------------------------------------
+
+def purge_notifications(days=90, batch_size=1000, archive=False, max_batches=None):
+    """
+    Delete (or archive) read notifications older than `days`, `batch_size`
+    rows per transaction. Returns a summary dict.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    summary = {'deleted': 0, 'batches': 0, 'partitionsDropped': 0}
+
+    if is_partitioned():
+        ensure_partitions()
+        summary['partitionsDropped'] = drop_expired_partitions(cutoff, archive=archive)
+
+    while max_batches is None or summary['batches'] < max_batches:
+        rows = db.session.query(Notification.id, Notification.user_id).filter(
+            Notification.is_read == True, Notification.created_at < cutoff
+        ).order_by(Notification.created_at.asc()).limit(batch_size).all()
+        if not rows:
+            break
+        ids = [nid for nid, _ in rows]
+
+        if archive:
+            _archive(Notification.id.in_(ids))
+        Notification.query.filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+        record_changes([(user_id, 'notification', nid, 'delete') for nid, user_id in rows])
+        db.session.commit()
+
+        summary['deleted'] += len(ids)
+        summary['batches'] += 1
+
+    return summary
+
+
+def start_retention_scheduler(app):
+    """Run the retention job every NOTIFICATION_RETENTION_INTERVAL_HOURS in a background task"""
+    interval_hours = app.config.get('NOTIFICATION_RETENTION_INTERVAL_HOURS', 0)
+    if not interval_hours:
+        return None
+
+    def run():
+        while True:
+            socketio.sleep(interval_hours * 3600)
+            with app.app_context():
+                try:
+                    summary = purge_notifications(
+                        days=app.config['NOTIFICATION_RETENTION_DAYS'],
+                        archive=app.config['NOTIFICATION_RETENTION_ARCHIVE']
+                    )
+                    print(f"[Retention] Notifications purged: {summary}")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[Retention] Failed to purge notifications: {e}")
+
+    return socketio.start_background_task(run)
@@ -0,0 +1,51 @@
+"""
+Random Sampling
+
+Picks random rows without ORDER BY random(), which sorts the whole table.
+Random ids are drawn between MIN(id) and MAX(id) (both read from the primary
+key index) and looked up with one IN-list query per round; gaps left by
+deleted rows are made up in later rounds. The cost depends on `limit`, not
+on the table size.
+"""
+import random
+from app import db
+
+ROUNDS = 4
+OVERSAMPLE = 2
+
+
+def sample_ids(id_column, limit, rounds=ROUNDS):
+    """Up to `limit` distinct random ids from an integer primary key column"""
+    low, high = db.session.query(db.func.min(id_column), db.func.max(id_column)).one()
+    if low is None or limit <= 0:
+        return []
+
+    span = high - low + 1
+    if span <= limit * OVERSAMPLE:
+        # Small table: reading every id is cheaper than probing
+        ids = [row_id for (row_id,) in db.session.query(id_column)]
+        return random.sample(ids, min(limit, len(ids)))
+
+    found = set()
+    for _ in range(rounds):
+        need = limit - len(found)
+        if need <= 0:
+            break
+        probes = {random.randint(low, high) for _ in range(need * OVERSAMPLE)} - found
+        found.update(
+            row_id for (row_id,) in db.session.query(id_column).filter(id_column.in_(probes))
+        )
+
+    # Very sparse ids: take the rows following one more random point
+    need = limit - len(found)
+    if need > 0:
+        start = random.randint(low, high)
+        for filter_ in (id_column >= start, id_column < start):
+            found.update(
+                row_id for (row_id,) in db.session.query(id_column).filter(
+                    filter_, id_column.notin_(found)
+                ).order_by(id_column).limit(limit - len(found))
+            )
+
+    # Set order follows the ids' hash, so slicing it would favour low ids
+    return random.sample(list(found), min(limit, len(found)))
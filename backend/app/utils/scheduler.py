@@ -0,0 +1,29 @@
+"""
+Periodic Jobs
+
+The retention, archive, sync-prune, suggestion, decay and trending-snapshot
+jobs run in one dedicated process, `flask run-scheduler`. Web workers and
+other CLI commands never start them, so every job runs once per interval no
+matter how many workers serve requests. Each job is off unless its
+*_INTERVAL_* / TRENDING_SNAPSHOT_MINUTES option is set.
+"""
+
+
+def start_schedulers(app):
+    """Start every configured periodic job as a background task; returns their names"""
+    from app.utils.archive import start_archive_scheduler
+    from app.utils.engagement import start_decay_scheduler
+    from app.utils.retention import start_retention_scheduler
+    from app.utils.suggestions import start_suggestion_scheduler
+    from app.utils.sync import start_prune_scheduler
+    from app.utils.trending import start_trending_scheduler
+
+    schedulers = [
+        ('notification retention', start_retention_scheduler),
+        ('message archive', start_archive_scheduler),
+        ('sync log prune', start_prune_scheduler),
+        ('connection suggestions', start_suggestion_scheduler),
+        ('engagement decay', start_decay_scheduler),
+        ('trending snapshots', start_trending_scheduler),
+    ]
+    return [name for name, start in schedulers if start(app) is not None]
@@ -0,0 +1,124 @@
+"""
+Message Search
+
+Indexed full-text search over message content:
+
+- PostgreSQL: a GIN index on to_tsvector(MESSAGE_SEARCH_CONFIG, content),
+  queried with websearch_to_tsquery and highlighted with ts_headline;
+- SQLite: an external-content FTS5 table (`messages_fts`) kept in sync by
+  triggers, queried with MATCH and highlighted with snippet().
+
+Results are limited to conversations the caller participates in and are
+paged newest-first by message id, so a cursor is just the last id seen.
+"""
+import re
+from html import escape
+from sqlalchemy import text, table, column, literal_column
+from app import db
+from app.models import Message, ConversationParticipant
+from app.utils.dialect import dialect_name
+
+# Control characters that never appear in chat text; swapped for <mark> after escaping
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_WORDS = 12
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+# FTS5 virtual table; its hidden column of the same name is the MATCH target
+messages_fts = table('messages_fts', column('rowid'), column('messages_fts'))
+
+
+def ensure_search_index(config='simple'):
+    """Create the full-text index (idempotent; called at startup)"""
+    dialect = dialect_name()
+    if dialect == 'postgresql':
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_messages_content_fts ON messages "
+            f"USING GIN (to_tsvector('{config}'::regconfig, content))"
+        ))
+    elif dialect == 'sqlite':
+        exists = db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+        )).scalar()
+        if exists:
+            return
+        statements = [
+            "CREATE VIRTUAL TABLE messages_fts USING fts5("
+            "content, content='messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+            "CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN "
+            "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+            "CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages BEGIN "
+            "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+            "CREATE TRIGGER messages_fts_update AFTER UPDATE OF content ON messages BEGIN "
+            "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+            "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+            # Index the messages that already exist
+            "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')",
+        ]
+        for sql in statements:
+            db.session.execute(text(sql))
+    db.session.commit()
+
+
+def _fts5_query(q):
+    """Quote every word so user input can't hit FTS5 syntax; last word matches as prefix"""
+    words = TOKEN.findall(q)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _highlight(snippet):
+    return escape(snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+
+
+def search_messages(user_id, q, before_id=None, limit=20, conversation_id=None, config='simple'):
+    """
+    Messages matching `q` in the user's conversations, newest first.
+    Returns (messages, snippets by message id, has_more).
+    """
+    query = db.session.query(Message).join(
+        ConversationParticipant, db.and_(
+            ConversationParticipant.conversation_id == Message.conversation_id,
+            ConversationParticipant.user_id == user_id
+        )
+    )
+    if conversation_id is not None:
+        query = query.filter(Message.conversation_id == conversation_id)
+    if before_id is not None:
+        query = query.filter(Message.id < before_id)
+
+    dialect = dialect_name()
+    if dialect == 'postgresql':
+        # Inline the configuration so the expression matches the GIN index
+        regconfig = literal_column(f"'{config}'::regconfig")
+        tsquery = db.func.websearch_to_tsquery(regconfig, q)
+        snippet = db.func.ts_headline(
+            regconfig, Message.content, tsquery,
+            f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, '
+            f'MaxWords={SNIPPET_WORDS * 2}, MinWords={SNIPPET_WORDS // 2}'
+        )
+        query = query.filter(db.func.to_tsvector(regconfig, Message.content).op('@@')(tsquery))
+    elif dialect == 'sqlite':
+        match = _fts5_query(q)
+        if match is None:
+            return [], {}, False
+        snippet = text(
+            f"snippet(messages_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', {SNIPPET_WORDS})"
+        )
+        query = query.join(messages_fts, messages_fts.c.rowid == Message.id).filter(
+            messages_fts.c.messages_fts.op('MATCH')(match)
+        )
+    else:
+        snippet = Message.content
+        query = query.filter(Message.content.ilike(f'%{q}%'))
+
+    rows = query.add_columns(snippet).order_by(Message.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    messages = [message for message, _ in rows]
+    snippets = {message.id: _highlight(value or '') for message, value in rows}
+    return messages, snippets, has_more
@@ -0,0 +1,187 @@
+"""
+People You May Know
+
+A periodic batch job ranks second-degree connections for every active user
+and stores the top SUGGESTIONS_PER_USER in `connection_suggestions`:
+
+    mutual  = A @ A                 (A: accepted-connection adjacency, CSR)
+    shared  = F[u] @ F[candidates]  (F: user x company/school/skill incidence)
+    score   = mutual + weighted shared companies, schools and skills
+              + a small boost for influential users (user_network_stats)
+
+Users already connected, pending or rejected are excluded. The endpoint then
+reads the precomputed rows with one indexed query.
+
+Needs numpy and scipy; they are only imported by the job, not by web workers.
+"""
+from datetime import datetime
+from app import db, socketio
+from app.models import (
+    User, Company, Education, Experience, Skill, ConnectionSuggestion, UserNetworkStats, connection_edges
+)
+
+WEIGHTS = {'mutual': 1.0, 'companies': 2.0, 'schools': 1.0, 'skills': 0.25, 'influence': 0.5}
+USER_BATCH = 500
+
+
+def _normalize(value):
+    return ' '.join((value or '').lower().split())
+
+
+def _incidence(pairs, index, sparse, np):
+    """CSR user x feature matrix from (user_id, feature) pairs"""
+    features = {}
+    rows, cols = [], []
+    for user_id, feature in pairs:
+        feature = _normalize(feature) if isinstance(feature, str) else feature
+        if user_id not in index or feature in (None, ''):
+            continue
+        rows.append(index[user_id])
+        cols.append(features.setdefault(feature, len(features)))
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(index), max(len(features), 1))
+    )
+    # Repeated pairs (two skills with the same name) count once
+    matrix.data[:] = 1
+    return matrix
+
+
+def _load(sparse, np):
+    user_ids = [uid for (uid,) in db.session.query(User.id).filter(User.status == 'active').order_by(User.id)]
+    index = {uid: i for i, uid in enumerate(user_ids)}
+    n = len(user_ids)
+
+    accepted, existing = [], []
+    for user_id, other_id, status in db.session.query(
+        connection_edges.c.user_id, connection_edges.c.other_user_id, connection_edges.c.status
+    ):
+        if user_id in index and other_id in index:
+            existing.append((index[user_id], index[other_id]))
+            if status == 'accepted':
+                accepted.append((index[user_id], index[other_id]))
+
+    def adjacency(edges):
+        rows = [r for r, _ in edges]
+        cols = [c for _, c in edges]
+        return sparse.csr_matrix((np.ones(len(edges), dtype=np.float32), (rows, cols)), shape=(n, n))
+
+    # Current employer (company id) and past employers (free text) share one key: the normalized name
+    companies = list(db.session.query(User.id, Company.name).join(Company, Company.id == User.company_id))
+    companies += list(db.session.query(Experience.user_id, Experience.company))
+
+    # Influence scaled to [0, 1]; zero until the network analytics job has run
+    influence = np.zeros(n, dtype=np.float64)
+    for user_id, score in db.session.query(UserNetworkStats.user_id, UserNetworkStats.influence):
+        if user_id in index:
+            influence[index[user_id]] = score or 0.0
+    if influence.max(initial=0) > 0:
+        influence /= influence.max()
+
+    return {
+        'user_ids': user_ids,
+        'influence': influence,
+        'A': adjacency(accepted),
+        'existing': adjacency(existing),
+        'companies': _incidence(companies, index, sparse, np),
+        'schools': _incidence(db.session.query(Education.user_id, Education.school), index, sparse, np),
+        'skills': _incidence(db.session.query(Skill.user_id, Skill.name), index, sparse, np),
+    }
+
+
+def compute_suggestions(per_user=20):
+    """Rebuild connection_suggestions for every active user; returns rows written"""
+    import numpy as np
+    from scipy import sparse
+
+    data = _load(sparse, np)
+    user_ids, A = data['user_ids'], data['A']
+    n = len(user_ids)
+    now = datetime.utcnow()
+    written = 0
+
+    db.session.query(ConnectionSuggestion).delete(synchronize_session=False)
+
+    for start in range(0, n, USER_BATCH):
+        block = slice(start, min(start + USER_BATCH, n))
+        mutual = (A[block] @ A).tocsr()
+        blocked = data['existing'][block]
+
+        rows = []
+        for offset in range(mutual.shape[0]):
+            u = start + offset
+            row = mutual.getrow(offset)
+            candidates = row.indices
+            if not len(candidates):
+                continue
+            keep = (candidates != u) & ~np.isin(candidates, blocked.getrow(offset).indices)
+            candidates = candidates[keep]
+            if not len(candidates):
+                continue
+            mutual_counts = row.data[keep]
+
+            shared = {
+                name: np.asarray(data[name][candidates] @ data[name][u].T.toarray()).ravel()
+                for name in ('companies', 'schools', 'skills')
+            }
+            scores = WEIGHTS['mutual'] * mutual_counts + sum(WEIGHTS[name] * shared[name] for name in shared)
+            scores = scores + WEIGHTS['influence'] * data['influence'][candidates]
+
+            top = np.argsort(-scores, kind='stable')[:per_user]
+            for i in top:
+                rows.append({
+                    'user_id': user_ids[u],
+                    'suggested_user_id': user_ids[candidates[i]],
+                    'score': float(scores[i]),
+                    'mutual_count': int(mutual_counts[i]),
+                    'shared_companies': int(shared['companies'][i]),
+                    'shared_schools': int(shared['schools'][i]),
+                    'shared_skills': int(shared['skills'][i]),
+                    'computed_at': now,
+                })
+
+        if rows:
+            db.session.execute(ConnectionSuggestion.__table__.insert(), rows)
+            written += len(rows)
+
+    db.session.commit()
+    return written
+
+
+def get_suggestions(user_id, limit=5):
+    """Precomputed suggestions still not connected to the user, best first"""
+    return db.session.query(ConnectionSuggestion, User).join(
+        User, User.id == ConnectionSuggestion.suggested_user_id
+    ).outerjoin(
+        connection_edges, db.and_(
+            connection_edges.c.user_id == user_id,
+            connection_edges.c.other_user_id == ConnectionSuggestion.suggested_user_id
+        )
+    ).filter(
+        ConnectionSuggestion.user_id == user_id,
+        connection_edges.c.user_id.is_(None),
+        User.status == 'active'
+    ).order_by(ConnectionSuggestion.score.desc()).limit(limit).all()
+
+
+def start_suggestion_scheduler(app):
+    """Recompute network stats and suggestions every SUGGESTIONS_INTERVAL_HOURS in a background task"""
+    interval_hours = app.config.get('SUGGESTIONS_INTERVAL_HOURS', 0)
+    if not interval_hours:
+        return None
+
+    def run():
+        while True:
+            socketio.sleep(interval_hours * 3600)
+            with app.app_context():
+                try:
+                    from app.utils.network import compute_network_stats
+                    snapshot = compute_network_stats()
+                    print(f"[Suggestions] Network stats: {snapshot.users} users, {snapshot.components} components")
+                    written = compute_suggestions(per_user=app.config['SUGGESTIONS_PER_USER'])
+                    print(f"[Suggestions] Stored {written} suggestions")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[Suggestions] Failed to compute suggestions: {e}")
+
+    return socketio.start_background_task(run)
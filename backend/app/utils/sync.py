@@ -0,0 +1,169 @@
+"""
+Delta Sync
+
+Write paths append one `change_log` row per affected user and entity;
+/api/sync replays a user's rows after the client's token and returns the
+current state of each changed entity, or a tombstone when it is gone.
+
+Rows older than SYNC_RETENTION_DAYS are pruned by `flask prune-sync-log`,
+from cron, or from `flask run-scheduler` by setting SYNC_PRUNE_INTERVAL_HOURS.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import and_
+from app import db, socketio
+from app.models import ChangeLog, Notification, Message, User, ConversationParticipant, connection_edges
+
+ENTITY_TYPES = ('notification', 'message', 'conversation', 'connection')
+
+
+def record_change(user_ids, entity_type, entity_id, op='upsert'):
+    """Log that entity_id changed for every user in user_ids"""
+    record_changes([(user_id, entity_type, entity_id, op) for user_id in set(user_ids)])
+
+
+def record_changes(changes):
+    """Log many (user_id, entity_type, entity_id, op) tuples with one INSERT"""
+    if not changes:
+        return
+    now = datetime.utcnow()
+    db.session.execute(ChangeLog.__table__.insert(), [
+        {'user_id': user_id, 'entity_type': entity_type, 'entity_id': entity_id, 'op': op, 'created_at': now}
+        for user_id, entity_type, entity_id, op in changes
+    ])
+
+
+def latest_token(user_id):
+    return db.session.query(db.func.max(ChangeLog.id)).filter(ChangeLog.user_id == user_id).scalar() or 0
+
+
+def is_expired(since):
+    """True when changes after `since` may already have been pruned"""
+    oldest = db.session.query(db.func.min(ChangeLog.id)).scalar()
+    return oldest is not None and since < oldest - 1
+
+
+def prune_changes(days=30, batch_size=5000):
+    """Delete change log rows older than `days` in bounded batches"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = 0
+    while True:
+        ids = [cid for (cid,) in db.session.query(ChangeLog.id).filter(
+            ChangeLog.created_at < cutoff
+        ).order_by(ChangeLog.id).limit(batch_size)]
+        if not ids:
+            return deleted
+        ChangeLog.query.filter(ChangeLog.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(ids)
+
+
+def _serialize_connections(user_id, other_ids):
+    rows = db.session.query(connection_edges).filter(
+        connection_edges.c.user_id == user_id,
+        connection_edges.c.other_user_id.in_(other_ids)
+    ).all()
+    users = {u.id: u for u in User.query.filter(User.id.in_(other_ids))}
+
+    result = {}
+    for row in rows:
+        if row.other_user_id not in users:
+            continue
+        result[row.other_user_id] = {
+            'userId': row.other_user_id,
+            'status': row.status,
+            'isRequester': row.is_requester,
+            'user': users[row.other_user_id].to_brief_dict(),
+        }
+    return result
+
+
+def build_changes(user_id, changes):
+    """
+    Collapse change rows to the latest op per entity and load the current
+    state of everything that still exists, one query per entity type.
+    """
+    latest = {}
+    for change in changes:
+        latest[(change.entity_type, change.entity_id)] = change.op
+
+    upserts = {entity_type: [] for entity_type in ENTITY_TYPES}
+    deleted = {entity_type: [] for entity_type in ENTITY_TYPES}
+    for (entity_type, entity_id), op in latest.items():
+        if entity_type not in upserts:
+            continue
+        (deleted if op == 'delete' else upserts)[entity_type].append(entity_id)
+
+    payload = {entity_type: [] for entity_type in ENTITY_TYPES}
+    users = {}
+
+    if upserts['notification']:
+        found = Notification.query.filter(
+            Notification.id.in_(upserts['notification']), Notification.user_id == user_id
+        ).all()
+        payload['notification'] = [n.to_dict() for n in found]
+
+    if upserts['message']:
+        # Only messages of conversations the user still belongs to
+        found = Message.query.join(
+            ConversationParticipant, and_(
+                ConversationParticipant.conversation_id == Message.conversation_id,
+                ConversationParticipant.user_id == user_id
+            )
+        ).filter(Message.id.in_(upserts['message'])).order_by(Message.id).all()
+        from app.routes.messages import serialize_messages
+
+        payload['message'] = serialize_messages(found, user_id, include_sender=False)
+        sender_ids = {m.sender_id for m in found}
+        if sender_ids:
+            users = {str(u.id): u.to_brief_dict() for u in User.query.filter(User.id.in_(sender_ids))}
+
+    if upserts['conversation']:
+        from app.models import Conversation
+        from app.routes.messages import serialize_conversations
+
+        rows = db.session.query(
+            Conversation.id, Conversation.updated_at, ConversationParticipant.unread_count
+        ).join(
+            ConversationParticipant, ConversationParticipant.conversation_id == Conversation.id
+        ).filter(
+            ConversationParticipant.user_id == user_id,
+            Conversation.id.in_(upserts['conversation'])
+        ).order_by(Conversation.updated_at.desc()).all()
+        payload['conversation'] = serialize_conversations(rows, user_id)
+
+    if upserts['connection']:
+        connections = _serialize_connections(user_id, upserts['connection'])
+        payload['connection'] = list(connections.values())
+        # A connection row that is gone by now is a removal
+        deleted['connection'] += [uid for uid in upserts['connection'] if uid not in connections]
+
+    # Anything requested as an upsert but no longer visible is reported as deleted
+    for entity_type, key in (('notification', 'id'), ('message', 'id'), ('conversation', 'id')):
+        present = {item[key] for item in payload[entity_type]}
+        deleted[entity_type] += [eid for eid in upserts[entity_type] if eid not in present]
+
+    return {
+        'changes': {f'{t}s': payload[t] for t in ENTITY_TYPES},
+        'deleted': {f'{t}s': sorted(deleted[t]) for t in ENTITY_TYPES},
+        'users': users,
+    }
+
+
+def start_prune_scheduler(app):
+    """Prune the change log every SYNC_PRUNE_INTERVAL_HOURS in a background task"""
+    interval_hours = app.config.get('SYNC_PRUNE_INTERVAL_HOURS', 0)
+    if not interval_hours:
+        return None
+
+    def run():
+        while True:
+            socketio.sleep(interval_hours * 3600)
+            with app.app_context():
+                try:
+                    pruned = prune_changes(days=app.config['SYNC_RETENTION_DAYS'])
+                    print(f"[Sync] Changes pruned: {pruned}")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[Sync] Failed to prune changes: {e}")
+
+    return socketio.start_background_task(run)
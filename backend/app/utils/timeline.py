@@ -0,0 +1,180 @@
+"""
+Home Timeline
+
+Fan-out on write: when a post (or repost) is created, one `timeline_entries`
+row is written for the author and for each accepted connection, so reading
+the feed is a single range scan on the (user_id, post_id) primary key.
+
+Authors with more than FEED_FANOUT_LIMIT connections ("celebrities") only
+write their own row; readers pull their recent posts at read time through
+the (author_id, id) index on blog_posts and merge them in.
+
+Who is a celebrity is recorded in `feed_celebrities`, updated whenever a
+connection is accepted or removed, so writing and reading always agree.
+When an author drops back below the limit their recent posts are fanned out
+again. `flask rebuild-timelines` recomputes the table from the graph.
+"""
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models import BlogPost, FeedCelebrity, TimelineEntry, connection_edges
+from app.utils import graph
+from app.utils.dialect import upsert
+
+RECENT_POSTS = 20
+
+
+def _fanout_limit():
+    return current_app.config['FEED_FANOUT_LIMIT']
+
+
+def is_celebrity(user_id):
+    return db.session.query(FeedCelebrity.user_id).filter(FeedCelebrity.user_id == user_id).first() is not None
+
+
+def _connections(user_id):
+    """Accepted connections as of this transaction (the per-worker cache may lag behind)"""
+    return {
+        other_id for (other_id,) in db.session.query(connection_edges.c.other_user_id).filter(
+            connection_edges.c.user_id == user_id,
+            connection_edges.c.status == 'accepted'
+        )
+    }
+
+
+def _insert_entries(rows):
+    """Insert timeline rows, skipping the ones readers already have"""
+    if rows:
+        db.session.execute(upsert(TimelineEntry.__table__).on_conflict_do_nothing(), rows)
+
+
+def update_celebrity(user_id, recent=RECENT_POSTS):
+    """Move an author across the fan-out limit after their connections changed; call before committing"""
+    connections = _connections(user_id)
+    above = len(connections) > _fanout_limit()
+    if above == is_celebrity(user_id):
+        return
+    if above:
+        db.session.execute(upsert(FeedCelebrity.__table__).values(
+            user_id=user_id, since=datetime.utcnow()
+        ).on_conflict_do_nothing())
+        return
+
+    # Back to fan-out on write: readers stop pulling these posts, so copy the recent ones
+    FeedCelebrity.query.filter(FeedCelebrity.user_id == user_id).delete(synchronize_session=False)
+    posts = db.session.query(BlogPost.id, BlogPost.created_at).filter(
+        BlogPost.author_id == user_id
+    ).order_by(BlogPost.id.desc()).limit(recent).all()
+    _insert_entries([
+        {'user_id': reader_id, 'post_id': post_id, 'author_id': user_id, 'created_at': created_at}
+        for reader_id in connections for post_id, created_at in posts
+    ])
+
+
+def fan_out(post):
+    """Write timeline rows for a new post; call before committing it"""
+    recipients = {post.author_id}
+    if not is_celebrity(post.author_id):
+        recipients |= graph.connection_ids(post.author_id)
+
+    created_at = post.created_at or datetime.utcnow()
+    db.session.execute(TimelineEntry.__table__.insert(), [
+        {'user_id': user_id, 'post_id': post.id, 'author_id': post.author_id, 'created_at': created_at}
+        for user_id in recipients
+    ])
+
+
+def remove_post(post_id):
+    TimelineEntry.query.filter(TimelineEntry.post_id == post_id).delete(synchronize_session=False)
+
+
+def connect(user_id, other_user_id, recent=RECENT_POSTS):
+    """Copy each side's recent posts into the other's timeline after a connection is accepted"""
+    for author_id in (user_id, other_user_id):
+        update_celebrity(author_id, recent)
+    for reader_id, author_id in ((user_id, other_user_id), (other_user_id, user_id)):
+        if is_celebrity(author_id):
+            continue
+        posts = db.session.query(BlogPost.id, BlogPost.created_at).filter(
+            BlogPost.author_id == author_id
+        ).order_by(BlogPost.id.desc()).limit(recent).all()
+        _insert_entries([
+            {'user_id': reader_id, 'post_id': post_id, 'author_id': author_id, 'created_at': created_at}
+            for post_id, created_at in posts
+        ])
+
+
+def disconnect(user_id, other_user_id):
+    """Drop each side's posts from the other's timeline"""
+    TimelineEntry.query.filter(db.or_(
+        db.and_(TimelineEntry.user_id == user_id, TimelineEntry.author_id == other_user_id),
+        db.and_(TimelineEntry.user_id == other_user_id, TimelineEntry.author_id == user_id)
+    )).delete(synchronize_session=False)
+    for author_id in (user_id, other_user_id):
+        update_celebrity(author_id)
+
+
+def read_timeline(user_id, before_id=None, limit=20):
+    """Post ids for a page of the user's feed, newest first. Returns (post_ids, has_more)."""
+    query = db.session.query(TimelineEntry.post_id).filter(TimelineEntry.user_id == user_id)
+    if before_id is not None:
+        query = query.filter(TimelineEntry.post_id < before_id)
+    post_ids = [post_id for (post_id,) in query.order_by(TimelineEntry.post_id.desc()).limit(limit + 1)]
+
+    # Fan-out on read for followed celebrities
+    celebrities = {
+        celebrity_id for (celebrity_id,) in db.session.query(FeedCelebrity.user_id).join(
+            connection_edges, db.and_(
+                connection_edges.c.other_user_id == FeedCelebrity.user_id,
+                connection_edges.c.user_id == user_id,
+                connection_edges.c.status == 'accepted'
+            )
+        )
+    }
+    if celebrities:
+        pulled = db.session.query(BlogPost.id).filter(BlogPost.author_id.in_(celebrities))
+        if before_id is not None:
+            pulled = pulled.filter(BlogPost.id < before_id)
+        post_ids = sorted(
+            set(post_ids) | {post_id for (post_id,) in pulled.order_by(BlogPost.id.desc()).limit(limit + 1)},
+            reverse=True
+        )
+
+    return post_ids[:limit], len(post_ids) > limit
+
+
+def rebuild_timelines(days=30):
+    """
+    Recompute feed_celebrities from the graph and refill every timeline with
+    the last `days` of posts from connections; returns rows written
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    TimelineEntry.query.delete(synchronize_session=False)
+    FeedCelebrity.query.delete(synchronize_session=False)
+    db.session.execute(FeedCelebrity.__table__.insert().from_select(
+        ['user_id', 'since'],
+        db.select(connection_edges.c.user_id, db.literal(datetime.utcnow(), db.DateTime)).where(
+            connection_edges.c.status == 'accepted'
+        ).group_by(connection_edges.c.user_id).having(db.func.count() > _fanout_limit())
+    ))
+
+    own = db.select(
+        BlogPost.author_id.label('user_id'), BlogPost.id, BlogPost.author_id, BlogPost.created_at
+    ).where(BlogPost.created_at >= cutoff)
+    celebrities = db.select(FeedCelebrity.user_id)
+    from_connections = db.select(
+        connection_edges.c.user_id, BlogPost.id, BlogPost.author_id, BlogPost.created_at
+    ).join(
+        connection_edges, db.and_(
+            connection_edges.c.other_user_id == BlogPost.author_id,
+            connection_edges.c.status == 'accepted'
+        )
+    ).where(BlogPost.created_at >= cutoff, BlogPost.author_id.notin_(celebrities))
+
+    columns = ['user_id', 'post_id', 'author_id', 'created_at']
+    written = 0
+    for select in (own, from_connections):
+        result = db.session.execute(TimelineEntry.__table__.insert().from_select(columns, select))
+        written += result.rowcount or 0
+    db.session.commit()
+    return written
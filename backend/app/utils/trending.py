@@ -0,0 +1,267 @@
+"""
+Trending Topics
+
+Hashtags (#python) and mentions (@jane) are extracted from posts when they are
+created or edited and indexed in `post_tags`.
+
+Each worker counts tags over a sliding window of TRENDING_WINDOW_MINUTES made
+of TRENDING_BUCKET_MINUTES buckets:
+
+- every bucket is a count-min sketch (depth x width counters) and a running
+  total sketch holds the sum of the live buckets; when a bucket leaves the
+  window it is subtracted from the total and cleared;
+- a small candidate set per kind, trimmed with a heap, keeps the tags with
+  the highest estimates, so reading the top topics never touches the database.
+
+Every TRENDING_REFRESH_SECONDS a worker re-warms its window from `post_tags`
+on the next read, so it also sees posts created or untagged on the other
+workers. `flask run-scheduler` (or `flask snapshot-trending`) stores the top
+topics in `trending_snapshots`.
+"""
+import hashlib
+import heapq
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from app import db, socketio
+from app.models import BlogPost, PostTag, TrendingSnapshot
+
+HASHTAG_RE = re.compile(r'(?<![\w#&])#(\w{1,100})')
+MENTION_RE = re.compile(r'(?<![\w@])@(\w{1,100})')
+KINDS = ('hashtag', 'mention')
+SNAPSHOT_RETENTION_DAYS = 7
+EPOCH = datetime(1970, 1, 1)
+
+
+def extract_tags(content):
+    """{(kind, tag)} for the hashtags and mentions in a piece of text"""
+    tags = set()
+    for match in HASHTAG_RE.finditer(content or ''):
+        tag = match.group(1).lower()
+        if not tag.isdigit():
+            tags.add(('hashtag', tag))
+    for match in MENTION_RE.finditer(content or ''):
+        tags.add(('mention', match.group(1).lower()))
+    return tags
+
+
+class CountMinSketch:
+    """Approximate counters: estimates never undercount, and overcount by little"""
+
+    def __init__(self, width, depth):
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def indexes(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, indexes, count=1):
+        for row, i in zip(self.rows, indexes):
+            row[i] += count
+
+    def estimate(self, indexes):
+        return min(row[i] for row, i in zip(self.rows, indexes))
+
+    def subtract(self, other):
+        self.rows = [[a - b for a, b in zip(row, other_row)] for row, other_row in zip(self.rows, other.rows)]
+
+
+class TrendingTracker:
+    """Per-worker sliding-window tag counts with a top-k candidate set"""
+
+    def __init__(self):
+        self.window_minutes = 60
+        self.bucket_minutes = 5
+        self.top_k = 20
+        self.width = 2048
+        self.depth = 4
+        self.refresh_seconds = 60
+        self._lock = threading.Lock()
+        self._warmed_at = None  # time.monotonic() of the last warm
+        self._reset()
+
+    def init_app(self, app):
+        self.window_minutes = app.config.get('TRENDING_WINDOW_MINUTES', self.window_minutes)
+        self.bucket_minutes = app.config.get('TRENDING_BUCKET_MINUTES', self.bucket_minutes)
+        self.top_k = app.config.get('TRENDING_TOP_K', self.top_k)
+        self.width = app.config.get('TRENDING_SKETCH_WIDTH', self.width)
+        self.depth = app.config.get('TRENDING_SKETCH_DEPTH', self.depth)
+        self.refresh_seconds = app.config.get('TRENDING_REFRESH_SECONDS', self.refresh_seconds)
+        with self._lock:
+            self._warmed_at = None
+            self._reset()
+
+    def _reset(self):
+        self._slots = max(self.window_minutes // self.bucket_minutes, 1)
+        self._buckets = [CountMinSketch(self.width, self.depth) for _ in range(self._slots)]
+        self._total = CountMinSketch(self.width, self.depth)
+        self._current = None    # Number of the newest bucket
+        self._candidates = {kind: {} for kind in KINDS}  # kind -> {tag: estimate}
+
+    def _bucket_number(self, at):
+        return int((at - EPOCH).total_seconds() // (self.bucket_minutes * 60))
+
+    def _advance(self, number):
+        """Slide the window forward so `number` is the newest bucket"""
+        if self._current is not None and number <= self._current:
+            return
+        if self._current is None or number - self._current >= self._slots:
+            self._reset()
+        else:
+            for expired in range(self._current + 1, number + 1):
+                slot = expired % self._slots
+                self._total.subtract(self._buckets[slot])
+                self._buckets[slot] = CountMinSketch(self.width, self.depth)
+            for kind, candidates in self._candidates.items():
+                estimates = ((tag, self._estimate(kind, tag)) for tag in candidates)
+                self._candidates[kind] = {tag: estimate for tag, estimate in estimates if estimate > 0}
+        self._current = number
+
+    def _estimate(self, kind, tag):
+        return self._total.estimate(self._total.indexes(f'{kind}:{tag}'))
+
+    def _add(self, kind, tag, number):
+        self._advance(number)
+        if number <= self._current - self._slots:
+            return
+        indexes = self._total.indexes(f'{kind}:{tag}')
+        self._buckets[number % self._slots].add(indexes)
+        self._total.add(indexes)
+        candidates = self._candidates[kind]
+        candidates[tag] = self._total.estimate(indexes)
+        if len(candidates) > 2 * self.top_k:
+            self._candidates[kind] = dict(heapq.nlargest(self.top_k, candidates.items(), key=lambda item: item[1]))
+
+    def record(self, tags, at=None):
+        """Count (kind, tag) pairs seen at `at` (default now)"""
+        number = self._bucket_number(at or datetime.utcnow())
+        with self._lock:
+            for kind, tag in tags:
+                self._add(kind, tag, number)
+
+    def ensure_warm(self):
+        """Warm on first use, then again once the window is refresh_seconds old"""
+        now = time.monotonic()
+        with self._lock:
+            if self._warmed_at is not None:
+                if not self.refresh_seconds or now - self._warmed_at < self.refresh_seconds:
+                    return
+                # Other requests keep reading the current window while this one re-warms
+                self._warmed_at = now
+        self.warm()
+
+    def warm(self):
+        """Rebuild the window from post_tags"""
+        now = datetime.utcnow()
+        rows = db.session.query(PostTag.kind, PostTag.tag, PostTag.created_at).filter(
+            PostTag.created_at >= now - timedelta(minutes=self.window_minutes)
+        ).all()
+        with self._lock:
+            self._reset()
+            self._advance(self._bucket_number(now))
+            for kind, tag, created_at in rows:
+                self._add(kind, tag, self._bucket_number(created_at))
+            self._warmed_at = time.monotonic()
+
+    def top(self, kind=None, limit=None):
+        """[{'kind', 'tag', 'count'}] by estimated count in the window, highest first"""
+        self.ensure_warm()
+        with self._lock:
+            self._advance(self._bucket_number(datetime.utcnow()))
+            entries = [
+                (count, topic_kind, tag)
+                for topic_kind in ((kind,) if kind else KINDS)
+                for tag, count in self._candidates[topic_kind].items()
+            ]
+        ranked = heapq.nlargest(min(limit or self.top_k, self.top_k), entries)
+        return [{'kind': topic_kind, 'tag': tag, 'count': count} for count, topic_kind, tag in ranked]
+
+
+tracker = TrendingTracker()
+
+
+def index_post(post):
+    """
+    Sync post_tags with the post's content; call before committing. Returns
+    the newly added (kind, tag) pairs, to be passed to `tracker.record` once
+    the commit succeeded.
+    """
+    tracker.ensure_warm()
+    tags = extract_tags(post.content)
+    existing = {
+        (kind, tag) for kind, tag in db.session.query(PostTag.kind, PostTag.tag).filter(PostTag.post_id == post.id)
+    }
+    for kind, tag in existing - tags:
+        PostTag.query.filter_by(post_id=post.id, kind=kind, tag=tag).delete(synchronize_session=False)
+    added = tags - existing
+    if added:
+        # Tags count as activity at the time the post was written, not when it was edited
+        created_at = post.created_at or datetime.utcnow()
+        db.session.execute(PostTag.__table__.insert(), [
+            {'post_id': post.id, 'kind': kind, 'tag': tag, 'created_at': created_at} for kind, tag in added
+        ])
+    return added
+
+
+def remove_post(post_id):
+    PostTag.query.filter(PostTag.post_id == post_id).delete(synchronize_session=False)
+
+
+def backfill_tags(batch_size=1000):
+    """Index tags of posts written before post_tags existed; returns posts indexed"""
+    PostTag.query.delete(synchronize_session=False)
+    indexed = 0
+    last_id = 0
+    while True:
+        posts = db.session.query(BlogPost.id, BlogPost.content, BlogPost.created_at).filter(
+            BlogPost.id > last_id
+        ).order_by(BlogPost.id).limit(batch_size).all()
+        if not posts:
+            break
+        rows = [
+            {'post_id': post_id, 'kind': kind, 'tag': tag, 'created_at': created_at}
+            for post_id, content, created_at in posts for kind, tag in extract_tags(content)
+        ]
+        if rows:
+            db.session.execute(PostTag.__table__.insert(), rows)
+        indexed += len(posts)
+        last_id = posts[-1][0]
+    db.session.commit()
+    return indexed
+
+
+def snapshot_trending():
+    """Re-warm the window from post_tags and store the top topics; returns the snapshot"""
+    tracker.warm()
+    now = datetime.utcnow()
+    snapshot = TrendingSnapshot(window_minutes=tracker.window_minutes, topics=tracker.top(), computed_at=now)
+    db.session.add(snapshot)
+    TrendingSnapshot.query.filter(
+        TrendingSnapshot.computed_at < now - timedelta(days=SNAPSHOT_RETENTION_DAYS)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return snapshot
+
+
+def start_trending_scheduler(app):
+    """Snapshot trending topics every TRENDING_SNAPSHOT_MINUTES in a background task"""
+    interval_minutes = app.config.get('TRENDING_SNAPSHOT_MINUTES', 0)
+    if not interval_minutes:
+        return None
+
+    def run():
+        while True:
+            socketio.sleep(interval_minutes * 60)
+            with app.app_context():
+                try:
+                    snapshot_trending()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[Trending] Snapshot failed: {e}")
+
+    return socketio.start_background_task(run)
@@ -25,6 +25,78 @@ class Config:
     
     # Frontend URL for reset links
     FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
+
+    # Socket.IO backplane for multiple workers/nodes (redis://, amqp://, kafka://, memory://)
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_CHANNEL = os.environ.get('SOCKETIO_CHANNEL', 'hustconnect-socketio')
+    # Emits are queued and sent by a background task; when the queue is full the
+    # request emits inline (0 = always emit inline)
+    SOCKET_EMIT_QUEUE_SIZE = int(os.environ.get('SOCKET_EMIT_QUEUE_SIZE', 10000))
+    SOCKET_EMIT_BATCH_SIZE = int(os.environ.get('SOCKET_EMIT_BATCH_SIZE', 100))
+
+    # Presence/typing state is kept in memory; workers share it over this bus
+    # (redis:// or memory://, unset = single worker)
+    PRESENCE_BUS_URL = os.environ.get('PRESENCE_BUS_URL')
+    PRESENCE_BUS_CHANNEL = os.environ.get('PRESENCE_BUS_CHANNEL', 'hustconnect-presence')
+    PRESENCE_TTL_SECONDS = int(os.environ.get('PRESENCE_TTL_SECONDS', 60))
+    PRESENCE_BROADCAST_SECONDS = float(os.environ.get('PRESENCE_BROADCAST_SECONDS', 2))
+    TYPING_TTL_SECONDS = int(os.environ.get('TYPING_TTL_SECONDS', 6))
+
+    # Unread notifications with the same (user, type, group key) inside this window are merged
+    NOTIFICATION_COALESCE_WINDOW = timedelta(minutes=int(os.environ.get('NOTIFICATION_COALESCE_MINUTES', 60)))
+
+    # Messages older than this are moved to messages_archive (0 = never)
+    MESSAGE_ARCHIVE_DAYS = int(os.environ.get('MESSAGE_ARCHIVE_DAYS', 180))
+    # Run the archive job from `flask run-scheduler` every N hours (0 = only via `flask archive-messages`)
+    MESSAGE_ARCHIVE_INTERVAL_HOURS = int(os.environ.get('MESSAGE_ARCHIVE_INTERVAL_HOURS', 0))
+
+    # Per-worker cache of accepted connections (entries are also refreshed after the TTL)
+    CONNECTION_CACHE_SIZE = int(os.environ.get('CONNECTION_CACHE_SIZE', 10000))
+    CONNECTION_CACHE_TTL_SECONDS = int(os.environ.get('CONNECTION_CACHE_TTL_SECONDS', 300))
+    # Viewers whose second-degree frontier is kept for degree badges
+    DEGREE_CACHE_SIZE = int(os.environ.get('DEGREE_CACHE_SIZE', 2000))
+
+    # Graph batch jobs: network analytics + "people you may know", run from `flask run-scheduler`
+    # every SUGGESTIONS_INTERVAL_HOURS (0 = only via `flask network-stats` / `flask compute-suggestions`)
+    SUGGESTIONS_PER_USER = int(os.environ.get('SUGGESTIONS_PER_USER', 20))
+    SUGGESTIONS_INTERVAL_HOURS = int(os.environ.get('SUGGESTIONS_INTERVAL_HOURS', 0))
+
+    # Authors with more connections than this are merged into feeds on read instead of fanned out
+    FEED_FANOUT_LIMIT = int(os.environ.get('FEED_FANOUT_LIMIT', 1000))
+
+    # Top feed: engagement points halve every FEED_SCORE_HALF_LIFE_HOURS; the decay
+    # sweep runs from `flask run-scheduler` every FEED_DECAY_INTERVAL_MINUTES (0 = only via `flask decay-scores`)
+    FEED_SCORE_HALF_LIFE_HOURS = float(os.environ.get('FEED_SCORE_HALF_LIFE_HOURS', 24))
+    FEED_DECAY_INTERVAL_MINUTES = int(os.environ.get('FEED_DECAY_INTERVAL_MINUTES', 0))
+
+    # Trending topics: per-worker count-min sketches over a sliding window. Each worker
+    # re-reads its window from post_tags every TRENDING_REFRESH_SECONDS so posts and
+    # edits handled by other workers show up (0 = never; only safe with a single worker).
+    # Snapshots are stored by `flask run-scheduler` every TRENDING_SNAPSHOT_MINUTES
+    # (0 = only via `flask snapshot-trending`)
+    TRENDING_WINDOW_MINUTES = int(os.environ.get('TRENDING_WINDOW_MINUTES', 60))
+    TRENDING_BUCKET_MINUTES = int(os.environ.get('TRENDING_BUCKET_MINUTES', 5))
+    TRENDING_TOP_K = int(os.environ.get('TRENDING_TOP_K', 20))
+    TRENDING_SKETCH_WIDTH = int(os.environ.get('TRENDING_SKETCH_WIDTH', 2048))
+    TRENDING_SKETCH_DEPTH = int(os.environ.get('TRENDING_SKETCH_DEPTH', 4))
+    TRENDING_REFRESH_SECONDS = int(os.environ.get('TRENDING_REFRESH_SECONDS', 60))
+    TRENDING_SNAPSHOT_MINUTES = int(os.environ.get('TRENDING_SNAPSHOT_MINUTES', 0))
+
+    # Text search configuration used for the PostgreSQL message search index
+    MESSAGE_SEARCH_CONFIG = os.environ.get('MESSAGE_SEARCH_CONFIG', 'simple')
+
+    # Delta sync: changes younger than this are re-sent on the next sync so late
+    # commits with lower ids are never skipped; older changes are pruned
+    SYNC_SETTLE_SECONDS = int(os.environ.get('SYNC_SETTLE_SECONDS', 5))
+    SYNC_RETENTION_DAYS = int(os.environ.get('SYNC_RETENTION_DAYS', 30))
+    # Run the prune job from `flask run-scheduler` every N hours (0 = only via `flask prune-sync-log`)
+    SYNC_PRUNE_INTERVAL_HOURS = int(os.environ.get('SYNC_PRUNE_INTERVAL_HOURS', 0))
+
+    # Notification retention: read notifications older than this are purged (or archived)
+    NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+    NOTIFICATION_RETENTION_ARCHIVE = os.environ.get('NOTIFICATION_RETENTION_ARCHIVE', 'false').lower() == 'true'
+    # Run the retention job from `flask run-scheduler` every N hours (0 = only via `flask purge-notifications`)
+    NOTIFICATION_RETENTION_INTERVAL_HOURS = int(os.environ.get('NOTIFICATION_RETENTION_INTERVAL_HOURS', 0))
     
 
 class DevelopmentConfig(Config):
@@ -56,6 +128,7 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SOCKET_EMIT_QUEUE_SIZE = 0
 
 
 config = {
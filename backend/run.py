@@ -2,6 +2,7 @@
 Flask Application Entry Point
 """
 import os
+import click
 from app import create_app, db
 
 app = create_app(os.getenv('FLASK_ENV') or 'development')
@@ -26,6 +27,190 @@ def reset_db():
     print('Database reset!')
 
 
+@app.cli.command('rebuild-counters')
+def rebuild_counters():
+    """Recompute the per-user unread counters from notifications and messages"""
+    from app.utils.counters import rebuild_counters as rebuild
+    
+    count = rebuild()
+    db.session.commit()
+    print(f'Rebuilt unread counters for {count} users!')
+
+
+@app.cli.command('backfill-direct-keys')
+def backfill_direct_keys():
+    """Assign canonical pair keys to 1:1 conversations created before direct_key existed"""
+    from app.models import Conversation, ConversationParticipant
+    
+    two_person = db.session.query(ConversationParticipant.conversation_id).group_by(
+        ConversationParticipant.conversation_id
+    ).having(db.func.count(ConversationParticipant.user_id) == 2)
+    
+    members = {}
+    for conversation_id, user_id in db.session.query(
+        ConversationParticipant.conversation_id, ConversationParticipant.user_id
+    ).filter(ConversationParticipant.conversation_id.in_(two_person)):
+        members.setdefault(conversation_id, []).append(user_id)
+    
+    taken = {key for (key,) in db.session.query(Conversation.direct_key).filter(Conversation.direct_key.isnot(None))}
+    assigned = 0
+    # Most recently active conversation wins when a pair has duplicates
+    for conversation in Conversation.query.filter(
+        Conversation.id.in_(list(members)), Conversation.direct_key.is_(None)
+    ).order_by(Conversation.updated_at.desc()):
+        key = Conversation.make_direct_key(*members[conversation.id])
+        if key in taken:
+            continue
+        conversation.direct_key = key
+        taken.add(key)
+        assigned += 1
+    
+    db.session.commit()
+    print(f'Assigned direct keys to {assigned} conversations!')
+
+
+@app.cli.command('rebuild-connection-edges')
+def rebuild_connection_edges():
+    """Recreate the symmetric connection_edges mirror from user_connections"""
+    from app.utils.graph import rebuild_edges
+    
+    written = rebuild_edges()
+    print(f'Wrote {written} connection edges!')
+
+
+@app.cli.command('compute-suggestions')
+@click.option('--per-user', type=int, default=None, help='Suggestions stored per user (default: SUGGESTIONS_PER_USER)')
+def compute_suggestions(per_user):
+    """Rebuild the precomputed "people you may know" suggestions"""
+    from app.utils.suggestions import compute_suggestions as compute
+    
+    written = compute(per_user=per_user or app.config['SUGGESTIONS_PER_USER'])
+    print(f'Stored {written} suggestions!')
+
+
+@app.cli.command('network-stats')
+def network_stats():
+    """Compute degree, influence and component stats over the connection graph"""
+    from app.utils.network import compute_network_stats
+    
+    snapshot = compute_network_stats()
+    print(f'Analyzed {snapshot.users} users and {snapshot.connections} connections '
+          f'({snapshot.components} components, largest {snapshot.largest_component})!')
+
+
+@app.cli.command('rebuild-timelines')
+@click.option('--days', type=int, default=30, help='How far back to copy posts into timelines')
+def rebuild_timelines(days):
+    """Refill home timelines from recent posts of each user's connections"""
+    from app.utils.timeline import rebuild_timelines as rebuild
+    
+    written = rebuild(days=days)
+    print(f'Wrote {written} timeline entries!')
+
+
+@app.cli.command('decay-scores')
+@click.option('--rebuild', is_flag=True, help='Recompute all scores from likes, comments and reposts')
+def decay_scores(rebuild):
+    """Apply engagement score decay since the last sweep (for the Top feed)"""
+    from app.utils import engagement
+    
+    if rebuild:
+        print(f'Rebuilt engagement scores for {engagement.rebuild_scores()} posts!')
+    else:
+        print(f'Decayed engagement scores by a factor of {engagement.decay_scores():.4f}!')
+
+
+@app.cli.command('snapshot-trending')
+@click.option('--backfill', is_flag=True, help='Index hashtags and mentions of existing posts first')
+def snapshot_trending(backfill):
+    """Store the current trending topics in trending_snapshots"""
+    from app.utils import trending
+    
+    if backfill:
+        print(f'Indexed tags of {trending.backfill_tags()} posts')
+    snapshot = trending.snapshot_trending()
+    for topic in snapshot.topics:
+        prefix = '#' if topic['kind'] == 'hashtag' else '@'
+        print(f"{prefix}{topic['tag']}: {topic['count']}")
+    print(f'Stored snapshot of {len(snapshot.topics)} topics!')
+
+
+@app.cli.command('run-scheduler')
+def run_scheduler():
+    """Run the configured periodic jobs; start exactly one of these per deployment"""
+    from app import socketio
+    from app.utils.scheduler import start_schedulers
+    
+    started = start_schedulers(app)
+    if not started:
+        print('No periodic jobs configured!')
+        return
+    print(f'Running periodic jobs: {", ".join(started)}')
+    while True:
+        socketio.sleep(3600)
+
+
+@app.cli.command('send-digest')
+@click.option('--hours', default=24, help='Look-back window for users without a previous digest')
+def send_digest(hours):
+    """Email opted-in users a digest of their unread notifications"""
+    from app.utils.digest import send_notification_digests
+    
+    sent = send_notification_digests(hours=hours)
+    print(f'Sent {sent} notification digests!')
+
+
+@app.cli.command('purge-notifications')
+@click.option('--days', type=int, default=None, help='Keep read notifications newer than this (default: NOTIFICATION_RETENTION_DAYS)')
+@click.option('--batch-size', default=1000, help='Rows deleted per transaction')
+@click.option('--archive/--no-archive', default=None, help='Move rows to notifications_archive instead of deleting them')
+def purge_notifications(days, batch_size, archive):
+    """Delete or archive old read notifications in bounded batches"""
+    from app.utils.retention import purge_notifications as purge
+    
+    summary = purge(
+        days=days if days is not None else app.config['NOTIFICATION_RETENTION_DAYS'],
+        batch_size=batch_size,
+        archive=archive if archive is not None else app.config['NOTIFICATION_RETENTION_ARCHIVE']
+    )
+    print(f"Purged {summary['deleted']} notifications in {summary['batches']} batches, "
+          f"dropped {summary['partitionsDropped']} partitions!")
+
+
+@app.cli.command('prune-sync-log')
+@click.option('--days', type=int, default=None, help='Keep changes newer than this (default: SYNC_RETENTION_DAYS)')
+def prune_sync_log(days):
+    """Delete old delta-sync change log rows; older client tokens get a reset"""
+    from app.utils.sync import prune_changes
+    
+    deleted = prune_changes(days=days if days is not None else app.config['SYNC_RETENTION_DAYS'])
+    print(f'Pruned {deleted} sync changes!')
+
+
+@app.cli.command('archive-messages')
+@click.option('--days', type=int, default=None, help='Archive messages older than this (default: MESSAGE_ARCHIVE_DAYS)')
+@click.option('--batch-size', type=int, default=1000, help='Rows moved per transaction')
+def archive_old_messages(days, batch_size):
+    """Move old messages from the hot table into messages_archive"""
+    from app.utils.archive import archive_messages
+    
+    moved = archive_messages(days=days if days is not None else app.config['MESSAGE_ARCHIVE_DAYS'], batch_size=batch_size)
+    print(f'Archived {moved} messages!')
+
+
+@app.cli.command('partition-notifications')
+@click.option('--months-ahead', default=3, help='Monthly partitions to create in advance')
+def partition_notifications(months_ahead):
+    """Convert notifications to monthly range partitions (PostgreSQL only)"""
+    from app.utils.retention import partition_notifications as partition, ensure_partitions
+    
+    if partition(months_ahead=months_ahead):
+        print('Notifications table partitioned by month!')
+    else:
+        ensure_partitions(months_ahead=months_ahead)
+        print('Notifications table already partitioned; upcoming partitions ensured.')
+
+
 if __name__ == '__main__':
     from app import socketio
     socketio.run(app, host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,107 @@
+"""
+Benchmark chat fan-out across Socket.IO workers sharing a backplane.
+
+Each simulated worker is its own Flask app + Socket.IO server, connected to
+the others through the in-process backplane (SOCKETIO_MESSAGE_QUEUE=memory://).
+Clients are spread round-robin over the workers and all join one conversation
+room; messages are emitted from worker 0 and timed until every client on every
+worker has received all of them.
+
+Run: python scripts/benchmark_socket_fanout.py --clients 200 --messages 50
+"""
+import sys
+import os
+import time
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask_socketio import SocketIO, join_room
+from flask_socketio import test_client as socketio_test_client
+
+from app.utils.backplane import InProcessManager, socketio_options
+
+# The Flask-SocketIO test client refuses pub/sub managers because a real queue
+# delivers asynchronously. The in-process bus is safe to drive from it as long
+# as we wait for deliveries, which wait_for() does.
+class _NoQueueCheck:
+    pass
+
+
+socketio_test_client.PubSubManager = _NoQueueCheck
+
+CHANNEL = 'benchmark-fanout'
+ROOM = 'conversation_1'
+
+
+def create_worker(index):
+    app = Flask(f'worker_{index}')
+    app.config.update(SOCKETIO_MESSAGE_QUEUE='memory://', SOCKETIO_CHANNEL=CHANNEL)
+    # Same backplane wiring as create_app()
+    sio = SocketIO(app, async_mode='threading', **socketio_options(app.config))
+
+    @sio.on('join')
+    def on_join(data):
+        join_room(f"conversation_{data['conversationId']}")
+
+    return app, sio
+
+
+def wait_for(clients, expected, timeout=60):
+    """Poll until every client has received `expected` messages"""
+    received = [0] * len(clients)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        for i, client in enumerate(clients):
+            received[i] += sum(1 for packet in client.get_received() if packet['name'] == 'new_message')
+        if all(count >= expected for count in received):
+            return True
+        time.sleep(0.001)
+    return False
+
+
+def run(workers, clients, messages):
+    InProcessManager.reset(CHANNEL)
+    servers = [create_worker(i) for i in range(workers)]
+
+    socket_clients = []
+    for i in range(clients):
+        app, sio = servers[i % workers]
+        client = sio.test_client(app)
+        client.emit('join', {'conversationId': 1})
+        socket_clients.append(client)
+    # Let room joins settle and drain connect packets
+    time.sleep(0.2)
+    for client in socket_clients:
+        client.get_received()
+
+    sender = servers[0][1]
+    start = time.perf_counter()
+    for n in range(messages):
+        sender.emit('new_message', {'conversationId': 1, 'message': {'id': n, 'content': 'x' * 120}}, room=ROOM)
+    delivered = wait_for(socket_clients, messages)
+    elapsed = time.perf_counter() - start
+
+    for client in socket_clients:
+        client.disconnect()
+    InProcessManager.reset(CHANNEL)
+    return delivered, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Socket.IO fan-out across workers.')
+    parser.add_argument('--clients', type=int, default=200, help='Connected clients in the room')
+    parser.add_argument('--messages', type=int, default=50, help='Messages emitted from worker 0')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='Worker counts to compare')
+    args = parser.parse_args()
+
+    print(f'{args.clients} clients, {args.messages} messages, room {ROOM}')
+    print(f"{'workers':>8} {'clients/worker':>15} {'delivered':>10} {'seconds':>9} {'deliveries/s':>13}")
+    for workers in args.workers:
+        delivered, elapsed = run(workers, args.clients, args.messages)
+        rate = args.clients * args.messages / elapsed if elapsed else 0
+        print(f'{workers:>8} {args.clients // workers:>15} {str(delivered):>10} {elapsed:>9.3f} {rate:>13.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Shared fixtures: a fresh app on an in-memory database per test, users, and
+API clients authenticated with the same JWTs the frontend sends.
+"""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import User
+from app.utils.graph import adjacency, degrees
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    # Per-worker caches outlive the app; ids restart with every fresh database
+    adjacency.clear()
+    degrees.clear()
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def make_user(app):
+    def make(name='user', **fields):
+        user = User(email=f'{name}-{User.query.count()}@example.com', name=name, **fields)
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def client_for(app):
+    def make(user):
+        client = app.test_client()
+        with app.app_context():
+            token = create_access_token(identity=str(user.id))
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        return client
+    return make
+
+
+@pytest.fixture
+def connect(client_for):
+    """Make two users accepted connections through the API"""
+    def make(user, other):
+        assert client_for(user).post(f'/api/connections/{other.id}').status_code in (200, 201)
+        assert client_for(other).put(f'/api/connections/{user.id}', json={'action': 'accept'}).status_code == 200
+    return make
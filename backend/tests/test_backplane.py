@@ -0,0 +1,72 @@
+"""
+Socket.IO backplane: an emit on one worker reaches clients of another.
+
+Two apps are built with create_app() on the in-process bus
+(SOCKETIO_MESSAGE_QUEUE=memory://), as two gunicorn workers would be with
+Redis. The receiving app is served over HTTP and a real Socket.IO client
+connects to it with a JWT, so it joins its user room through the app's own
+connect handler.
+"""
+import queue
+import threading
+
+import pytest
+import socketio as python_socketio
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import make_server
+
+from app import create_app, socketio
+from app.socket_events import user_room
+from app.utils.backplane import InProcessManager
+from config import TestingConfig
+
+CHANNEL = 'test-backplane'
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'SOCKETIO_MESSAGE_QUEUE', 'memory://')
+    monkeypatch.setattr(TestingConfig, 'SOCKETIO_CHANNEL', CHANNEL)
+
+    # `socketio` is a module-level singleton that each create_app() rebinds to
+    # a new server, so keep a handle on the first worker's server. The second
+    # app must be created last: the singleton dispatches its events.
+    sender_app = create_app('testing')
+    sender = socketio.server
+    receiver_app = create_app('testing')
+    assert isinstance(sender.manager, InProcessManager)
+    assert isinstance(socketio.server.manager, InProcessManager)
+
+    http = make_server('127.0.0.1', 0, receiver_app, threaded=True)
+    thread = threading.Thread(target=http.serve_forever, daemon=True)
+    thread.start()
+
+    yield sender, receiver_app, f'http://127.0.0.1:{http.server_port}'
+
+    http.shutdown()
+    InProcessManager.reset(CHANNEL)
+
+
+def connect_client(app, url, user_id):
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    received = queue.Queue()
+    client = python_socketio.Client()
+    client.on('new_notification', received.put)
+    client.connect(url, auth={'token': token}, transports=['polling'], wait_timeout=5)
+    return client, received
+
+
+def test_emit_to_user_room_reaches_other_worker(workers):
+    sender, receiver_app, url = workers
+    client, received = connect_client(receiver_app, url, user_id=42)
+    other, other_received = connect_client(receiver_app, url, user_id=7)
+    try:
+        sender.emit('new_notification', {'id': 1}, room=user_room(42), namespace='/')
+
+        assert received.get(timeout=5) == {'id': 1}
+        with pytest.raises(queue.Empty):
+            other_received.get(timeout=0.5)
+    finally:
+        client.disconnect()
+        other.disconnect()
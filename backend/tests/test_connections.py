@@ -0,0 +1,56 @@
+"""
+Batch connection lookups: statuses and network degrees for many users.
+"""
+import pytest
+
+BAD_BODIES = [
+    {'userIds': '12'},
+    {'userIds': [1, 'x']},
+    {'userIds': [1.5]},
+    {'userIds': [True]},
+    {'userIds': None},
+    [1, 2],
+    'userIds',
+]
+
+
+def test_statuses(make_user, client_for, connect):
+    me, friend, stranger = make_user('me'), make_user('friend'), make_user('stranger')
+    connect(me, friend)
+
+    response = client_for(me).post('/api/connections/status', json={'userIds': [me.id, friend.id, stranger.id]})
+
+    assert response.status_code == 200
+    statuses = response.get_json()['statuses']
+    assert statuses[str(me.id)]['status'] == 'self'
+    assert statuses[str(friend.id)]['status'] == 'accepted'
+    assert statuses[str(stranger.id)]['status'] == 'none'
+
+
+@pytest.mark.parametrize('body', BAD_BODIES)
+def test_statuses_reject_malformed_bodies(make_user, client_for, body):
+    response = client_for(make_user()).post('/api/connections/status', json=body)
+
+    assert response.status_code == 400
+
+
+def test_degrees(make_user, client_for, connect):
+    me, friend, friend_of_friend, stranger = (make_user(name) for name in ('me', 'friend', 'fof', 'stranger'))
+    connect(me, friend)
+    connect(friend, friend_of_friend)
+
+    response = client_for(me).post(
+        '/api/connections/degrees', json={'userIds': [friend.id, friend_of_friend.id, stranger.id]}
+    )
+
+    assert response.status_code == 200
+    assert response.get_json()['degrees'] == {
+        str(friend.id): 1, str(friend_of_friend.id): 2, str(stranger.id): None,
+    }
+
+
+@pytest.mark.parametrize('body', BAD_BODIES)
+def test_degrees_reject_malformed_bodies(make_user, client_for, body):
+    response = client_for(make_user()).post('/api/connections/degrees', json=body)
+
+    assert response.status_code == 400
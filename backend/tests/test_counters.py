@@ -0,0 +1,108 @@
+"""
+Unread counters: badges stay equal to what a COUNT(*) over the rows would say.
+"""
+from app import db
+from app.models import UserCounter
+from app.routes.notifications import create_notification
+from app.utils import counters
+
+
+def _badges(client):
+    data = client.get('/api/notifications/unread-count').get_json()
+    return data['count'], data['unreadMessages']
+
+
+def _notify(user, group_key=None):
+    notification = create_notification(user.id, 'test', 'Title', 'Message', group_key=group_key)
+    db.session.commit()
+    return notification.id
+
+
+def _recount():
+    """Counters as rebuilt from scratch"""
+    counters.rebuild_counters()
+    db.session.commit()
+    return {row.user_id: (row.unread_notifications, row.unread_messages) for row in UserCounter.query}
+
+
+def test_new_and_coalesced_notifications(make_user, client_for):
+    user = make_user()
+    client = client_for(user)
+
+    _notify(user)
+    _notify(user, group_key='post-1')
+    _notify(user, group_key='post-1')
+
+    assert _badges(client) == (2, 0)
+
+
+def test_reading_a_notification_twice_counts_once(make_user, client_for):
+    user = make_user()
+    client = client_for(user)
+    notification_id = _notify(user)
+    _notify(user)
+
+    for _ in range(2):
+        assert client.post(f'/api/notifications/{notification_id}/read').status_code == 200
+
+    assert _badges(client) == (1, 0)
+
+
+def test_deleting_and_reading_all(make_user, client_for):
+    user = make_user()
+    client = client_for(user)
+    first, second, third = _notify(user), _notify(user), _notify(user)
+
+    client.post(f'/api/notifications/{first}/read')
+    client.delete(f'/api/notifications/{first}')
+    client.delete(f'/api/notifications/{second}')
+    assert _badges(client) == (1, 0)
+
+    client.post('/api/notifications/mark-all-read')
+    assert _badges(client) == (0, 0)
+
+
+def test_counters_never_go_below_zero(make_user, client_for):
+    user = make_user()
+
+    counters.adjust('unread_notifications', {user.id: -5})
+    db.session.commit()
+
+    assert _badges(client_for(user)) == (0, 0)
+
+
+def test_messages_count_for_recipients_only(make_user, client_for):
+    sender, reader = make_user('sender'), make_user('reader')
+    client = client_for(sender)
+    conversation_id = client.post('/api/conversations', json={'participantIds': [reader.id]}).get_json()['conversation']['id']
+
+    for i in range(2):
+        client.post(f'/api/conversations/{conversation_id}/messages', json={'content': f'Message {i}'})
+
+    assert _badges(client) == (0, 0)
+    assert _badges(client_for(reader)) == (0, 2)
+
+
+def test_rebuild_matches_incremental_counters(make_user, client_for):
+    sender, reader = make_user('sender'), make_user('reader')
+    sender_client, reader_client = client_for(sender), client_for(reader)
+    conversation_id = sender_client.post(
+        '/api/conversations', json={'participantIds': [reader.id]}
+    ).get_json()['conversation']['id']
+    message_ids = [
+        sender_client.post(
+            f'/api/conversations/{conversation_id}/messages', json={'content': f'Message {i}'}
+        ).get_json()['message']['id']
+        for i in range(3)
+    ]
+    reader_client.post(f'/api/conversations/{conversation_id}/read', json={'messageId': message_ids[0]})
+    reader_client.post(f'/api/conversations/{conversation_id}/messages', json={'content': 'Reply'})
+    read_id = _notify(reader)
+    _notify(reader)
+    _notify(sender, group_key='g')
+    _notify(sender, group_key='g')
+    reader_client.post(f'/api/notifications/{read_id}/read')
+    incremental = {user.id: _badges(client) for user, client in ((sender, sender_client), (reader, reader_client))}
+
+    assert incremental == {sender.id: (1, 1), reader.id: (1, 0)}
+    assert _recount() == incremental
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import BlogPost, JobRun
+from app.utils import engagement
+
+
+def _score(post_id):
+    db.session.expire_all()
+    return db.session.get(BlogPost, post_id).engagement_score
+
+
+def _old_post(author, days):
+    created_at = datetime.utcnow() - timedelta(days=days)
+    post = BlogPost(author_id=author.id, content='old', created_at=created_at, engagement_score=0.0)
+    db.session.add(post)
+    # Decay has been applied up to now
+    db.session.add(JobRun(name=engagement.JOB_NAME, last_run_at=datetime.utcnow()))
+    db.session.commit()
+    return post
+
+
+def test_like_unlike_cycles_do_not_inflate_score(make_user, client_for):
+    author, fan = make_user('author'), make_user('fan')
+    post = _old_post(author, days=7)
+    client = client_for(fan)
+
+    for _ in range(10):
+        assert client.post(f'/api/posts/{post.id}/like').get_json()['liked'] is True
+        response = client.post(f'/api/posts/{post.id}/like').get_json()
+        assert response['liked'] is False and response['likesCount'] == 0
+
+    assert _score(post.id) < 0.01
+
+
+def test_unlike_removes_only_the_decayed_share(app, make_user, client_for):
+    author, fan = make_user('author'), make_user('fan')
+    post = _old_post(author, days=7)
+    half_life = app.config['FEED_SCORE_HALF_LIFE_HOURS']
+    client_for(fan).post(f'/api/posts/{post.id}/like')
+    assert _score(post.id) == engagement.POINTS['like']
+
+    # One half-life later the sweep halves the like; unliking removes that half
+    later = datetime.utcnow() + timedelta(hours=half_life)
+    assert abs(engagement.decay_scores(now=later) - 0.5) < 1e-3
+    client_for(fan).post(f'/api/posts/{post.id}/like')
+    assert abs(_score(post.id)) < 1e-3
+
+
+def test_decay_is_applied_once_per_interval(app, make_user):
+    author = make_user('author')
+    post = _old_post(author, days=0)
+    engagement.bump(post.id, 'comment')
+    db.session.commit()
+    half_life = app.config['FEED_SCORE_HALF_LIFE_HOURS']
+
+    later = datetime.utcnow() + timedelta(hours=half_life)
+    engagement.decay_scores(now=later)
+    # A second sweep for the same instant (another worker) changes nothing
+    assert engagement.decay_scores(now=later) == 1.0
+    assert abs(_score(post.id) - engagement.POINTS['comment'] / 2) < 1e-3
+
+
+def test_rebuild_matches_incremental_scores(make_user, client_for):
+    author, fan = make_user('author'), make_user('fan')
+    client = client_for(author)
+    post_id = client.post('/api/posts', json={'content': 'hello'}).get_json()['post']['id']
+    client_for(fan).post(f'/api/posts/{post_id}/like')
+    client_for(fan).post(f'/api/posts/{post_id}/comments', json={'content': 'nice'})
+    incremental = _score(post_id)
+
+    engagement.rebuild_scores()
+    assert abs(_score(post_id) - incremental) < 1e-3
@@ -0,0 +1,63 @@
+"""
+Conversations: read cursors and the unread counters they drive.
+"""
+import pytest
+
+
+@pytest.fixture
+def chat(make_user, client_for):
+    """(sender client, reader client, conversation id, [message ids])"""
+    sender, reader = make_user('sender'), make_user('reader')
+    sender_client, reader_client = client_for(sender), client_for(reader)
+    conversation_id = sender_client.post(
+        '/api/conversations', json={'participantIds': [reader.id]}
+    ).get_json()['conversation']['id']
+    message_ids = [
+        sender_client.post(
+            f'/api/conversations/{conversation_id}/messages', json={'content': f'Message {i}'}
+        ).get_json()['message']['id']
+        for i in range(3)
+    ]
+    return sender_client, reader_client, conversation_id, message_ids
+
+
+def _unread(client):
+    return client.get('/api/conversations/unread-count').get_json()['count']
+
+
+def test_mark_read_up_to_a_message(chat):
+    _, reader, conversation_id, message_ids = chat
+    assert _unread(reader) == 3
+
+    response = reader.post(f'/api/conversations/{conversation_id}/read', json={'messageId': message_ids[1]})
+
+    assert response.status_code == 200
+    assert response.get_json()['advanced']
+    assert _unread(reader) == 1
+
+
+def test_mark_read_defaults_to_the_latest_message(chat):
+    _, reader, conversation_id, message_ids = chat
+
+    data = reader.post(f'/api/conversations/{conversation_id}/read').get_json()
+
+    assert data['lastReadMessageId'] == message_ids[-1]
+    assert _unread(reader) == 0
+
+
+@pytest.mark.parametrize('message_id', ['abc', '12', 1.5, True, [1], {'id': 1}])
+def test_mark_read_rejects_malformed_message_ids(chat, message_id):
+    _, reader, conversation_id, _ = chat
+
+    response = reader.post(f'/api/conversations/{conversation_id}/read', json={'messageId': message_id})
+
+    assert response.status_code == 400
+    assert _unread(reader) == 3
+
+
+def test_mark_read_rejects_messages_of_other_conversations(chat):
+    _, reader, conversation_id, message_ids = chat
+
+    response = reader.post(f'/api/conversations/{conversation_id}/read', json={'messageId': message_ids[-1] + 100})
+
+    assert response.status_code == 404
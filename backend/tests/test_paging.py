@@ -0,0 +1,119 @@
+"""
+Cursor-paginated endpoints: every page size is clamped to at least one row,
+and following nextCursor visits every row exactly once.
+"""
+from app import db
+from app.models import BlogPost
+
+
+def _follow(client, url, key, **params):
+    """Ids of every item reached by following nextCursor from the first page"""
+    ids = []
+    cursor = None
+    while True:
+        query = dict(params, **({'cursor': cursor} if cursor else {}))
+        response = client.get(url, query_string=query)
+        assert response.status_code == 200
+        data = response.get_json()
+        ids.extend(item['id'] for item in data[key])
+        cursor = data['nextCursor']
+        if not cursor:
+            return ids
+
+
+def test_conversations_limit_zero_returns_a_page(make_user, client_for):
+    me = make_user('me')
+    client = client_for(me)
+    for i in range(2):
+        other = make_user(f'other{i}')
+        assert client.post('/api/conversations', json={'participantIds': [other.id]}).status_code == 200
+
+    response = client.get('/api/conversations', query_string={'limit': 0})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['conversations']) == 1
+    assert data['nextCursor']
+
+
+def test_conversations_cursor_reaches_every_conversation(make_user, client_for):
+    me = make_user('me')
+    client = client_for(me)
+    created = []
+    for i in range(5):
+        other = make_user(f'other{i}')
+        created.append(client.post('/api/conversations', json={'participantIds': [other.id]}).get_json()['conversation']['id'])
+
+    ids = _follow(client, '/api/conversations', 'conversations', limit=2)
+
+    assert sorted(ids) == sorted(created)
+
+
+def _post(author):
+    post = BlogPost(author_id=author.id, content='Hello')
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+def test_comments_limit_zero_returns_a_page(make_user, client_for):
+    author = make_user('author')
+    post = _post(author)
+    client = client_for(author)
+    for i in range(2):
+        assert client.post(f'/api/posts/{post.id}/comments', json={'content': f'Comment {i}'}).status_code == 201
+
+    response = client.get(f'/api/posts/{post.id}/comments', query_string={'limit': 0})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['comments']) == 1
+    assert data['nextCursor']
+
+
+def test_comments_cursor_reaches_every_comment_in_order(make_user, client_for):
+    author = make_user('author')
+    post = _post(author)
+    client = client_for(author)
+    created = [
+        client.post(f'/api/posts/{post.id}/comments', json={'content': f'Comment {i}'}).get_json()['comment']['id']
+        for i in range(5)
+    ]
+
+    assert _follow(client, f'/api/posts/{post.id}/comments', 'comments', limit=2) == created
+
+
+def test_tagged_posts_limit_zero_returns_a_page(make_user, client_for):
+    client = client_for(make_user('author'))
+    for i in range(2):
+        assert client.post('/api/posts/', json={'content': f'Post {i} #python'}).status_code == 201
+
+    response = client.get('/api/trending/tags/python', query_string={'limit': 0})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['posts']) == 1
+    assert data['nextCursor']
+
+
+def test_tagged_posts_cursor_reaches_every_post(make_user, client_for):
+    client = client_for(make_user('author'))
+    created = [
+        client.post('/api/posts/', json={'content': f'Post {i} #python'}).get_json()['post']['id']
+        for i in range(5)
+    ]
+
+    assert _follow(client, '/api/trending/tags/python', 'posts', limit=2) == created[::-1]
+
+
+def test_feed_limit_zero_returns_a_page(make_user, client_for):
+    client = client_for(make_user('author'))
+    for i in range(2):
+        assert client.post('/api/posts/', json={'content': f'Post {i}'}).status_code == 201
+
+    for params in ({'limit': 0}, {'limit': 0, 'mode': 'top'}):
+        response = client.get('/api/feed', query_string=params)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['posts']) == 1
+        assert data['nextCursor']
@@ -0,0 +1,53 @@
+"""
+Post serialization: like counts and the viewer's own like, without the likers.
+"""
+
+
+def _post(client, content='Hello'):
+    return client.post('/api/posts/', json={'content': content}).get_json()['post']['id']
+
+
+def _like_fields(post):
+    return post['likesCount'], post['isLiked']
+
+
+def test_posts_carry_the_count_and_the_viewers_like(make_user, client_for, connect):
+    author, fan, other = make_user('author'), make_user('fan'), make_user('other')
+    connect(author, fan)
+    connect(author, other)
+    liked_id, plain_id = _post(client_for(author)), _post(client_for(author))
+    assert client_for(fan).post(f'/api/posts/{liked_id}/like').get_json()['liked']
+
+    fan_feed = {post['id']: post for post in client_for(fan).get('/api/feed').get_json()['posts']}
+    other_feed = {post['id']: post for post in client_for(other).get('/api/feed').get_json()['posts']}
+
+    assert 'likes' not in fan_feed[liked_id]
+    assert _like_fields(fan_feed[liked_id]) == (1, True)
+    assert _like_fields(fan_feed[plain_id]) == (0, False)
+    assert _like_fields(other_feed[liked_id]) == (1, False)
+
+
+def test_anonymous_readers_see_counts_only(app, make_user, client_for):
+    author, fan = make_user('author'), make_user('fan')
+    post_id = _post(client_for(author))
+    client_for(fan).post(f'/api/posts/{post_id}/like')
+
+    anonymous = app.test_client().get(f'/api/posts/{post_id}').get_json()['post']
+    signed_in = client_for(fan).get(f'/api/posts/{post_id}').get_json()['post']
+
+    assert _like_fields(anonymous) == (1, False)
+    assert _like_fields(signed_in) == (1, True)
+
+
+def test_reposts_carry_the_original_posts_likes(make_user, client_for):
+    author, fan = make_user('author'), make_user('fan')
+    post_id = _post(client_for(author))
+    client = client_for(fan)
+    client.post(f'/api/posts/{post_id}/like')
+    assert client.post(f'/api/posts/{post_id}/repost', json={'content': 'Look'}).status_code == 201
+
+    posts = client.get('/api/posts/').get_json()['posts']
+
+    repost = next(post for post in posts if post['originalPost'])
+    assert _like_fields(repost) == (0, False)
+    assert _like_fields(repost['originalPost']) == (1, True)
@@ -0,0 +1,114 @@
+"""
+Presence: per-socket watch limits and offline announcements across workers.
+"""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import socketio
+from app.socket_events import MAX_WATCHED_USERS
+from app.utils import presence as presence_module
+from app.utils.presence import InProcessBus, PresenceTracker
+
+
+@pytest.fixture
+def socket_for(app):
+    clients = []
+
+    def make(user):
+        client = socketio.test_client(app, auth={'token': create_access_token(identity=str(user.id))})
+        assert client.is_connected()
+        clients.append(client)
+        return client
+    yield make
+    for client in clients:
+        client.disconnect()
+
+
+def _events(client):
+    return [(event['name'], event['args'][0]) for event in client.get_received()]
+
+
+def test_watch_limit_applies_to_the_socket_not_the_call(make_user, socket_for):
+    client = socket_for(make_user())
+    half = MAX_WATCHED_USERS // 2
+
+    client.emit('watch_presence', {'userIds': list(range(1, half + 1))})
+    client.emit('watch_presence', {'userIds': list(range(half + 1, MAX_WATCHED_USERS + 1))})
+    assert [name for name, _ in _events(client)] == ['presence_state', 'presence_state']
+
+    client.emit('watch_presence', {'userIds': [MAX_WATCHED_USERS + 1]})
+    [(name, payload)] = _events(client)
+    assert name == 'presence_error'
+    assert payload['watching'] == MAX_WATCHED_USERS
+
+    # Watching users already watched, or after unwatching some, stays within the limit
+    client.emit('watch_presence', {'userIds': [1, 2]})
+    client.emit('unwatch_presence', {'userIds': [1]})
+    client.emit('watch_presence', {'userIds': [MAX_WATCHED_USERS + 1]})
+    assert [name for name, _ in _events(client)] == ['presence_state', 'presence_state']
+
+
+def test_a_single_call_over_the_limit_is_rejected(make_user, socket_for):
+    client = socket_for(make_user())
+
+    client.emit('watch_presence', {'userIds': list(range(1, MAX_WATCHED_USERS + 2))})
+
+    assert [name for name, _ in _events(client)] == ['presence_error']
+
+
+class _Emitter:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event, data, room=None):
+        self.events.append((event, data))
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    """Three trackers sharing an in-process bus, as three workers would share Redis"""
+    InProcessBus.reset()
+    emitted = _Emitter()
+    monkeypatch.setattr(presence_module, 'emitter', emitted)
+    trackers = []
+    for _ in range(3):
+        tracker = PresenceTracker()
+        tracker.bus = InProcessBus(channel='test-presence')
+        tracker.bus.subscribe(tracker._on_bus_message)
+        trackers.append(tracker)
+    yield trackers, emitted
+    InProcessBus.reset()
+
+
+def _expire(tracker, worker_id):
+    """Pretend `worker_id` stopped refreshing a TTL ago"""
+    for workers in tracker._remote.values():
+        if worker_id in workers:
+            workers[worker_id] = 0
+    tracker._workers[worker_id] = 0
+
+
+def test_a_dead_workers_users_go_offline_once(workers):
+    (dead, *alive), emitted = workers
+    for tracker in alive:
+        tracker.tick()  # Heartbeats: the live workers learn about each other
+    dead.bus.publish({'worker': dead.worker_id, 'online': [7, 8, 9]})
+    assert all(tracker.lookup([7])[7]['online'] for tracker in alive)
+
+    for tracker in alive:
+        _expire(tracker, dead.worker_id)
+        tracker.tick()
+
+    offline = sorted(data['userId'] for event, data in emitted.events if event == 'presence' and not data['online'])
+    assert offline == [7, 8, 9]
+    assert not any(tracker.lookup([7])[7]['online'] for tracker in alive)
+
+
+def test_a_lone_survivor_announces_every_expired_user(workers):
+    (dead, survivor, _), emitted = workers
+    dead.bus.publish({'worker': dead.worker_id, 'online': [7, 8, 9]})
+
+    _expire(survivor, dead.worker_id)
+    survivor.tick()
+
+    assert sorted(data['userId'] for _, data in emitted.events) == [7, 8, 9]
@@ -0,0 +1,51 @@
+"""
+Random sampling by primary key probes.
+"""
+import random
+from statistics import mean
+
+from app import db
+from app.models import BlogPost
+from app.utils.sampling import sample_ids
+
+
+def _posts(author, count):
+    db.session.add_all(BlogPost(author_id=author.id, content=f'Post {i}') for i in range(count))
+    db.session.commit()
+    return [post_id for (post_id,) in db.session.query(BlogPost.id).order_by(BlogPost.id)]
+
+
+def test_sample_ids_returns_distinct_existing_ids(make_user):
+    ids = _posts(make_user(), 100)
+
+    sample = sample_ids(BlogPost.id, 10)
+
+    assert len(sample) == 10
+    assert len(set(sample)) == 10
+    assert set(sample) <= set(ids)
+
+
+def test_sample_ids_small_table_and_empty_limit(make_user):
+    ids = _posts(make_user(), 3)
+
+    assert sorted(sample_ids(BlogPost.id, 10)) == ids
+    assert sample_ids(BlogPost.id, 0) == []
+
+
+def test_sample_ids_makes_up_for_gaps(make_user):
+    ids = _posts(make_user(), 100)
+    BlogPost.query.filter(BlogPost.id.notin_(ids[::10])).delete(synchronize_session=False)
+    db.session.commit()
+
+    sample = sample_ids(BlogPost.id, 10)
+
+    assert sorted(sample) == ids[::10]
+
+
+def test_sample_ids_is_not_biased_towards_low_ids(make_user):
+    ids = _posts(make_user(), 100)
+    random.seed(0)
+
+    picks = [post_id for _ in range(200) for post_id in sample_ids(BlogPost.id, 10)]
+
+    assert abs(mean(picks) - mean(ids)) < 5
@@ -0,0 +1,51 @@
+"""
+Periodic jobs start only from `flask run-scheduler`, never from create_app().
+"""
+import pytest
+
+from app import create_app, socketio
+from app.utils.scheduler import start_schedulers
+from config import TestingConfig
+
+INTERVALS = {
+    'NOTIFICATION_RETENTION_INTERVAL_HOURS': 1,
+    'MESSAGE_ARCHIVE_INTERVAL_HOURS': 1,
+    'SYNC_PRUNE_INTERVAL_HOURS': 1,
+    'SUGGESTIONS_INTERVAL_HOURS': 1,
+    'FEED_DECAY_INTERVAL_MINUTES': 1,
+    'TRENDING_SNAPSHOT_MINUTES': 1,
+}
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Background tasks are recorded instead of started"""
+    tasks = []
+    monkeypatch.setattr(socketio, 'start_background_task', lambda target, *args, **kwargs: tasks.append(target) or target)
+    return tasks
+
+
+def test_create_app_starts_no_jobs(monkeypatch, started):
+    for name, value in INTERVALS.items():
+        monkeypatch.setattr(TestingConfig, name, value)
+    monkeypatch.setattr(TestingConfig, 'TESTING', False)
+
+    create_app('testing')
+
+    assert started == []
+
+
+def test_scheduler_starts_the_configured_jobs(app, started):
+    app.config.update(INTERVALS)
+
+    names = start_schedulers(app)
+
+    assert len(names) == len(INTERVALS) == len(started)
+
+
+def test_scheduler_skips_jobs_without_an_interval(app, started):
+    app.config.update({name: 0 for name in INTERVALS})
+    app.config['FEED_DECAY_INTERVAL_MINUTES'] = 5
+
+    assert start_schedulers(app) == ['engagement decay']
+    assert len(started) == 1
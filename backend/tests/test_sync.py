@@ -0,0 +1,112 @@
+"""
+Delta sync: tokens, settled changes and tombstones.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import ChangeLog, Notification
+from app.routes.notifications import create_notification
+from app.utils.retention import purge_notifications
+
+
+@pytest.fixture(autouse=True)
+def settled(app):
+    """Changes count as settled right away unless a test says otherwise"""
+    app.config['SYNC_SETTLE_SECONDS'] = 0
+
+
+def _sync(client, since=None, **params):
+    response = client.get('/api/sync', query_string=dict(params, **({'since': since} if since is not None else {})))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _notify(user, title='Hello'):
+    notification = create_notification(user.id, 'test', title, 'message')
+    db.session.commit()
+    return notification.id
+
+
+def test_sync_is_served_without_a_trailing_slash(make_user, client_for):
+    data = _sync(client_for(make_user()))
+
+    assert data['reset']
+    assert data['token'] == '0'
+
+
+def test_changes_after_the_token(make_user, client_for):
+    user = make_user()
+    client = client_for(user)
+    token = _sync(client)['token']
+    notification_id = _notify(user)
+
+    data = _sync(client, token)
+
+    assert not data['reset']
+    assert [n['id'] for n in data['changes']['notifications']] == [notification_id]
+    assert _sync(client, data['token'])['changes']['notifications'] == []
+
+
+def test_unsettled_changes_are_sent_again(app, make_user, client_for):
+    user = make_user()
+    client = client_for(user)
+    token = _sync(client)['token']
+    app.config['SYNC_SETTLE_SECONDS'] = 60
+    notification_id = _notify(user)
+
+    first = _sync(client, token)
+    again = _sync(client, first['token'])
+
+    assert first['token'] == token
+    assert [n['id'] for n in again['changes']['notifications']] == [notification_id]
+
+
+def test_pages_through_changes(make_user, client_for):
+    user = make_user()
+    client = client_for(user)
+    token = _sync(client)['token']
+    created = [_notify(user, f'Hello {i}') for i in range(5)]
+
+    seen = []
+    while True:
+        data = _sync(client, token, limit=2)
+        seen += [n['id'] for n in data['changes']['notifications']]
+        token = data['token']
+        if not data['hasMore']:
+            break
+
+    assert sorted(seen) == created
+
+
+def test_limit_zero_still_advances(make_user, client_for):
+    user = make_user()
+    client = client_for(user)
+    token = _sync(client)['token']
+    _notify(user)
+
+    data = _sync(client, token, limit=0)
+
+    assert len(data['changes']['notifications']) == 1
+    assert data['token'] != token
+
+
+def test_purged_notifications_are_sent_as_deleted(make_user, client_for):
+    user = make_user()
+    client = client_for(user)
+    notification_id = _notify(user)
+    kept_id = _notify(user, 'Unread')
+    old = Notification.query.get(notification_id)
+    old.is_read = True
+    old.created_at = datetime.utcnow() - timedelta(days=100)
+    db.session.commit()
+    token = _sync(client)['token']
+
+    summary = purge_notifications(days=90)
+
+    data = _sync(client, token)
+    assert summary['deleted'] == 1
+    assert data['deleted']['notifications'] == [notification_id]
+    assert kept_id not in data['deleted']['notifications']
+    assert ChangeLog.query.filter_by(entity_id=notification_id, op='delete').count() == 1
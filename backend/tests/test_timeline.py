@@ -0,0 +1,112 @@
+"""
+Home timeline: fan-out on write, celebrities merged in on read, and the
+table that keeps both paths in agreement.
+"""
+from app.models import FeedCelebrity, TimelineEntry
+from app.utils import timeline
+
+
+def _post(client, content='Hello'):
+    response = client.post('/api/posts/', json={'content': content})
+    assert response.status_code == 201
+    return response.get_json()['post']['id']
+
+
+def _feed(client, **params):
+    response = client.get('/api/feed', query_string=params)
+    assert response.status_code == 200
+    return [post['id'] for post in response.get_json()['posts']]
+
+
+def _entries():
+    return {(row.user_id, row.post_id, row.author_id) for row in TimelineEntry.query}
+
+
+def test_posts_fan_out_to_connections(make_user, client_for, connect):
+    author, reader, stranger = make_user('author'), make_user('reader'), make_user('stranger')
+    connect(author, reader)
+
+    post_id = _post(client_for(author))
+
+    assert _feed(client_for(reader)) == [post_id]
+    assert _feed(client_for(author)) == [post_id]
+    assert _feed(client_for(stranger)) == []
+
+
+def test_accepting_a_connection_copies_recent_posts(make_user, client_for, connect):
+    author, reader = make_user('author'), make_user('reader')
+    first, second = _post(client_for(author)), _post(client_for(author))
+
+    connect(author, reader)
+
+    assert _feed(client_for(reader)) == [second, first]
+
+
+def test_removing_a_connection_drops_their_posts(make_user, client_for, connect):
+    author, reader = make_user('author'), make_user('reader')
+    connect(author, reader)
+    _post(client_for(author))
+
+    assert client_for(reader).delete(f'/api/connections/{author.id}').status_code == 200
+
+    assert _feed(client_for(reader)) == []
+
+
+def test_celebrity_posts_are_pulled_on_read(app, make_user, client_for, connect):
+    app.config['FEED_FANOUT_LIMIT'] = 1
+    celebrity, fan, other_fan = make_user('celebrity'), make_user('fan'), make_user('other')
+    connect(celebrity, fan)
+    connect(celebrity, other_fan)
+    assert timeline.is_celebrity(celebrity.id)
+
+    post_id = _post(client_for(celebrity))
+
+    assert _entries() == {(celebrity.id, post_id, celebrity.id)}
+    assert _feed(client_for(fan)) == [post_id]
+    assert _feed(client_for(other_fan)) == [post_id]
+
+
+def test_dropping_below_the_limit_fans_recent_posts_out_again(app, make_user, client_for, connect):
+    app.config['FEED_FANOUT_LIMIT'] = 1
+    celebrity, fan, other_fan = make_user('celebrity'), make_user('fan'), make_user('other')
+    connect(celebrity, fan)
+    connect(celebrity, other_fan)
+    post_id = _post(client_for(celebrity))
+
+    assert client_for(other_fan).delete(f'/api/connections/{celebrity.id}').status_code == 200
+
+    assert not timeline.is_celebrity(celebrity.id)
+    assert (fan.id, post_id, celebrity.id) in _entries()
+    assert _feed(client_for(fan)) == [post_id]
+    assert _feed(client_for(other_fan)) == []
+
+
+def test_rebuild_matches_incremental_timelines(app, make_user, client_for, connect):
+    app.config['FEED_FANOUT_LIMIT'] = 2
+    users = [make_user(f'user{i}') for i in range(4)]
+    connect(users[0], users[1])
+    connect(users[0], users[2])
+    connect(users[0], users[3])
+    connect(users[1], users[2])
+    for user in users:
+        _post(client_for(user))
+    incremental = _entries()
+    celebrities = {row.user_id for row in FeedCelebrity.query}
+
+    timeline.rebuild_timelines()
+
+    assert celebrities == {users[0].id}
+    assert {row.user_id for row in FeedCelebrity.query} == celebrities
+    assert _entries() == incremental
+
+
+def test_feed_pages_with_the_cursor(make_user, client_for, connect):
+    author, reader = make_user('author'), make_user('reader')
+    connect(author, reader)
+    created = [_post(client_for(author)) for _ in range(5)]
+    client = client_for(reader)
+
+    first = client.get('/api/feed', query_string={'limit': 2}).get_json()
+    rest = _feed(client, cursor=first['nextCursor'], limit=10)
+
+    assert [post['id'] for post in first['posts']] + rest == created[::-1]
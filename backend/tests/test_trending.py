@@ -0,0 +1,88 @@
+"""
+Trending topics: per-worker sketch counts and the periodic re-warm that picks
+up tags written by other workers.
+"""
+from datetime import datetime
+
+from app import db
+from app.models import BlogPost, PostTag
+from app.utils.trending import extract_tags, tracker
+
+
+def _counts(kind='hashtag'):
+    return {topic['tag']: topic['count'] for topic in tracker.top(kind=kind)}
+
+
+def _tag_elsewhere(author, content):
+    """Write a post and its tags the way another worker would, bypassing this worker's sketch"""
+    post = BlogPost(author_id=author.id, content=content)
+    db.session.add(post)
+    db.session.flush()
+    db.session.execute(PostTag.__table__.insert(), [
+        {'post_id': post.id, 'kind': kind, 'tag': tag, 'created_at': datetime.utcnow()}
+        for kind, tag in extract_tags(content)
+    ])
+    db.session.commit()
+    return post
+
+
+def test_extract_tags():
+    assert extract_tags('Hi @Jane, #Python and #rust! #2024 a#b mail@x.com') == {
+        ('mention', 'jane'), ('hashtag', 'python'), ('hashtag', 'rust'),
+    }
+
+
+def test_posts_created_here_count_immediately(make_user, client_for):
+    client = client_for(make_user('author'))
+    for _ in range(3):
+        client.post('/api/posts/', json={'content': '#python'})
+    client.post('/api/posts/', json={'content': '#rust'})
+
+    assert _counts() == {'python': 3, 'rust': 1}
+
+
+def test_other_workers_posts_show_up_after_the_refresh(make_user):
+    author = make_user('author')
+    tracker.refresh_seconds = 60
+    assert _counts() == {}
+
+    _tag_elsewhere(author, '#python')
+    assert _counts() == {}
+
+    tracker._warmed_at -= 60
+    assert _counts() == {'python': 1}
+
+
+def test_removed_tags_drop_out_after_the_refresh(make_user, client_for):
+    author = make_user('author')
+    client = client_for(author)
+    post_id = client.post('/api/posts/', json={'content': '#python'}).get_json()['post']['id']
+    assert _counts() == {'python': 1}
+
+    # Deleted on another worker
+    PostTag.query.filter_by(post_id=post_id).delete()
+    db.session.commit()
+    tracker._warmed_at -= tracker.refresh_seconds
+
+    assert _counts() == {}
+
+
+def test_refresh_disabled_warms_once(make_user):
+    author = make_user('author')
+    tracker.refresh_seconds = 0
+    assert _counts() == {}
+
+    _tag_elsewhere(author, '#python')
+    tracker._warmed_at -= 3600
+
+    assert _counts() == {}
+
+
+def test_trending_is_served_without_a_trailing_slash(make_user, client_for):
+    client = client_for(make_user('author'))
+    client.post('/api/posts/', json={'content': '#python'})
+
+    response = client.get('/api/trending')
+
+    assert response.status_code == 200
+    assert response.get_json()['topics'] == [{'kind': 'hashtag', 'tag': 'python', 'count': 1}]
@@ -1,6 +1,7 @@
 import { useState, useEffect, useRef } from 'react'
 import { Link } from 'react-router-dom'
 import { notificationsAPI } from '@/lib/api'
+import { useChatStore } from '@/store/chatStore'
 import { formatDistanceToNow } from 'date-fns'
 import {
   Bell,
@@ -31,6 +32,7 @@ interface Notification {
     oldStatus?: string
     newStatus?: string
   }
+  count?: number
   createdAt: string
 }
 
@@ -40,14 +42,34 @@ export default function NotificationBell() {
   const [isOpen, setIsOpen] = useState(false)
   const [isLoading, setIsLoading] = useState(false)
   const dropdownRef = useRef<HTMLDivElement>(null)
+  const socket = useChatStore((s) => s.socket)
 
-  // Fetch unread count on mount and periodically
+  // Fetch unread count once on mount; the socket pushes updates afterwards
   useEffect(() => {
     fetchUnreadCount()
-    const interval = setInterval(fetchUnreadCount, 30000) // Poll every 30 seconds
-    return () => clearInterval(interval)
   }, [])
 
+  useEffect(() => {
+    if (!socket) return
+
+    const handleNotification = (notification: Notification) => {
+      setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)])
+    }
+    const handleUnreadCount = (data: { count: number }) => {
+      setUnreadCount(data.count)
+    }
+
+    socket.on('notification', handleNotification)
+    socket.on('unread_count', handleUnreadCount)
+    // Catch up on anything missed while the socket was down
+    socket.on('connect', fetchUnreadCount)
+    return () => {
+      socket.off('notification', handleNotification)
+      socket.off('unread_count', handleUnreadCount)
+      socket.off('connect', fetchUnreadCount)
+    }
+  }, [socket])
+
   // Close dropdown when clicking outside
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
@@ -234,6 +256,7 @@ export default function NotificationBell() {
                       </p>
                       <p className="text-xs text-gray-400 mt-1">
                         {formatTime(notification.createdAt)}
+                        {(notification.count ?? 1) > 1 && ` · ${notification.count} updates`}
                       </p>
                     </div>
 
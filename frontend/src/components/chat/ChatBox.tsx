@@ -10,7 +10,10 @@ export default function ChatBox() {
     activeConversationId, 
     setActiveConversation,
     conversations,
-    fetchConversations 
+    fetchConversations,
+    fetchMoreConversations,
+    conversationsCursor,
+    isLoadingConversations
   } = useChatStore()
   
   const [isOpen, setIsOpen] = useState(false)
@@ -99,6 +102,9 @@ export default function ChatBox() {
                             // Implementing side-by-side:
                             setActiveConversation(id)
                         }}
+                        hasMore={!!conversationsCursor}
+                        isLoadingMore={isLoadingConversations}
+                        onLoadMore={fetchMoreConversations}
                     />
                 </div>
                 
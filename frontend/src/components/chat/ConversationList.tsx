@@ -4,12 +4,18 @@ type Props = {
   conversations: Conversation[]
   activeConversationId: number | null
   onSelectConversation: (id: number) => void
+  hasMore?: boolean
+  isLoadingMore?: boolean
+  onLoadMore?: () => void
 }
 
 export default function ConversationList({
   conversations,
   activeConversationId,
   onSelectConversation,
+  hasMore = false,
+  isLoadingMore = false,
+  onLoadMore,
 }: Props) {
   if (!conversations.length) {
     return (
@@ -47,14 +53,30 @@ export default function ConversationList({
                     </div>
                   )}
                 </div>
-                <div className="text-sm text-gray-600 dark:text-gray-400 truncate">
-                  {c.lastMessage?.content || 'No messages yet'}
+                <div className="flex items-center justify-between gap-2">
+                  <div className="text-sm text-gray-600 dark:text-gray-400 truncate">
+                    {c.lastMessage?.content || 'No messages yet'}
+                  </div>
+                  {!!c.unreadCount && (
+                    <span className="min-w-[20px] h-5 px-1.5 rounded-full bg-primary text-white text-xs font-medium flex items-center justify-center">
+                      {c.unreadCount > 99 ? '99+' : c.unreadCount}
+                    </span>
+                  )}
                 </div>
               </div>
             </div>
           </button>
         )
       })}
+      {hasMore && onLoadMore && (
+        <button
+          onClick={onLoadMore}
+          disabled={isLoadingMore}
+          className="w-full px-4 py-3 text-sm text-primary hover:bg-gray-50 dark:hover:bg-gray-900 disabled:opacity-50"
+        >
+          {isLoadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   )
 }
@@ -146,6 +146,7 @@ export const postsAPI = {
   getPosts: (params?: { page?: number; per_page?: number }) =>
     api.get('/posts', { params }),
   getRandomPosts: (limit?: number) => api.get('/posts/random', { params: { limit } }),
+  getFeed: (params?: { cursor?: string; limit?: number; mode?: 'top' }) => api.get('/feed', { params }),
   getPost: (id: number) => api.get(`/posts/${id}`),
   createPost: (data: { content: string; location?: string; url?: string; photo?: string }) =>
     api.post('/posts', data),
@@ -153,7 +154,9 @@ export const postsAPI = {
     api.put(`/posts/${id}`, data),
   deletePost: (id: number) => api.delete(`/posts/${id}`),
   toggleLike: (id: number) => api.post(`/posts/${id}/like`),
-  getComments: (postId: number) => api.get(`/posts/${postId}/comments`),
+  getComments: (postId: number, params?: { cursor?: string; limit?: number }) =>
+    api.get(`/posts/${postId}/comments`, { params }),
+  getCommentsCount: (postId: number) => api.get(`/posts/${postId}/comments/count`),
   addComment: (postId: number, content: string) =>
     api.post(`/posts/${postId}/comments`, { content }),
   updateComment: (postId: number, commentId: number, content: string) =>
@@ -167,6 +170,14 @@ export const postsAPI = {
 }
 
 // Companies API
+export const trendingAPI = {
+  getTrending: (params?: { kind?: 'hashtag' | 'mention'; limit?: number }) =>
+    api.get('/trending', { params }),
+  getHistory: (params?: { limit?: number }) => api.get('/trending/history', { params }),
+  getTaggedPosts: (tag: string, params?: { kind?: 'hashtag' | 'mention'; cursor?: string; limit?: number }) =>
+    api.get(`/trending/tags/${encodeURIComponent(tag)}`, { params }),
+}
+
 export const companiesAPI = {
   getCompanies: (params?: { page?: number; per_page?: number; search?: string; industry?: string }) =>
     api.get('/companies', { params }),
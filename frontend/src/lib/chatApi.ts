@@ -1,9 +1,13 @@
 import api from './api'
-import type { Conversation, Message } from '@/types/chat'
+import type { Conversation, Message, UserSummary } from '@/types/chat'
 
 export const chatApi = {
-  async listConversations(): Promise<{ conversations: Conversation[] }> {
-    const res = await api.get('/conversations')
+  async listConversations(params?: { cursor?: string; limit?: number }): Promise<{
+    conversations: Conversation[]
+    nextCursor: string | null
+    unreadMessages: number
+  }> {
+    const res = await api.get('/conversations', { params })
     return res.data
   },
 
@@ -20,6 +24,28 @@ export const chatApi = {
     return res.data
   },
 
+  async getMessages(
+    conversationId: number,
+    params?: { before_id?: number; after_id?: number; limit?: number }
+  ): Promise<{
+    messages: Message[]
+    users: Record<string, UserSummary>
+    readCursors: Record<string, number | null>
+    hasMore: boolean
+  }> {
+    const res = await api.get(`/conversations/${conversationId}/messages`, { params })
+    return res.data
+  },
+
+  async markRead(conversationId: number, messageId?: number): Promise<{
+    lastReadMessageId: number | null
+    advanced: boolean
+    unreadMessages: number
+  }> {
+    const res = await api.post(`/conversations/${conversationId}/read`, messageId ? { messageId } : {})
+    return res.data
+  },
+
   async sendMessage(conversationId: number, content: string): Promise<{ message: Message }> {
     const res = await api.post(`/conversations/${conversationId}/messages`, { content })
     return res.data
@@ -1,6 +1,11 @@
 import api from './api'
 import type { User } from '@/types'
 
+export interface ConnectionStatus {
+  status: 'none' | 'self' | 'pending' | 'accepted' | 'rejected'
+  isRequester: boolean
+}
+
 export const connectionsApi = {
   async listConnections(): Promise<{ connections: User[] }> {
     const res = await api.get('/connections')
@@ -12,6 +17,16 @@ export const connectionsApi = {
     return res.data
   },
 
+  async getStatuses(userIds: number[]): Promise<{ statuses: Record<string, ConnectionStatus> }> {
+    const res = await api.post('/connections/status', { userIds })
+    return res.data
+  },
+
+  async getDegrees(userIds: number[]): Promise<{ degrees: Record<string, 0 | 1 | 2 | 3 | null> }> {
+    const res = await api.post('/connections/degrees', { userIds })
+    return res.data
+  },
+
   async sendRequest(userId: number): Promise<{ message: string }> {
     const res = await api.post(`/connections/${userId}`)
     return res.data
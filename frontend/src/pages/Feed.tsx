@@ -96,6 +96,8 @@ function ConfirmModal({
 export default function Feed() {
   const { user } = useAuthStore()
   const [posts, setPosts] = useState<BlogPost[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
   const [suggestions, setSuggestions] = useState<User[]>([])
   const [isLoading, setIsLoading] = useState(true)
   const [newPostContent, setNewPostContent] = useState('')
@@ -107,16 +109,20 @@ export default function Feed() {
     fetchSuggestions()
   }, [])
 
-  const fetchPosts = async () => {
+  // Home timeline: posts by the user and their connections, newest first
+  const fetchPosts = async (cursor?: string) => {
     try {
-      const response = await postsAPI.getPosts()
+      if (cursor) setIsLoadingMore(true)
+      const response = await postsAPI.getFeed({ cursor })
       if (response.data.success) {
-        setPosts(response.data.posts)
+        setPosts(prev => (cursor ? [...prev, ...response.data.posts] : response.data.posts))
+        setNextCursor(response.data.nextCursor)
       }
     } catch (error) {
       console.error('Error fetching posts:', error)
     } finally {
       setIsLoading(false)
+      setIsLoadingMore(false)
     }
   }
 
@@ -162,7 +168,7 @@ export default function Feed() {
           if (post.id === postId) {
             return {
               ...post,
-              likes: response.data.likes,
+              isLiked: response.data.liked,
               likesCount: response.data.likesCount,
             }
           }
@@ -331,6 +337,15 @@ export default function Feed() {
             />
           ))
         )}
+        {nextCursor && (
+          <button
+            onClick={() => fetchPosts(nextCursor)}
+            disabled={isLoadingMore}
+            className="w-full card p-3 text-sm text-primary hover:text-primary/80 font-medium disabled:opacity-50"
+          >
+            {isLoadingMore ? 'Loading...' : 'Load more posts'}
+          </button>
+        )}
       </div>
 
       {/* Sidebar */}
@@ -412,7 +427,7 @@ function PostCard({
   const [repostContent, setRepostContent] = useState('')
   const [copied, setCopied] = useState(false)
   const [showDeleteModal, setShowDeleteModal] = useState(false)
-  const isLiked = currentUserId ? post.likes.includes(currentUserId) : false
+  const isLiked = post.isLiked
   const isOwner = currentUserId === post.author?.id
 
   const handleSaveEdit = () => {
@@ -641,7 +656,7 @@ function PostCard({
         {/* Comments Section */}
         {showComments && (
           <div className="px-4 py-3 border-t border-gray-200 dark:border-gray-700">
-            <CommentsSection postId={post.id} comments={post.comments} />
+            <CommentsSection postId={post.id} />
           </div>
         )}
       </div>
@@ -712,15 +727,32 @@ function PostCard({
 }
 
 // Comments Section Component
-function CommentsSection({ postId, comments: initialComments }: { postId: number; comments: any[] }) {
+function CommentsSection({ postId }: { postId: number }) {
   const { user } = useAuthStore()
-  const [comments, setComments] = useState(initialComments || [])
+  const [comments, setComments] = useState<any[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [newComment, setNewComment] = useState('')
   const [isSubmitting, setIsSubmitting] = useState(false)
   const [editingCommentId, setEditingCommentId] = useState<number | null>(null)
   const [editContent, setEditContent] = useState('')
   const [deleteCommentId, setDeleteCommentId] = useState<number | null>(null)
 
+  useEffect(() => {
+    fetchComments()
+  }, [postId])
+
+  const fetchComments = async (cursor?: string) => {
+    try {
+      const response = await postsAPI.getComments(postId, { cursor })
+      if (response.data.success) {
+        setComments(prev => (cursor ? [...prev, ...response.data.comments] : response.data.comments))
+        setNextCursor(response.data.nextCursor)
+      }
+    } catch (error) {
+      toast.error('Failed to load comments')
+    }
+  }
+
   const handleAddComment = async () => {
     if (!newComment.trim()) return
 
@@ -728,7 +760,9 @@ function CommentsSection({ postId, comments: initialComments }: { postId: number
     try {
       const response = await postsAPI.addComment(postId, newComment)
       if (response.data.success) {
-        setComments([...comments, response.data.comment])
+        if (!nextCursor) {
+          setComments([...comments, response.data.comment])
+        }
         setNewComment('')
       }
     } catch (error) {
@@ -889,6 +923,14 @@ function CommentsSection({ postId, comments: initialComments }: { postId: number
           </div>
         </div>
       ))}
+      {nextCursor && (
+        <button
+          onClick={() => fetchComments(nextCursor)}
+          className="text-sm text-primary hover:text-primary/80 font-medium"
+        >
+          Load more comments
+        </button>
+      )}
 
       {/* Delete Comment Confirmation Modal */}
       <ConfirmModal
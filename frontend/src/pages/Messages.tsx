@@ -14,6 +14,9 @@ export default function MessagesPage() {
     activeConversationId,
     setActiveConversation,
     fetchConversations,
+    fetchMoreConversations,
+    conversationsCursor,
+    isLoadingConversations,
   } = useChatStore()
 
   const [filter, setFilter] = useState('')
@@ -55,6 +58,9 @@ export default function MessagesPage() {
             conversations={filtered}
             activeConversationId={activeConversationId}
             onSelectConversation={(id) => setActiveConversation(id)}
+            hasMore={!!conversationsCursor}
+            isLoadingMore={isLoadingConversations}
+            onLoadMore={fetchMoreConversations}
           />
         </div>
 
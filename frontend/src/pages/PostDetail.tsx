@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react'
 import { Link, useParams, useNavigate } from 'react-router-dom'
 import { useAuthStore } from '@/store/authStore'
 import { postsAPI } from '@/lib/api'
-import type { BlogPost } from '@/types'
+import type { BlogPost, Comment } from '@/types'
 import { formatRelativeTime, getInitials } from '@/lib/utils'
 import toast from 'react-hot-toast'
 import {
@@ -24,6 +24,8 @@ export default function PostDetail() {
   const navigate = useNavigate()
   const { user } = useAuthStore()
   const [post, setPost] = useState<BlogPost | null>(null)
+  const [comments, setComments] = useState<Comment[]>([])
+  const [commentsCursor, setCommentsCursor] = useState<string | null>(null)
   const [isLoading, setIsLoading] = useState(true)
   const [newComment, setNewComment] = useState('')
   const [isSubmitting, setIsSubmitting] = useState(false)
@@ -33,9 +35,22 @@ export default function PostDetail() {
   useEffect(() => {
     if (id) {
       fetchPost()
+      fetchComments()
     }
   }, [id])
 
+  const fetchComments = async (cursor?: string) => {
+    try {
+      const response = await postsAPI.getComments(Number(id), { cursor })
+      if (response.data.success) {
+        setComments(prev => (cursor ? [...prev, ...response.data.comments] : response.data.comments))
+        setCommentsCursor(response.data.nextCursor)
+      }
+    } catch (error) {
+      console.error('Error fetching comments:', error)
+    }
+  }
+
   const fetchPost = async () => {
     try {
       const response = await postsAPI.getPost(Number(id))
@@ -61,7 +76,7 @@ export default function PostDetail() {
       if (response.data.success) {
         setPost({
           ...post,
-          likes: response.data.likes,
+          isLiked: response.data.liked,
           likesCount: response.data.likesCount,
         })
       }
@@ -76,9 +91,12 @@ export default function PostDetail() {
     try {
       const response = await postsAPI.addComment(post.id, newComment)
       if (response.data.success) {
+        // Only append when the last page is loaded; otherwise it arrives with "load more"
+        if (!commentsCursor) {
+          setComments([...comments, response.data.comment])
+        }
         setPost({
           ...post,
-          comments: [...(post.comments || []), response.data.comment],
           commentsCount: (post.commentsCount || 0) + 1,
         })
         setNewComment('')
@@ -136,7 +154,7 @@ export default function PostDetail() {
     )
   }
 
-  const isLiked = user?.id ? post.likes.includes(user.id) : false
+  const isLiked = post.isLiked
   const isOwner = user?.id === post.author?.id
 
   return (
@@ -301,9 +319,9 @@ export default function PostDetail() {
           </div>
 
           {/* Comments List */}
-          {post.comments && post.comments.length > 0 ? (
+          {comments.length > 0 ? (
             <div className="space-y-3">
-              {post.comments.map((comment: any) => (
+              {comments.map((comment) => (
                 <div key={comment.id} className="flex gap-2">
                   {comment.author?.image ? (
                     <img
@@ -330,6 +348,14 @@ export default function PostDetail() {
                   </div>
                 </div>
               ))}
+              {commentsCursor && (
+                <button
+                  onClick={() => fetchComments(commentsCursor)}
+                  className="text-sm text-primary hover:text-primary/80 font-medium"
+                >
+                  Load more comments
+                </button>
+              )}
             </div>
           ) : (
             <p className="text-center text-gray-500 py-4">No comments yet. Be the first to comment!</p>
@@ -2,9 +2,12 @@ import { create } from 'zustand'
 import { chatApi } from '@/lib/chatApi'
 import type { Conversation, Message } from '@/types/chat'
 import { io, Socket } from 'socket.io-client'
+import { useAuthStore } from '@/store/authStore'
 
 type ChatState = {
   conversations: Conversation[]
+  conversationsCursor: string | null
+  hasLoadedMoreConversations: boolean
   activeConversationId: number | null
   messagesByConversation: Record<number, Message[]>
   isLoadingConversations: boolean
@@ -14,8 +17,10 @@ type ChatState = {
 
   setActiveConversation: (id: number | null) => void
   fetchConversations: (silent?: boolean) => Promise<void>
+  fetchMoreConversations: () => Promise<void>
   fetchMessages: (conversationId: number, silent?: boolean) => Promise<void>
   sendMessage: (conversationId: number, content: string) => Promise<void>
+  markConversationRead: (conversationId: number) => Promise<void>
   startConversationWithUser: (userId: number) => Promise<number>
   
   connectSocket: () => void
@@ -26,6 +31,8 @@ type ChatState = {
 
 export const useChatStore = create<ChatState>((set, get) => ({
   conversations: [],
+  conversationsCursor: null,
+  hasLoadedMoreConversations: false,
   activeConversationId: null,
   messagesByConversation: {},
   isLoadingConversations: false,
@@ -58,11 +65,15 @@ export const useChatStore = create<ChatState>((set, get) => ({
   
    connectSocket: () => {
      if (get().socket) return
+
+      // Sockets are authenticated with the same JWT as the REST API
+      const token = useAuthStore.getState().token
+      if (!token) return
      
       // Use the API URL from environment, removing /api suffix for socket connection
       const apiUrl = 'http://localhost:5000/api'
       const socketUrl = apiUrl.replace('/api', '')
-      const socket = io(socketUrl)
+      const socket = io(socketUrl, { auth: { token } })
      
      socket.on('connect', () => {
          console.log('Socket connected')
@@ -76,11 +87,28 @@ export const useChatStore = create<ChatState>((set, get) => ({
                  [conversationId]: [...(s.messagesByConversation[conversationId] || []), message]
              }
          }))
+         // Messages arriving in the open conversation are read right away
+         const me = useAuthStore.getState().user
+         if (get().activeConversationId === conversationId && message.senderId !== me?.id) {
+             get().markConversationRead(conversationId)
+         }
          // Also define that we should update conversation list snippet?
          // For now, let's trigger a light fetchConversations to update the list order/snippet
          get().fetchConversations(true)
      })
      
+     socket.on('read_receipt', (data: { conversationId: number, userId: number, lastReadMessageId: number }) => {
+         const { conversationId, userId, lastReadMessageId } = data
+         set((s) => ({
+             messagesByConversation: {
+                 ...s.messagesByConversation,
+                 [conversationId]: (s.messagesByConversation[conversationId] || []).map((m) =>
+                     m.senderId !== userId && m.id <= lastReadMessageId ? { ...m, isRead: true } : m
+                 )
+             }
+         }))
+     })
+     
      set({ socket })
    },
 
@@ -95,8 +123,15 @@ export const useChatStore = create<ChatState>((set, get) => ({
   fetchConversations: async (silent = false) => {
     try {
       if (!silent) set({ isLoadingConversations: true, error: null })
+      // Refreshes the first page; older pages already loaded stay below it
       const res = await chatApi.listConversations()
-      set({ conversations: res.conversations })
+      set((s) => {
+        if (!s.hasLoadedMoreConversations) {
+          return { conversations: res.conversations, conversationsCursor: res.nextCursor }
+        }
+        const ids = new Set(res.conversations.map((c) => c.id))
+        return { conversations: [...res.conversations, ...s.conversations.filter((c) => !ids.has(c.id))] }
+      })
     } catch (e: any) {
       if (!silent) set({ error: e?.message || 'Failed to load conversations' })
     } finally {
@@ -104,15 +139,39 @@ export const useChatStore = create<ChatState>((set, get) => ({
     }
   },
 
+  fetchMoreConversations: async () => {
+    const cursor = get().conversationsCursor
+    if (!cursor || get().isLoadingConversations) return
+    try {
+      set({ isLoadingConversations: true, error: null })
+      const res = await chatApi.listConversations({ cursor })
+      set((s) => {
+        const ids = new Set(s.conversations.map((c) => c.id))
+        return {
+          conversations: [...s.conversations, ...res.conversations.filter((c) => !ids.has(c.id))],
+          conversationsCursor: res.nextCursor,
+          hasLoadedMoreConversations: true,
+        }
+      })
+    } catch (e: any) {
+      set({ error: e?.message || 'Failed to load conversations' })
+    } finally {
+      set({ isLoadingConversations: false })
+    }
+  },
+
   fetchMessages: async (conversationId, silent = false) => {
     try {
       if (!silent) set({ isLoadingMessages: true, error: null })
-      const res = await chatApi.getConversation(conversationId)
-      // API returns newest-first; we display oldest-first
-      const items = [...res.messages.items].reverse()
+      // Latest page of history, oldest-first; senders are sideloaded separately
+      const res = await chatApi.getMessages(conversationId)
+      const items = res.messages
       set((s) => ({
         messagesByConversation: { ...s.messagesByConversation, [conversationId]: items },
       }))
+      if (items.length > 0) {
+        get().markConversationRead(conversationId)
+      }
     } catch (e: any) {
       if (!silent) set({ error: e?.message || 'Failed to load messages' })
     } finally {
@@ -141,6 +200,17 @@ export const useChatStore = create<ChatState>((set, get) => ({
     }
   },
 
+  markConversationRead: async (conversationId) => {
+    try {
+      await chatApi.markRead(conversationId)
+      set((s) => ({
+        conversations: s.conversations.map((c) => (c.id === conversationId ? { ...c, unreadCount: 0 } : c)),
+      }))
+    } catch (e) {
+      console.error('Error marking conversation as read:', e)
+    }
+  },
+
   startConversationWithUser: async (userId) => {
     const res = await chatApi.createConversation([userId])
     const convoId = res.conversation.id
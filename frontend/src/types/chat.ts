@@ -1,5 +1,7 @@
 import type { User } from './index'
 
+export type UserSummary = Pick<User, 'id' | 'name' | 'image' | 'headline' | 'userRole'>
+
 export type Message = {
   id: number
   conversationId: number
@@ -15,6 +17,8 @@ export type Conversation = {
   participants: User[]
   otherParticipant?: User | null
   lastMessage?: Message | null
+  unreadCount?: number
+  readCursors?: Record<string, number | null>
   updatedAt?: string
 }
 
@@ -16,6 +16,7 @@ export interface User {
   linkedin?: string
   github?: string
   darkMode?: boolean
+  notificationDigest?: boolean
   companyId?: number
   createdAt?: string
   // Profile sections (loaded separately)
@@ -92,10 +93,9 @@ export interface BlogPost {
   location?: string
   url?: string
   photo?: string
-  likes: number[]
   likesCount: number
+  isLiked: boolean
   commentsCount: number
-  comments: Comment[]
   repostsCount: number
   originalPost?: BlogPost
   timestamp?: string